@@ -12,10 +12,9 @@ from app.models.chat import ChatMessage as ChatMessageModel
 from app.models.ticket import Ticket as TicketModel
 from app.models.user import User as UserModel
 from app.services.ai_service import AIService
-from app.utils.websocket_manager import WebSocketManager
+from app.utils.websocket_manager import websocket_manager
 
 router = APIRouter(prefix="/chat", tags=["chat"])
-websocket_manager = WebSocketManager()
 
 
 @router.post("/", response_model=ChatMessage, status_code=status.HTTP_201_CREATED)
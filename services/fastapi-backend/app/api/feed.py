@@ -0,0 +1,172 @@
+"""
+Ticket change feed endpoints: a WebSocket and a Server-Sent Events stream
+that push ticket changes so dashboards do not have to poll
+"""
+from fastapi import APIRouter, HTTPException, status, Query, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Optional
+import asyncio
+import json
+import logging
+
+from app.core.config import settings
+from app.core.database import get_db_context
+from app.core.security import verify_token
+from app.models.ticket import TicketPriority
+from app.models.user import User as UserModel
+from app.schemas.ticket import TicketFeedFilter
+from app.services.ticket_feed import ticket_feed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["feed"])
+
+
+async def _authenticate(token: Optional[str]):
+    """
+    Active user for a bearer token, or None
+    """
+    if not token:
+        return None
+    try:
+        user_id = verify_token(token).get("sub")
+    except HTTPException:
+        return None
+    if not user_id:
+        return None
+    async with get_db_context() as db:
+        user_query = await db.execute(UserModel.__table__.select().where(UserModel.id == int(user_id)))
+        user = user_query.first()
+    if not user or not user.is_active:
+        return None
+    return user
+
+
+async def _subscribe(user, filters: TicketFeedFilter, since: Optional[int]):
+    """
+    Register a subscription and, when resuming, collect the missed events
+    """
+    subscription = ticket_feed.subscribe(user, filters)
+    if since is None:
+        return subscription, []
+    try:
+        async with get_db_context() as db:
+            missed = await ticket_feed.replay(db, subscription, since)
+    except Exception:
+        ticket_feed.unsubscribe(subscription)
+        raise
+    return subscription, missed
+
+
+@router.websocket("/ws/feed")
+async def ticket_feed_websocket(
+    websocket: WebSocket,
+    token: str,
+    scope: str = "mine",
+    min_priority: Optional[TicketPriority] = None,
+    since: Optional[int] = None
+):
+    """
+    Ticket change feed. Each message names the kind of change (``created``,
+    ``updated``, ``assigned``, ``escalated``), the outbox event ``id`` and
+    the current state of the affected tickets that match the subscription.
+    Send ``{"type": "subscribe", "scope": ..., "min_priority": ...}`` to
+    change the filters; pass the last ``id`` seen as ``since`` when
+    reconnecting to receive what was missed. A ``resync`` message means
+    events were lost and the client should reload.
+    """
+    user = await _authenticate(token)
+    try:
+        filters = TicketFeedFilter(scope=scope, min_priority=min_priority)
+    except ValidationError:
+        filters = None
+    if not user or not filters:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscription, missed = await _subscribe(user, filters, since)
+
+    async def pump():
+        for message in missed:
+            await websocket.send_text(json.dumps(message))
+        while True:
+            await websocket.send_text(json.dumps(await subscription.next()))
+
+    sender = asyncio.create_task(pump())
+    try:
+        await websocket.send_text(json.dumps({"type": "subscribed", **filters.model_dump(mode="json")}))
+        while True:
+            data = json.loads(await websocket.receive_text())
+            if data.get("type") != "subscribe":
+                continue
+            try:
+                subscription.filters = TicketFeedFilter(
+                    scope=data.get("scope", "mine"), min_priority=data.get("min_priority")
+                )
+            except ValidationError as e:
+                await websocket.send_text(json.dumps({"type": "error", "detail": e.errors(include_url=False)}, default=str))
+                continue
+            await websocket.send_text(json.dumps({"type": "subscribed", **subscription.filters.model_dump(mode="json")}))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Ticket feed connection for user {user.id} failed: {str(e)}")
+        await websocket.close(code=1011)
+    finally:
+        sender.cancel()
+        ticket_feed.unsubscribe(subscription)
+
+
+@router.get("/feed/tickets")
+async def ticket_feed_stream(
+    request: Request,
+    scope: str = Query("mine", regex="^(mine|department|all)$"),
+    min_priority: Optional[TicketPriority] = Query(None),
+    token: Optional[str] = Query(None, description="Bearer token, for clients that cannot set headers (EventSource)"),
+    authorization: Optional[str] = Header(None),
+    last_event_id: Optional[int] = Header(None)
+):
+    """
+    Server-Sent Events fallback for ``/ws/feed``, with the same messages and
+    filters. Browsers resume automatically by sending Last-Event-ID.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    user = await _authenticate(token)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    subscription, missed = await _subscribe(user, TicketFeedFilter(scope=scope, min_priority=min_priority), last_event_id)
+
+    def event_frame(message: dict) -> str:
+        frame = f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        if "id" in message:
+            frame = f"id: {message['id']}\n" + frame
+        return frame
+
+    async def stream():
+        try:
+            for message in missed:
+                yield event_frame(message)
+            while not await request.is_disconnected():
+                try:
+                    message = await subscription.next(settings.FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield event_frame(message)
+        finally:
+            ticket_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,7 +1,7 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Header, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 
 from app.core.database import get_db
 from app.api.dependencies import get_current_user, require_roles
@@ -18,6 +18,9 @@ from app.schemas.knowledge import (
 )
 from app.services.ai_service import AIService
 from app.services.file_service import FileService
+from app.utils.http_cache import (
+    timestamp_etag, watermark_etag, etag_matches, cache_control, set_cache_headers, not_modified
+)
 from sqlalchemy.orm import joinedload
 
 router = APIRouter(prefix="/knowledge", tags=["knowledge"])
@@ -66,16 +69,22 @@ router = APIRouter(prefix="/knowledge", tags=["knowledge"])
 
 @router.get("/articles")  # Remove response_model
 async def get_articles(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     tags: Optional[List[str]] = Query(None),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get knowledge articles with filtering and search"""
+    """
+    Get knowledge articles with filtering and search. The ETag tracks the
+    newest change and size of the filtered set; send it as If-None-Match to
+    get a 304 instead of the list.
+    """
     query = KnowledgeArticle.__table__.select()
     
     # Your existing filters...
@@ -101,6 +110,18 @@ async def get_articles(
     if current_user.role == "end_user":
         query = query.where(KnowledgeArticle.status == "published")
     
+    watermark_query = await db.execute(query.with_only_columns(
+        func.max(func.coalesce(KnowledgeArticle.updated_at, KnowledgeArticle.created_at)),
+        func.count(),
+        maintain_column_froms=True
+    ))
+    newest, matching = watermark_query.one()
+    etag = watermark_etag(newest, matching, current_user.role.value, skip, limit, category_id, status, search, tags)
+    cache_control_value = cache_control("knowledge", current_user.role.value)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control_value)
+    set_cache_headers(response, etag, cache_control_value)
+    
     # Add eager loading and get results
     articles_query = await db.execute(query.offset(skip).limit(limit))
     articles = articles_query.fetchall()
@@ -159,10 +180,15 @@ async def get_articles(
 @router.get("/articles/{article_id}", response_model=KnowledgeArticleResponse)
 async def get_article(
     article_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific knowledge article"""
+    """
+    Get a specific knowledge article. A matching If-None-Match gets a 304,
+    which does not count as a view.
+    """
     article_query = await db.execute(KnowledgeArticle.__table__.select().where(
         KnowledgeArticle.id == article_id
     ))
@@ -175,10 +201,20 @@ async def get_article(
     if current_user.role == "end_user" and article.status != "published":
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Increment view count
-    await db.execute(KnowledgeArticle.__table__.update().where(KnowledgeArticle.id == article_id).values(view_count=article.view_count + 1))
+    etag = timestamp_etag(article.updated_at or article.created_at)
+    cache_control_value = cache_control("knowledge", current_user.role.value)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control_value)
+    
+    # Increment view count; keeping updated_at keeps the ETag stable across reads
+    await db.execute(
+        KnowledgeArticle.__table__.update()
+        .where(KnowledgeArticle.id == article_id)
+        .values(view_count=KnowledgeArticle.view_count + 1, updated_at=KnowledgeArticle.updated_at)
+    )
     await db.commit()
     
+    set_cache_headers(response, etag, cache_control_value)
     return article
 
 @router.post("/articles", response_model=KnowledgeArticleResponse)
@@ -2,53 +2,240 @@
 """
 Ticket management endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response, Header
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List, Optional
-from datetime import datetime, timedelta
-import uuid
+from sqlalchemy import or_, and_, tuple_, literal, literal_column, func, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from typing import List, Optional, Union
+from datetime import datetime
+from types import SimpleNamespace
+import csv
+import enum
+import io
+import json
+import logging
 
 from app.api.dependencies import get_db, get_current_user, require_engineer
+from app.core.config import settings
+from app.core.database import get_db_context
 from app.schemas.ticket import (
-    Ticket, TicketCreate, TicketUpdate, TicketList, TicketStats, TicketFilters
+    Ticket, TicketCreate, TicketUpdate, TicketList, TicketStats, TicketFilters,
+    TicketSummaryList, TicketInDB, TicketBulkResult, TicketBulkAssign,
+    TicketBulkTransition, TicketBulkUpdateResult, TicketAutoAssign, TicketAutoAssignResult,
+    TicketActivityPage
 )
 from app.models.ticket import (
     Ticket as TicketModel, TicketStatus, TicketPriority, TicketCategory,
-    TicketAttachment, TicketActivity, Tag
+    TicketAttachment, TicketActivity, Tag, TICKET_SEARCH_CONFIG, RESOLVED_STATUSES
 )
-from app.models.user import User as UserModel
+from app.models.user import User as UserModel, Department as DepartmentModel
 from app.services.ai_service import AIService
 from app.services.file_service import FileService
+from app.utils.pagination import encode_cursor, decode_cursor, count_rows
+from app.utils.alert_dedupe import AlertDeduplicator, alert_fingerprint
+from app.utils.ticket_ids import ticket_id_allocator
+from app.utils.http_cache import (
+    version_etag, parse_if_match, watermark_etag, etag_matches, cache_control,
+    set_cache_headers, not_modified
+)
+from app.utils.ticket_utils import auto_assign_tickets
+from app.services.workload_index import workload_index
+from app.services.sla_monitor import sla_monitor
+from app.services.sla_engine import sla_engine
+from app.services.outbox import publish
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
+logger = logging.getLogger(__name__)
 
 
-def generate_ticket_id() -> str:
+async def generate_ticket_id() -> str:
     """Generate unique ticket ID in format INC-YYYYMMDD-NNNNN"""
-    today = datetime.now().strftime("%Y%m%d")
-    random_suffix = str(uuid.uuid4().int)[:5]
-    return f"INC-{today}-{random_suffix}"
-
-
-def calculate_sla_deadline(priority: TicketPriority, category: TicketCategory) -> datetime:
-    """Calculate SLA deadline based on priority and category"""
-    base_hours = {
-        TicketPriority.CRITICAL: 2,
-        TicketPriority.HIGH: 8,
-        TicketPriority.MEDIUM: 24,
-        TicketPriority.LOW: 72
-    }
+    ids = await ticket_id_allocator.allocate(1)
+    return ids[0]
+
+
+# Ticket columns the in-process trackers need after a change
+_TRACKED_COLUMNS = (
+    TicketModel.id,
+    TicketModel.title,
+    TicketModel.priority,
+    TicketModel.status,
+    TicketModel.sla_deadline,
+    TicketModel.assigned_to_id
+)
+
+
+def _ticket_changed(ticket, old_assignee_id: Optional[int] = None, old_status: Optional[TicketStatus] = None):
+    """
+    Feed a committed ticket change to the in-process workload index and SLA
+    monitor. ``ticket`` carries the new state (``_TRACKED_COLUMNS``); leave
+    the old values out for a new ticket.
+    """
+    workload_index.apply(old_assignee_id, old_status, ticket.assigned_to_id, ticket.status)
+    sla_monitor.track(
+        ticket.id, ticket.title, ticket.priority, ticket.sla_deadline,
+        ticket.assigned_to_id, ticket.status
+    )
+
+
+async def _sla_pause_values(db: Session, ticket, new_status: TicketStatus) -> dict:
+    """
+    Column values that stop the SLA clock when a ticket goes ON_HOLD and
+    restart it, with the deadline pushed back by the working time spent on
+    hold, when it leaves. ``ticket`` needs ``status``, ``department_id``,
+    ``sla_deadline``, ``sla_paused_at`` and ``sla_paused_minutes``.
+    """
+    if new_status == TicketStatus.ON_HOLD and ticket.status != TicketStatus.ON_HOLD:
+        return {"sla_paused_at": datetime.utcnow()}
+    if new_status != TicketStatus.ON_HOLD and ticket.sla_paused_at is not None:
+        sla_deadline, paused_minutes = await sla_engine.resume(
+            db, ticket.department_id, ticket.sla_deadline, ticket.sla_paused_at
+        )
+        return {
+            "sla_deadline": sla_deadline,
+            "sla_paused_at": None,
+            "sla_paused_minutes": (ticket.sla_paused_minutes or 0) + paused_minutes
+        }
+    return {}
+
+
+async def _upsert_tags(db: Session, tag_names: List[str]) -> list:
+    """
+    Create any missing tags with a single INSERT ... ON CONFLICT DO NOTHING
+    and return rows (id, name, color) for all requested tags, in order.
+    """
+    from sqlalchemy import select
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    names = list(dict.fromkeys(name for name in tag_names if name))
+    if not names:
+        return []
     
-    hours = base_hours.get(priority, 24)
+    result = await db.execute(
+        pg_insert(Tag)
+        .values([{"name": name} for name in names])
+        .on_conflict_do_nothing(index_elements=[Tag.name])
+        .returning(Tag.id, Tag.name, Tag.color)
+    )
+    tags = {row.name: row for row in result.all()}
     
-    # Adjust for category
-    if category == TicketCategory.INCIDENT:
-        hours = hours * 0.8  # Faster for incidents
-    elif category == TicketCategory.CHANGE:
-        hours = hours * 2    # Longer for changes
+    # RETURNING only yields newly inserted rows; fetch the ones that already existed
+    existing_names = [name for name in names if name not in tags]
+    if existing_names:
+        result = await db.execute(
+            select(Tag.id, Tag.name, Tag.color).where(Tag.name.in_(existing_names))
+        )
+        tags.update({row.name: row for row in result.all()})
     
-    return datetime.utcnow() + timedelta(hours=hours)
+    return [tags[name] for name in names if name in tags]
+
+
+async def _create_ticket_record(
+    db: Session,
+    *,
+    reporter,
+    department_id: Optional[int],
+    title: str,
+    description: str,
+    priority: TicketPriority,
+    category: TicketCategory,
+    tags: Optional[List[str]] = None,
+    melt_data: Optional[dict] = None,
+    files: Optional[List[UploadFile]] = None,
+    file_service: Optional[FileService] = None
+) -> dict:
+    """
+    Create a ticket with its tags, attachments and creation activity in a
+    single transaction, and build the response from the in-memory objects.
+    """
+    from app.models.ticket import ticket_tag_association
+
+    if department_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A department ID is required. Please provide one or ensure the user is assigned to a department."
+        )
+    
+    department = await db.get(DepartmentModel, department_id)
+    if not department:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid department"
+        )
+    
+    # Generate ticket ID and calculate SLA
+    ticket_id = await generate_ticket_id()
+    sla_deadline = await sla_engine.deadline(db, department_id, priority, category)
+    
+    # Store files before opening the write transaction so it stays short
+    attachments = []
+    for file in files or []:
+        folder = f"ticket_attachments/{ticket_id}"
+        file_info = await file_service.save_file(file=file, subfolder=folder)
+        attachments.append(TicketAttachment(
+            file_name=file.filename,
+            file_path=file_info["file_path"],
+            file_type=file_info["mime_type"],
+            file_size=file_info["file_size"],
+            ticket_id=ticket_id,
+            uploaded_by_id=reporter.id
+        ))
+    
+    db_ticket = TicketModel(
+        id=ticket_id,
+        title=title,
+        description=description,
+        status=TicketStatus.OPEN,
+        priority=priority,
+        category=category,
+        reported_by_id=reporter.id,
+        department_id=department_id,
+        sla_deadline=sla_deadline,
+        melt_data=melt_data,
+        is_escalated=False
+    )
+    activity = TicketActivity(
+        ticket_id=ticket_id,
+        user_id=reporter.id,
+        activity_type="created",
+        details={"message": "Ticket created"}
+    )
+    db.add(db_ticket)
+    db.add_all(attachments)
+    db.add(activity)
+    
+    tag_rows = await _upsert_tags(db, tags or [])
+    
+    # Flush the ticket before the association rows that reference it
+    await db.flush()
+    if tag_rows:
+        await db.execute(
+            ticket_tag_association.insert(),
+            [{"ticket_id": ticket_id, "tag_id": tag.id} for tag in tag_rows]
+        )
+    publish(
+        db, "ticket_created", [ticket_id], user_id=reporter.id,
+        priority=priority, category=category, department_id=department_id
+    )
+    
+    await db.commit()
+    _ticket_changed(db_ticket)
+    
+    # Server defaults (created_at, ids) come back via INSERT ... RETURNING,
+    # so no re-select is needed to build the response
+    response = {field: getattr(db_ticket, field) for field in TicketInDB.model_fields}
+    response.update({
+        "reporter": reporter,
+        "assignee": None,
+        "department": department,
+        "tags": tag_rows,
+        "attachments": attachments,
+        "activities": [activity],
+        "activity_count": 1
+    })
+    return response
 
 
 @router.post("/json", response_model=Ticket, status_code=status.HTTP_201_CREATED)
@@ -65,85 +252,25 @@ async def create_ticket_json(
     """
     # Hardcoded user for now
     user_id = 1 # Assuming user with id 1 exists (admin)
-
-    # Generate ticket ID and calculate SLA
-    ticket_id = generate_ticket_id()
-    sla_deadline = calculate_sla_deadline(ticket_in.priority, ticket_in.category)
-    
-    # Use user's department if not specified, and validate that we have one.
-    final_department_id = ticket_in.department_id
-    if final_department_id is None:
-        # Get department from user
-        user = await db.get(UserModel, user_id)
-        if user:
-            final_department_id = user.department_id
-    
-    if final_department_id is None:
+    user = await db.get(UserModel, user_id)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A department ID is required. Please provide one or ensure the user is assigned to a department."
+            detail="Reporting user not found"
         )
     
-    # Create ticket
-    db_ticket = TicketModel(
-        id=ticket_id,
+    # Use user's department if not specified
+    return await _create_ticket_record(
+        db,
+        reporter=user,
+        department_id=ticket_in.department_id or user.department_id,
         title=ticket_in.title,
         description=ticket_in.description,
         priority=ticket_in.priority,
         category=ticket_in.category,
-        reported_by_id=user_id,
-        department_id=final_department_id,
-        sla_deadline=sla_deadline
-    )
-    
-    db.add(db_ticket)
-    await db.commit()
-    
-    # Add tags if provided
-    if ticket_in.tags:
-        from sqlalchemy import select
-        for tag_name in ticket_in.tags:
-            result = await db.execute(select(Tag).where(Tag.name == tag_name))
-            tag = result.scalar_one_or_none()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-                await db.commit()
-                await db.refresh(tag)
-            
-            # Manually insert into association table to avoid lazy loading issues
-            from app.models.ticket import ticket_tag_association
-            stmt = ticket_tag_association.insert().values(ticket_id=db_ticket.id, tag_id=tag.id)
-            await db.execute(stmt)
-        await db.commit()
-
-    # Log activity
-    activity = TicketActivity(
-        ticket_id=ticket_id,
-        user_id=user_id,
-        activity_type="created",
-        details={"message": "Ticket created"}
-    )
-    db.add(activity)
-    await db.commit()
-
-    # Re-fetch the ticket with all relationships eagerly loaded for the response
-    from sqlalchemy.orm import selectinload
-    from sqlalchemy import select
-    
-    result = await db.execute(
-        select(TicketModel)
-        .options(
-            selectinload(TicketModel.reporter),
-            selectinload(TicketModel.assignee),
-            selectinload(TicketModel.department),
-            selectinload(TicketModel.tags),
-            selectinload(TicketModel.attachments),
-            selectinload(TicketModel.activities)
-        )
-        .where(TicketModel.id == db_ticket.id)
+        tags=ticket_in.tags,
+        melt_data=ticket_in.melt_data
     )
-    return result.scalar_one()
 
 
 @router.post("/", response_model=Ticket, status_code=status.HTTP_201_CREATED)
@@ -162,124 +289,484 @@ async def create_ticket(
     """
     Create a new ticket, optionally including attachments in the same request.
     """
-    # Generate ticket ID and calculate SLA
-    ticket_id = generate_ticket_id()
-    sla_deadline = calculate_sla_deadline(priority, category)
-    
-    # Use user's department if not specified, and validate that we have one.
-    final_department_id = department_id or current_user.department_id
-    if final_department_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A department ID is required. Please provide one or ensure the user is assigned to a department."
-        )
-    
-    # Create ticket
-    db_ticket = TicketModel(
-        id=ticket_id,
+    # Use user's department if not specified
+    return await _create_ticket_record(
+        db,
+        reporter=current_user,
+        department_id=department_id or current_user.department_id,
         title=title,
         description=description,
         priority=priority,
         category=category,
-        reported_by_id=current_user.id,
-        department_id=final_department_id,
-        sla_deadline=sla_deadline
+        tags=tags,
+        files=files,
+        file_service=file_service
     )
+
+
+bulk_alert_deduplicator = AlertDeduplicator(settings.TICKET_BULK_DEDUPE_WINDOW_SECONDS)
+
+
+async def _iter_bulk_items(request: Request):
+    """
+    Yield raw items from a JSON array body or, for NDJSON, line by line as the
+    body streams in. Lines that are not valid JSON are yielded as ValueError.
+    An array longer than TICKET_BULK_MAX_ITEMS is rejected before any item is
+    yielded; an NDJSON stream can only be cut short by the caller.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" not in content_type and "jsonlines" not in content_type:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array or NDJSON"
+            )
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array or NDJSON"
+            )
+        if len(items) > settings.TICKET_BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.TICKET_BULK_MAX_ITEMS} items per request"
+            )
+        for item in items:
+            yield item
+        return
     
-    db.add(db_ticket)
-    await db.commit()
+    def parse_line(line: bytes):
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            return ValueError(f"Invalid JSON: {e}")
     
-    # Add tags if provided
-    if tags:
-        from sqlalchemy import select
-        for tag_name in tags:
-            result = await db.execute(select(Tag).where(Tag.name == tag_name))
-            tag = result.scalar_one_or_none()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-                await db.commit()
-                await db.refresh(tag)
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse_line(line)
+    if buffer.strip():
+        yield parse_line(buffer)
+
+
+async def _ingest_ticket_chunk(db: Session, chunk: list, current_user, known_departments: set) -> list:
+    """
+    Insert one chunk of bulk items with multi-row INSERTs in a single
+    transaction. ``chunk`` holds (index, raw item) pairs; returns per-item results.
+    """
+    from sqlalchemy import select, insert
+    from app.models.ticket import ticket_tag_association
+
+    results = {}
+    ticket_rows = []
+    tag_names_by_ticket = {}
+    pending_fingerprints = {}
+    
+    # Validate items and resolve departments
+    valid_items = []
+    for index, raw in chunk:
+        if isinstance(raw, Exception):
+            results[index] = {"index": index, "status": "error", "error": str(raw)}
+            continue
+        try:
+            ticket_in = TicketCreate.model_validate(raw)
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error", "error": str(e)}
+            continue
+        valid_items.append((index, ticket_in, ticket_in.department_id or current_user.department_id))
+    
+    unknown_departments = {d for _, _, d in valid_items if d is not None and d not in known_departments}
+    if unknown_departments:
+        result = await db.execute(
+            select(DepartmentModel.id).where(DepartmentModel.id.in_(unknown_departments))
+        )
+        known_departments.update(result.scalars().all())
+    
+    # Reserve IDs for the whole chunk in one go; numbers left unused by
+    # duplicates or errors just leave gaps
+    new_ids = iter(await ticket_id_allocator.allocate(len(valid_items))) if valid_items else iter(())
+    
+    for index, ticket_in, department_id in valid_items:
+        if department_id not in known_departments:
+            results[index] = {"index": index, "status": "error", "error": "A valid department ID is required"}
+            continue
+        
+        fingerprint = alert_fingerprint({
+            "title": ticket_in.title,
+            "description": ticket_in.description,
+            "priority": ticket_in.priority.value,
+            "category": ticket_in.category.value,
+            "department_id": department_id,
+            "melt_data": ticket_in.melt_data
+        })
+        duplicate_of = pending_fingerprints.get(fingerprint) or bulk_alert_deduplicator.lookup(fingerprint)
+        if duplicate_of:
+            results[index] = {"index": index, "status": "duplicate", "id": duplicate_of}
+            continue
+        
+        ticket_id = next(new_ids)
+        pending_fingerprints[fingerprint] = ticket_id
+        ticket_rows.append({
+            "id": ticket_id,
+            "title": ticket_in.title,
+            "description": ticket_in.description,
+            "status": TicketStatus.OPEN,
+            "priority": ticket_in.priority,
+            "category": ticket_in.category,
+            "reported_by_id": current_user.id,
+            "department_id": department_id,
+            "sla_deadline": await sla_engine.deadline(db, department_id, ticket_in.priority, ticket_in.category),
+            "melt_data": ticket_in.melt_data,
+            "is_escalated": False
+        })
+        if ticket_in.tags:
+            tag_names_by_ticket[ticket_id] = ticket_in.tags
+        results[index] = {"index": index, "status": "created", "id": ticket_id}
+    
+    if ticket_rows:
+        try:
+            await db.execute(insert(TicketModel), ticket_rows)
             
-            # Manually insert into association table to avoid lazy loading issues
-            from app.models.ticket import ticket_tag_association
-            stmt = ticket_tag_association.insert().values(ticket_id=db_ticket.id, tag_id=tag.id)
-            await db.execute(stmt)
-        await db.commit()
-
-    # Handle file uploads if provided
-    if files:
-        for file in files:
-            folder = f"ticket_attachments/{db_ticket.id}"
-            file_info = await file_service.save_file(file=file, subfolder=folder)
-            attachment = TicketAttachment(
-                file_name=file.filename,
-                file_path=file_info["file_path"],
-                file_type=file_info["mime_type"],
-                file_size=file_info["file_size"],
-                ticket_id=db_ticket.id,
-                uploaded_by_id=current_user.id
-            )
-            db.add(attachment)
-        await db.commit()
+            all_tag_names = [name for names in tag_names_by_ticket.values() for name in names]
+            tag_ids = {tag.name: tag.id for tag in await _upsert_tags(db, all_tag_names)}
+            association_rows = [
+                {"ticket_id": ticket_id, "tag_id": tag_ids[name]}
+                for ticket_id, names in tag_names_by_ticket.items()
+                for name in dict.fromkeys(names) if name in tag_ids
+            ]
+            if association_rows:
+                await db.execute(ticket_tag_association.insert(), association_rows)
+            
+            await db.execute(insert(TicketActivity), [
+                {
+                    "ticket_id": row["id"],
+                    "user_id": current_user.id,
+                    "activity_type": "created",
+                    "details": {"message": "Ticket created", "source": "bulk"}
+                }
+                for row in ticket_rows
+            ])
+            publish(db, "tickets_created", [row["id"] for row in ticket_rows], user_id=current_user.id, source="bulk")
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Bulk ticket chunk failed: {str(e)}")
+            await db.rollback()
+            pending_ids = set(pending_fingerprints.values())
+            for item in results.values():
+                if item.get("id") in pending_ids:
+                    results[item["index"]] = {"index": item["index"], "status": "error", "error": "Insert failed"}
+            return list(results.values())
+        
+        for fingerprint, ticket_id in pending_fingerprints.items():
+            bulk_alert_deduplicator.remember(fingerprint, ticket_id)
+        for row in ticket_rows:
+            _ticket_changed(SimpleNamespace(assigned_to_id=None, **row))
+    
+    return list(results.values())
 
-    # Log activity
-    activity = TicketActivity(
-        ticket_id=ticket_id,
-        user_id=current_user.id,
-        activity_type="created",
-        details={"message": "Ticket created"}
+
+@router.post("/bulk", response_model=TicketBulkResult)
+async def create_tickets_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Create many tickets from a JSON array or an NDJSON stream of TicketCreate items.
+
+    Items are inserted in chunks, one transaction per chunk. Identical alerts
+    seen within the configured window are reported as duplicates of the
+    ticket that was already opened. Returns a result per item.
+
+    A JSON array over TICKET_BULK_MAX_ITEMS is refused with 413 before
+    anything is created. An NDJSON stream is read up to the limit; the first
+    line past it is reported as an error item and the rest are not read, so
+    the client can resend from that index.
+    """
+    chunk_size = settings.TICKET_BULK_CHUNK_SIZE
+    known_departments = set()
+    items = []
+    chunk = []
+    index = 0
+    
+    async for raw in _iter_bulk_items(request):
+        if index >= settings.TICKET_BULK_MAX_ITEMS:
+            # Earlier chunks are committed, so report the overflow rather than failing the request
+            items.append({
+                "index": index,
+                "status": "error",
+                "error": f"Item limit of {settings.TICKET_BULK_MAX_ITEMS} reached; this and later items were not read"
+            })
+            break
+        chunk.append((index, raw))
+        index += 1
+        if len(chunk) >= chunk_size:
+            items.extend(await _ingest_ticket_chunk(db, chunk, current_user, known_departments))
+            chunk = []
+    if chunk:
+        items.extend(await _ingest_ticket_chunk(db, chunk, current_user, known_departments))
+    
+    items.sort(key=lambda item: item["index"])
+    return {
+        "created": sum(1 for item in items if item["status"] == "created"),
+        "duplicates": sum(1 for item in items if item["status"] == "duplicate"),
+        "failed": sum(1 for item in items if item["status"] == "error"),
+        "items": items
+    }
+
+
+def _ticket_ids_param(ticket_ids: List[str]):
+    """Ticket IDs as one array parameter, for ``id = ANY(:ticket_ids)``"""
+    return any_(bindparam("ticket_ids", list(dict.fromkeys(ticket_ids)), type_=ARRAY(String)))
+
+
+async def _resume_sla_clocks(db: Session, rows: list) -> list:
+    """
+    Push back the deadlines of bulk-updated tickets that came off hold by
+    the working time they spent on hold, in one executemany, and return the
+    rows with their new deadlines. Rows need ``department_id``,
+    ``sla_deadline``, ``sla_paused_minutes`` and ``old_sla_paused_at``; the
+    update itself must clear ``sla_paused_at``.
+    """
+    resumed = {}
+    for row in rows:
+        if row.old_sla_paused_at is not None:
+            sla_deadline, paused_minutes = await sla_engine.resume(
+                db, row.department_id, row.sla_deadline, row.old_sla_paused_at
+            )
+            resumed[row.id] = {
+                "b_id": row.id,
+                "b_sla_deadline": sla_deadline,
+                "b_sla_paused_minutes": (row.sla_paused_minutes or 0) + paused_minutes
+            }
+    if not resumed:
+        return rows
+    await db.execute(
+        TicketModel.__table__.update()
+        .where(TicketModel.id == bindparam("b_id"))
+        .values(
+            sla_deadline=bindparam("b_sla_deadline"),
+            sla_paused_minutes=bindparam("b_sla_paused_minutes")
+        ),
+        list(resumed.values())
     )
-    db.add(activity)
-    await db.commit()
+    return [
+        SimpleNamespace(**{**row._asdict(), "sla_deadline": resumed[row.id]["b_sla_deadline"]})
+        if row.id in resumed else row
+        for row in rows
+    ]
 
-    # Re-fetch the ticket with all relationships eagerly loaded for the response
-    from sqlalchemy.orm import selectinload
-    from sqlalchemy import select
+
+# Tickets bulk assignment may move to IN_PROGRESS; resolved and closed ones are skipped
+BULK_ASSIGNABLE_STATUSES = [TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.ESCALATED, TicketStatus.ON_HOLD]
+
+
+@router.post("/bulk/assign", response_model=TicketBulkUpdateResult)
+async def bulk_assign_tickets(
+    assignment: TicketBulkAssign,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(require_engineer)
+):
+    """
+    Assign many tickets to one engineer.
+
+    The assignee is validated once, all tickets are updated by one
+    ``UPDATE ... RETURNING`` and the activity rows are inserted in one batch,
+    all in a single transaction. Resolved and closed tickets are skipped;
+    tickets on hold resume their SLA clock, as with ``assign_ticket``.
+    """
+    from sqlalchemy import select, insert
+
+    # Verify assignee exists and is an engineer
+    assignee_query = await db.execute(UserModel.__table__.select().where(UserModel.id == assignment.assignee_id))
+    assignee = assignee_query.first()
+    if not assignee or assignee.role.value not in ["l1-engineer", "l2-engineer"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid assignee"
+        )
     
+    # Lock the targeted rows and keep their previous assignee for the activity log
+    previous = (
+        select(TicketModel.id, TicketModel.status, TicketModel.assigned_to_id, TicketModel.sla_paused_at)
+        .where(
+            TicketModel.id == _ticket_ids_param(assignment.ticket_ids),
+            TicketModel.status.in_(BULK_ASSIGNABLE_STATUSES)
+        )
+        .with_for_update()
+        .cte("previous")
+    )
     result = await db.execute(
-        select(TicketModel)
-        .options(
-            selectinload(TicketModel.reporter),
-            selectinload(TicketModel.assignee),
-            selectinload(TicketModel.department),
-            selectinload(TicketModel.tags),
-            selectinload(TicketModel.attachments),
-            selectinload(TicketModel.activities)
+        TicketModel.__table__.update()
+        .where(TicketModel.id == previous.c.id)
+        .values(
+            assigned_to_id=assignment.assignee_id,
+            status=TicketStatus.IN_PROGRESS,
+            sla_paused_at=None,
+            version=TicketModel.version + 1
+        )
+        .returning(
+            *_TRACKED_COLUMNS,
+            TicketModel.department_id,
+            TicketModel.sla_paused_minutes,
+            previous.c.status.label("old_status"),
+            previous.c.assigned_to_id.label("old_assignee_id"),
+            previous.c.sla_paused_at.label("old_sla_paused_at")
         )
-        .where(TicketModel.id == db_ticket.id)
     )
-    return result.scalar_one()
+    updated = await _resume_sla_clocks(db, result.all())
+    
+    if updated:
+        await db.execute(insert(TicketActivity), [
+            {
+                "ticket_id": row.id,
+                "user_id": current_user.id,
+                "activity_type": "assigned",
+                "details": {
+                    "old_assignee_id": row.old_assignee_id,
+                    "new_assignee_id": assignment.assignee_id,
+                    "assignee_name": assignee.name,
+                    "source": "bulk"
+                }
+            }
+            for row in updated
+        ])
+        publish(
+            db, "tickets_assigned", [row.id for row in updated], user_id=current_user.id,
+            notify_user_ids=[assignment.assignee_id] + [row.old_assignee_id for row in updated],
+            assignee_id=assignment.assignee_id, assignee_name=assignee.name
+        )
+    await db.commit()
+    for row in updated:
+        _ticket_changed(row, row.old_assignee_id, row.old_status)
+    
+    updated_ids = [row.id for row in updated]
+    updated_set = set(updated_ids)
+    return {
+        "updated": updated_ids,
+        "skipped": [ticket_id for ticket_id in dict.fromkeys(assignment.ticket_ids) if ticket_id not in updated_set]
+    }
 
 
-@router.get("/", response_model=TicketList)
-async def get_tickets(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
-    status: Optional[List[TicketStatus]] = Query(None),
-    priority: Optional[List[TicketPriority]] = Query(None),
-    category: Optional[List[TicketCategory]] = Query(None),
-    assigned_to_me: bool = Query(False),
-    reported_by_me: bool = Query(False),
-    search: Optional[str] = Query(None),
+@router.post("/bulk/transition", response_model=TicketBulkUpdateResult)
+async def bulk_transition_tickets(
+    transition: TicketBulkTransition,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(require_engineer)
 ):
     """
-    Get tickets with filtering and pagination
+    Move many tickets to one status.
+
+    Tickets already in the target status are skipped. Escalating follows
+    ``escalate_ticket`` (needs a reason, unassigns the ticket); resolving
+    stamps ``resolved_at``. Putting tickets ON_HOLD pauses their SLA clock.
     """
-    from sqlalchemy.orm import selectinload
-    from sqlalchemy import select
+    from sqlalchemy import select, insert
 
-    query = select(TicketModel).options(
-        selectinload(TicketModel.reporter),
-        selectinload(TicketModel.assignee),
-        selectinload(TicketModel.department),
-        selectinload(TicketModel.tags),
-        selectinload(TicketModel.attachments),
-        selectinload(TicketModel.activities)
+    values = {"status": transition.status, "version": TicketModel.version + 1}
+    if transition.status == TicketStatus.ESCALATED:
+        if not transition.reason:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A reason is required to escalate tickets"
+            )
+        values.update(escalation_reason=transition.reason, is_escalated=True, assigned_to_id=None)
+    elif transition.status == TicketStatus.RESOLVED:
+        values["resolved_at"] = func.now()
+    # Stop the SLA clock going on hold; coming off hold is handled below
+    values["sla_paused_at"] = func.now() if transition.status == TicketStatus.ON_HOLD else None
+    
+    # Lock the targeted rows and keep their previous status for the activity log
+    previous = (
+        select(TicketModel.id, TicketModel.status, TicketModel.assigned_to_id, TicketModel.sla_paused_at)
+        .where(
+            TicketModel.id == _ticket_ids_param(transition.ticket_ids),
+            TicketModel.status != transition.status
+        )
+        .with_for_update()
+        .cte("previous")
     )
+    result = await db.execute(
+        TicketModel.__table__.update()
+        .where(TicketModel.id == previous.c.id)
+        .values(**values)
+        .returning(
+            *_TRACKED_COLUMNS,
+            TicketModel.department_id,
+            TicketModel.sla_paused_minutes,
+            previous.c.status.label("old_status"),
+            previous.c.assigned_to_id.label("old_assignee_id"),
+            previous.c.sla_paused_at.label("old_sla_paused_at")
+        )
+    )
+    updated = result.all()
     
+    if transition.status != TicketStatus.ON_HOLD:
+        updated = await _resume_sla_clocks(db, updated)
+    
+    if updated:
+        escalating = transition.status == TicketStatus.ESCALATED
+        await db.execute(insert(TicketActivity), [
+            {
+                "ticket_id": row.id,
+                "user_id": current_user.id,
+                "activity_type": "escalated" if escalating else "updated",
+                "details": {"reason": transition.reason, "source": "bulk"} if escalating else {
+                    "changes": {"status": {"old": row.old_status.value, "new": transition.status.value}},
+                    "source": "bulk"
+                }
+            }
+            for row in updated
+        ])
+        publish(
+            db, "tickets_status_changed", [row.id for row in updated], user_id=current_user.id,
+            notify_user_ids=[row.old_assignee_id for row in updated],
+            status=transition.status
+        )
+    await db.commit()
+    for row in updated:
+        _ticket_changed(row, row.old_assignee_id, row.old_status)
+    
+    updated_ids = [row.id for row in updated]
+    updated_set = set(updated_ids)
+    return {
+        "updated": updated_ids,
+        "skipped": [ticket_id for ticket_id in dict.fromkeys(transition.ticket_ids) if ticket_id not in updated_set]
+    }
+
+
+@router.post("/bulk/auto-assign", response_model=TicketAutoAssignResult)
+async def bulk_auto_assign_tickets(
+    request: TicketAutoAssign,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(require_engineer)
+):
+    """
+    Distribute unassigned open tickets across engineers by current workload,
+    most urgent first
+    """
+    assignments = await auto_assign_tickets(
+        db, current_user.id, ticket_ids=request.ticket_ids, limit=request.limit
+    )
+    return {"assignments": assignments}
+
+
+def _apply_ticket_filters(
+    query,
+    current_user,
+    assigned_to_me: bool = False,
+    reported_by_me: bool = False,
+    status: Optional[List[TicketStatus]] = None,
+    priority: Optional[List[TicketPriority]] = None,
+    category: Optional[List[TicketCategory]] = None,
+    search: Optional[str] = None
+):
+    """Apply role-based visibility and listing filters to a ticket query"""
     # Apply filters based on user role
     if current_user.role.value == "end-user":
         # End users can only see their own tickets
@@ -297,46 +784,347 @@ async def get_tickets(
     if category:
         query = query.where(TicketModel.category.in_(category))
     if search:
+        # Full-text match on title/description (GIN index), or a ticket ID
+        # prefix (trigram index)
+        id_prefix = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
         query = query.where(
             or_(
-                TicketModel.title.ilike(f"%{search}%"),
-                TicketModel.description.ilike(f"%{search}%"),
-                TicketModel.id.ilike(f"%{search}%")
+                TicketModel.search_vector.bool_op("@@")(_search_tsquery(search)),
+                TicketModel.id.ilike(f"{id_prefix}%")
             )
         )
+    return query
+
+
+def _search_tsquery(search: str):
+    """Parse free-form search text (quotes, OR, -exclusions) into a tsquery"""
+    # Config inlined as a literal so the statement also renders for EXPLAIN
+    return func.websearch_to_tsquery(literal_column(f"'{TICKET_SEARCH_CONFIG}'"), search)
+
+
+async def _load_recent_activities(db: Session, tickets) -> None:
+    """
+    Attach the latest ``TICKET_RECENT_ACTIVITIES`` activities and the total
+    activity count to loaded tickets, with one query for all of them. The
+    full history is paged through ``GET /tickets/{id}/activities``.
+    """
+    from sqlalchemy import select
+    from sqlalchemy.orm import aliased
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    if not tickets:
+        return
     
-    # Order by priority and creation date
+    ranked = (
+        select(
+            TicketActivity,
+            func.row_number().over(
+                partition_by=TicketActivity.ticket_id,
+                order_by=(TicketActivity.created_at.desc(), TicketActivity.id.desc())
+            ).label("recency"),
+            func.count().over(partition_by=TicketActivity.ticket_id).label("total")
+        )
+        .where(TicketActivity.ticket_id.in_([ticket.id for ticket in tickets]))
+        .subquery()
+    )
+    activity = aliased(TicketActivity, ranked)
+    result = await db.execute(
+        select(activity, ranked.c.total)
+        .where(ranked.c.recency <= settings.TICKET_RECENT_ACTIVITIES)
+        .order_by(ranked.c.ticket_id, ranked.c.recency)
+    )
+    
+    recent = {ticket.id: [] for ticket in tickets}
+    counts = {}
+    for row, total in result.all():
+        recent[row.ticket_id].append(row)
+        counts[row.ticket_id] = total
+    for ticket in tickets:
+        # Fill the relationship without a lazy load of the whole history
+        set_committed_value(ticket, "activities", recent[ticket.id])
+        ticket.activity_count = counts.get(ticket.id, 0)
+
+
+def _listing_cursor_clause(cursor: str):
+    """Keyset predicate for rows after the given (priority, created_at, id) cursor"""
+    try:
+        priority_value, created_at_value, id_value = decode_cursor(cursor, 3)
+        cursor_priority = TicketPriority(priority_value)
+        cursor_created_at = datetime.fromisoformat(created_at_value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    return tuple_(TicketModel.priority, TicketModel.created_at, TicketModel.id) < tuple_(
+        literal(cursor_priority, TicketModel.priority.type),
+        literal(cursor_created_at, TicketModel.created_at.type),
+        literal(str(id_value), TicketModel.id.type)
+    )
+
+
+def _summary_projection(query):
+    """Turn a filtered ticket select into a single joined select of summary columns"""
+    from sqlalchemy.orm import aliased
+
+    reporter = aliased(UserModel)
+    assignee = aliased(UserModel)
+    return query.with_only_columns(
+        TicketModel.id,
+        TicketModel.title,
+        TicketModel.status,
+        TicketModel.priority,
+        TicketModel.category,
+        TicketModel.reported_by_id,
+        TicketModel.assigned_to_id,
+        TicketModel.department_id,
+        TicketModel.created_at,
+        TicketModel.updated_at,
+        TicketModel.resolved_at,
+        TicketModel.sla_deadline,
+        TicketModel.is_escalated,
+        reporter.name.label("reporter_name"),
+        assignee.name.label("assignee_name"),
+        DepartmentModel.name.label("department_name")
+    ).outerjoin(
+        reporter, reporter.id == TicketModel.reported_by_id
+    ).outerjoin(
+        assignee, assignee.id == TicketModel.assigned_to_id
+    ).outerjoin(
+        DepartmentModel, DepartmentModel.id == TicketModel.department_id
+    )
+
+
+@router.get("/", response_model=Union[TicketList, TicketSummaryList])
+async def get_tickets(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; replaces skip"),
+    count: str = Query("exact", regex="^(exact|estimate)$"),
+    view: str = Query("full", regex="^(full|summary)$"),
+    status: Optional[List[TicketStatus]] = Query(None),
+    priority: Optional[List[TicketPriority]] = Query(None),
+    category: Optional[List[TicketCategory]] = Query(None),
+    assigned_to_me: bool = Query(False),
+    reported_by_me: bool = Query(False),
+    search: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Get tickets with filtering and pagination.
+
+    Pages can be addressed either by ``skip`` or by the ``next_cursor`` of the
+    previous page; cursor pages cost the same at any depth. ``view=summary``
+    returns slim rows from one joined SELECT instead of full tickets with
+    every relationship loaded. ``search`` is a full-text query over title and
+    description (web-search syntax) or a ticket ID prefix; matches are ranked
+    by relevance and paged with ``skip``.
+
+    With exact counting the response carries a weak ETag derived from the
+    newest modification time and size of the filtered set; send it back as
+    If-None-Match to get a 304 without the page being loaded.
+    """
+    from sqlalchemy.orm import selectinload
+    from sqlalchemy import select
+
+    # Validate before the ETag check, so a cached ETag cannot turn an invalid request into a 304
+    if cursor and search:
+        # The ``status`` filter parameter shadows fastapi.status here
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor pagination is not supported with search, use skip"
+        )
+    cursor_clause = _listing_cursor_clause(cursor) if cursor else None
+    
+    query = _apply_ticket_filters(
+        select(TicketModel), current_user,
+        assigned_to_me=assigned_to_me, reported_by_me=reported_by_me,
+        status=status, priority=priority, category=category, search=search
+    )
+    
+    etag = None
+    if count == "exact":
+        # One pass gives both the total and the watermark of the filtered set
+        watermark_query = query.with_only_columns(
+            func.max(func.coalesce(TicketModel.updated_at, TicketModel.created_at)),
+            func.count(),
+            maintain_column_froms=True
+        )
+        newest, total = (await db.execute(watermark_query)).one()
+        total_is_estimate = False
+        etag = watermark_etag(
+            newest, total, current_user.id, skip, limit, cursor, view,
+            status, priority, category, assigned_to_me, reported_by_me, search
+        )
+        cache_control_value = cache_control("tickets", current_user.role.value)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, cache_control_value)
+        set_cache_headers(response, etag, cache_control_value)
+    else:
+        total, total_is_estimate = await count_rows(db, query, estimate=True)
+    
+    if cursor_clause is not None:
+        query = query.where(cursor_clause)
+    else:
+        query = query.offset(skip)
+    
+    if search:
+        # Best matches first, title hits outrank description hits
+        query = query.order_by(
+            func.ts_rank_cd(TicketModel.search_vector, _search_tsquery(search)).desc()
+        )
+    
+    # Order by priority and creation date, with id as a unique tiebreaker for the cursor
     query = query.order_by(
         TicketModel.priority.desc(),
-        TicketModel.created_at.desc()
+        TicketModel.created_at.desc(),
+        TicketModel.id.desc()
     )
     
-    total_query = await db.execute(query)
-    total = len(total_query.fetchall())
+    if view == "summary":
+        query = _summary_projection(query)
+    else:
+        query = query.options(
+            selectinload(TicketModel.reporter),
+            selectinload(TicketModel.assignee),
+            selectinload(TicketModel.department),
+            selectinload(TicketModel.tags),
+            selectinload(TicketModel.attachments)
+        )
+    
+    # Fetch one extra row to know whether there is a next page
+    result = await db.execute(query.limit(limit + 1))
+    tickets = result.all() if view == "summary" else result.scalars().all()
+    
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        if not search:
+            last = tickets[-1]
+            next_cursor = encode_cursor([last.priority, last.created_at, last.id])
     
-    result = await db.execute(query.offset(skip).limit(limit))
-    tickets = result.scalars().all()
+    if view != "summary":
+        await _load_recent_activities(db, tickets)
     
     return {
         "tickets": tickets,
         "total": total,
-        "page": skip // limit + 1,
-        "size": limit
+        "page": None if cursor else skip // limit + 1,
+        "size": limit,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
     }
 
 
+def _export_value(value):
+    """Plain JSON/CSV representation of a ticket column value"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+@router.get("/export")
+async def export_tickets(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    status: Optional[List[TicketStatus]] = Query(None),
+    priority: Optional[List[TicketPriority]] = Query(None),
+    category: Optional[List[TicketCategory]] = Query(None),
+    assigned_to_me: bool = Query(False),
+    reported_by_me: bool = Query(False),
+    search: Optional[str] = Query(None),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Export tickets as NDJSON or CSV.
+
+    Takes the same filters and role-based visibility as the ticket listing.
+    Rows are streamed from a server-side cursor in batches, so memory use
+    does not grow with the size of the export.
+    """
+    from sqlalchemy import select
+
+    query = _apply_ticket_filters(
+        select(TicketModel), current_user,
+        assigned_to_me=assigned_to_me, reported_by_me=reported_by_me,
+        status=status, priority=priority, category=category, search=search
+    )
+    query = _summary_projection(query).add_columns(
+        TicketModel.description,
+        TicketModel.resolution
+    ).order_by(TicketModel.created_at, TicketModel.id)
+    batch_size = settings.TICKET_EXPORT_BATCH_SIZE
+
+    async def generate_rows():
+        # The request-scoped session is closed before the body is sent, so the
+        # stream owns its session for as long as the cursor is open
+        async with get_db_context() as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            columns = list(result.keys())
+            
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                async for rows in result.partitions(batch_size):
+                    writer.writerows([_export_value(value) for value in row] for row in rows)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                async for rows in result.partitions(batch_size):
+                    yield "".join(
+                        json.dumps({column: _export_value(value) for column, value in zip(columns, row)}) + "\n"
+                        for row in rows
+                    )
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"tickets-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        generate_rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{ticket_id}", response_model=Ticket)
 async def get_ticket(
     ticket_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
-    Get ticket by ID
+    Get ticket by ID. ``activities`` holds only the most recent entries and
+    ``activity_count`` the total; page through the rest with
+    ``GET /tickets/{ticket_id}/activities``.
+
+    Send the ETag of a previous read as If-None-Match to get a 304 when the
+    ticket version is unchanged; only the version is read in that case.
     """
     from sqlalchemy.orm import selectinload
     from sqlalchemy import select
 
+    cache_control_value = cache_control("tickets", current_user.role.value)
+    if if_none_match:
+        head_query = await db.execute(
+            select(TicketModel.version, TicketModel.reported_by_id).where(TicketModel.id == ticket_id)
+        )
+        head = head_query.first()
+        # Missing or forbidden tickets fall through to the full path for the error
+        if head and (current_user.role.value != "end-user" or head.reported_by_id == current_user.id):
+            etag = version_etag(head.version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, cache_control_value)
+
     result = await db.execute(
         select(TicketModel)
         .options(
@@ -344,8 +1132,7 @@ async def get_ticket(
             selectinload(TicketModel.assignee),
             selectinload(TicketModel.department),
             selectinload(TicketModel.tags),
-            selectinload(TicketModel.attachments),
-            selectinload(TicketModel.activities)
+            selectinload(TicketModel.attachments)
         )
         .where(TicketModel.id == ticket_id)
     )
@@ -365,18 +1152,88 @@ async def get_ticket(
             detail="Not enough permissions"
         )
     
+    await _load_recent_activities(db, [ticket])
+    set_cache_headers(response, version_etag(ticket.version), cache_control_value)
     return ticket
 
 
+@router.get("/{ticket_id}/activities", response_model=TicketActivityPage)
+async def get_ticket_activities(
+    ticket_id: str,
+    activity_type: Optional[List[str]] = Query(None, description="Only these activity types (repeatable)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Activity timeline of a ticket, newest first, paged by a keyset cursor on
+    (created_at, id)
+    """
+    from sqlalchemy import select
+
+    ticket_query = await db.execute(select(TicketModel.reported_by_id).where(TicketModel.id == ticket_id))
+    reported_by_id = ticket_query.scalar_one_or_none()
+    if reported_by_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found"
+        )
+    if current_user.role.value == "end-user" and reported_by_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    query = select(TicketActivity).where(TicketActivity.ticket_id == ticket_id)
+    if activity_type:
+        query = query.where(TicketActivity.activity_type.in_(activity_type))
+    if cursor:
+        try:
+            created_at_value, id_value = decode_cursor(cursor, 2)
+            cursor_created_at = datetime.fromisoformat(created_at_value)
+            cursor_id = int(id_value)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(
+            tuple_(TicketActivity.created_at, TicketActivity.id) < tuple_(
+                literal(cursor_created_at, TicketActivity.created_at.type),
+                literal(cursor_id, TicketActivity.id.type)
+            )
+        )
+    
+    # Fetch one extra row to know whether there is a next page
+    result = await db.execute(
+        query.order_by(TicketActivity.created_at.desc(), TicketActivity.id.desc()).limit(limit + 1)
+    )
+    activities = result.scalars().all()
+    
+    next_cursor = None
+    if len(activities) > limit:
+        activities = activities[:limit]
+        next_cursor = encode_cursor([activities[-1].created_at, activities[-1].id])
+    
+    return {"activities": activities, "next_cursor": next_cursor}
+
+
 @router.put("/{ticket_id}", response_model=Ticket)
 async def update_ticket(
     ticket_id: str,
     ticket_update: TicketUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
-    Update ticket
+    Update ticket.
+
+    Changed fields are written with a single UPDATE ... RETURNING guarded by
+    the ticket version. Send the ETag of a previous read as If-Match to get a
+    412 instead of overwriting someone else's change.
     """
     ticket_query = await db.execute(TicketModel.__table__.select().where(TicketModel.id == ticket_id))
     ticket = ticket_query.first()
@@ -398,36 +1255,73 @@ async def update_ticket(
             detail="Not enough permissions"
         )
     
-    # Track changes for activity log
+    if if_match:
+        try:
+            expected_version = parse_if_match(if_match)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Malformed If-Match header"
+            )
+        if expected_version is not None and expected_version != ticket.version:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Ticket has been modified since it was read"
+            )
+    
+    # Diff in memory; track changes for activity log
     changes = {}
+    values = {}
     update_data = ticket_update.dict(exclude_unset=True)
     
     for field, value in update_data.items():
         old_value = getattr(ticket, field)
         if old_value != value:
             changes[field] = {"old": old_value, "new": value}
-            await db.execute(TicketModel.__table__.update().where(TicketModel.id == ticket_id).values(**{field: value}))
+            values[field] = value
+    
+    if not values:
+        response.headers["ETag"] = version_etag(ticket.version)
+        return ticket
     
     # Set resolved timestamp if status changed to resolved
     if ticket_update.status == TicketStatus.RESOLVED and ticket.status != TicketStatus.RESOLVED:
-        await db.execute(TicketModel.__table__.update().where(TicketModel.id == ticket_id).values(resolved_at=datetime.utcnow()))
-    
-    await db.commit()
-    ticket_query = await db.execute(TicketModel.__table__.select().where(TicketModel.id == ticket_id))
-    ticket = ticket_query.first()
+        values["resolved_at"] = datetime.utcnow()
+    if "status" in values:
+        values.update(await _sla_pause_values(db, ticket, values["status"]))
     
-    # Log activity if there were changes
-    if changes:
-        activity = TicketActivity(
-            ticket_id=ticket_id,
-            user_id=current_user.id,
-            activity_type="updated",
-            details={"changes": changes}
+    # The version predicate also guards the window between our read and this write
+    result = await db.execute(
+        TicketModel.__table__.update()
+        .where(TicketModel.id == ticket_id, TicketModel.version == ticket.version)
+        .values(**values, version=TicketModel.version + 1)
+        .returning(*TicketModel.__table__.columns)
+    )
+    updated_ticket = result.first()
+    if updated_ticket is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ticket was modified concurrently, reload and retry"
         )
-        db.add(activity)
-        await db.commit()
     
-    return ticket
+    activity = TicketActivity(
+        ticket_id=ticket_id,
+        user_id=current_user.id,
+        activity_type="updated",
+        details={"changes": changes}
+    )
+    db.add(activity)
+    publish(
+        db, "ticket_updated", [ticket_id], user_id=current_user.id,
+        notify_user_ids=[ticket.assigned_to_id, updated_ticket.assigned_to_id],
+        changes=changes
+    )
+    await db.commit()
+    _ticket_changed(updated_ticket, ticket.assigned_to_id, ticket.status)
+    
+    response.headers["ETag"] = version_etag(updated_ticket.version)
+    return updated_ticket
 
 
 @router.post("/{ticket_id}/attachments", response_model=Ticket)
@@ -474,6 +1368,12 @@ async def upload_attachment(
         )
         db.add(attachment)
 
+    # Attachments are part of the ticket payload, so they change its ETag
+    await db.execute(
+        TicketModel.__table__.update()
+        .where(TicketModel.id == ticket_id)
+        .values(version=TicketModel.version + 1)
+    )
     await db.commit()
     ticket_query = await db.execute(TicketModel.__table__.select().where(TicketModel.id == ticket_id))
     ticket = ticket_query.first()
@@ -512,23 +1412,28 @@ async def assign_ticket(
         )
     
     old_assignee_id = ticket.assigned_to_id
-    await db.execute(TicketModel.__table__.update().where(TicketModel.id == ticket_id).values(assigned_to_id=assignee_id, status=TicketStatus.IN_PROGRESS))
-    
-    await db.commit()
+    sla_values = await _sla_pause_values(db, ticket, TicketStatus.IN_PROGRESS)
+    result = await db.execute(TicketModel.__table__.update().where(TicketModel.id == ticket_id).values(assigned_to_id=assignee_id, status=TicketStatus.IN_PROGRESS, version=TicketModel.version + 1, **sla_values).returning(*_TRACKED_COLUMNS))
+    updated_ticket = result.first()
     
     # Log activity
-    activity = TicketActivity(
+    details = {
+        "old_assignee_id": old_assignee_id,
+        "new_assignee_id": assignee_id,
+        "assignee_name": assignee.name
+    }
+    db.add(TicketActivity(
         ticket_id=ticket_id,
         user_id=current_user.id,
         activity_type="assigned",
-        details={
-            "old_assignee_id": old_assignee_id,
-            "new_assignee_id": assignee_id,
-            "assignee_name": assignee.name
-        }
+        details=details
+    ))
+    publish(
+        db, "ticket_assigned", [ticket_id], user_id=current_user.id,
+        notify_user_ids=[assignee_id, old_assignee_id], **details
     )
-    db.add(activity)
     await db.commit()
+    _ticket_changed(updated_ticket, old_assignee_id, ticket.status)
     
     return {"message": "Ticket assigned successfully"}
 
@@ -551,19 +1456,23 @@ async def escalate_ticket(
             detail="Ticket not found"
         )
     
-    await db.execute(TicketModel.__table__.update().where(TicketModel.id == ticket_id).values(status=TicketStatus.ESCALATED, escalation_reason=reason, is_escalated=True, assigned_to_id=None))
-    
-    await db.commit()
+    sla_values = await _sla_pause_values(db, ticket, TicketStatus.ESCALATED)
+    result = await db.execute(TicketModel.__table__.update().where(TicketModel.id == ticket_id).values(status=TicketStatus.ESCALATED, escalation_reason=reason, is_escalated=True, assigned_to_id=None, version=TicketModel.version + 1, **sla_values).returning(*_TRACKED_COLUMNS))
+    updated_ticket = result.first()
     
     # Log activity
-    activity = TicketActivity(
+    db.add(TicketActivity(
         ticket_id=ticket_id,
         user_id=current_user.id,
         activity_type="escalated",
         details={"reason": reason}
+    ))
+    publish(
+        db, "ticket_escalated", [ticket_id], user_id=current_user.id,
+        notify_user_ids=[ticket.assigned_to_id], reason=reason
     )
-    db.add(activity)
     await db.commit()
+    _ticket_changed(updated_ticket, ticket.assigned_to_id, ticket.status)
     
     return {"message": "Ticket escalated successfully"}
 
@@ -576,7 +1485,19 @@ async def get_ticket_stats(
     """
     Get ticket statistics overview
     """
-    query = TicketModel.__table__.select()
+    from sqlalchemy import select, func
+
+    resolution_hours = func.extract("epoch", TicketModel.resolved_at - TicketModel.created_at) / 3600
+    
+    # One aggregate pass: per-status counts plus the pieces needed for
+    # resolution time and SLA compliance of the resolved statuses
+    query = select(
+        TicketModel.status,
+        func.count().label("ticket_count"),
+        func.count(TicketModel.resolved_at).label("resolved_count"),
+        func.coalesce(func.sum(resolution_hours), 0).label("resolution_hours"),
+        func.count().filter(TicketModel.resolved_at <= TicketModel.sla_deadline).label("sla_met_count")
+    ).group_by(TicketModel.status)
     
     # Filter by user role
     if current_user.role.value == "end-user":
@@ -584,28 +1505,27 @@ async def get_ticket_stats(
     elif current_user.role.value in ["l1-engineer", "l2-engineer"]:
         query = query.where(TicketModel.assigned_to_id == current_user.id)
     
-    total_tickets_query = await db.execute(query)
-    total_tickets = len(total_tickets_query.fetchall())
-    open_tickets_query = await db.execute(query.where(TicketModel.status == TicketStatus.OPEN))
-    open_tickets = len(open_tickets_query.fetchall())
-    in_progress_tickets_query = await db.execute(query.where(TicketModel.status == TicketStatus.IN_PROGRESS))
-    in_progress_tickets = len(in_progress_tickets_query.fetchall())
-    resolved_tickets_query = await db.execute(query.where(TicketModel.status == TicketStatus.RESOLVED))
-    resolved_tickets = len(resolved_tickets_query.fetchall())
-    closed_tickets_query = await db.execute(query.where(TicketModel.status == TicketStatus.CLOSED))
-    closed_tickets = len(closed_tickets_query.fetchall())
-    escalated_tickets_query = await db.execute(query.where(TicketModel.status == TicketStatus.ESCALATED))
-    escalated_tickets = len(escalated_tickets_query.fetchall())
+    result = await db.execute(query)
+    rows = result.all()
+    
+    by_status = {row.status: row.ticket_count for row in rows}
+    resolved_rows = [row for row in rows if row.status in RESOLVED_STATUSES]
+    resolved_count = sum(row.resolved_count for row in resolved_rows)
+    resolution_hours_total = sum(float(row.resolution_hours) for row in resolved_rows)
+    sla_met_count = sum(row.sla_met_count for row in resolved_rows)
+    
+    avg_resolution_time = resolution_hours_total / resolved_count if resolved_count else 0
+    sla_compliance_rate = sla_met_count / resolved_count * 100 if resolved_count else 100
     
     return {
-        "total_tickets": total_tickets,
-        "open_tickets": open_tickets,
-        "in_progress_tickets": in_progress_tickets,
-        "resolved_tickets": resolved_tickets,
-        "closed_tickets": closed_tickets,
-        "escalated_tickets": escalated_tickets,
-        "avg_resolution_time": 2.5,  # Mock data - calculate from actual data
-        "sla_compliance_rate": 94.5   # Mock data - calculate from actual data
+        "total_tickets": sum(by_status.values()),
+        "open_tickets": by_status.get(TicketStatus.OPEN, 0),
+        "in_progress_tickets": by_status.get(TicketStatus.IN_PROGRESS, 0),
+        "resolved_tickets": sum(by_status.get(status, 0) for status in RESOLVED_STATUSES),
+        "closed_tickets": by_status.get(TicketStatus.CLOSED, 0),
+        "escalated_tickets": by_status.get(TicketStatus.ESCALATED, 0),
+        "avg_resolution_time": round(avg_resolution_time, 2),
+        "sla_compliance_rate": round(sla_compliance_rate, 1)
     }
 
 
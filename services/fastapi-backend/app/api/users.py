@@ -6,9 +6,11 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.api.dependencies import get_db, get_current_user, require_manager, require_admin
-from app.schemas.user import User, UserCreate, UserUpdate, UserList, UserWithStats, Department as DepartmentSchema, DepartmentBase
+from app.schemas.user import User, UserCreate, UserUpdate, UserList, UserWithStats, Department as DepartmentSchema, DepartmentBase, BusinessHours, BusinessHoursUpdateResult
 from app.models.user import User as UserModel, Department as DepartmentModel
 from app.core.security import get_password_hash
+from app.services.sla_engine import BusinessCalendar, sla_engine
+from app.services.sla_monitor import sla_monitor
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -128,13 +130,13 @@ async def get_user_stats(
         )
     
     # Calculate stats (simplified - in production use proper analytics)
-    from app.models.ticket import Ticket, TicketStatus
+    from app.models.ticket import Ticket, RESOLVED_STATUSES
     
     assigned_tickets_query = await db.execute(Ticket.__table__.select().where(Ticket.assigned_to_id == user_id))
     assigned_tickets = len(assigned_tickets_query.fetchall())
     resolved_tickets_query = await db.execute(Ticket.__table__.select().where(
         Ticket.assigned_to_id == user_id,
-        Ticket.status == TicketStatus.RESOLVED
+        Ticket.status.in_(RESOLVED_STATUSES)
     ))
     resolved_tickets = len(resolved_tickets_query.fetchall())
     
@@ -183,4 +185,49 @@ async def create_department(
     db.add(db_department)
     await db.commit()
     await db.refresh(db_department)
-    return db_department
\ No newline at end of file
+    return db_department
+
+@router.put("/departments/{department_id}/business-hours", response_model=BusinessHoursUpdateResult)
+async def update_department_business_hours(
+    department_id: int,
+    business_hours: BusinessHours,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(require_admin)
+):
+    """
+    Set a department's SLA calendar and recompute the deadlines of its
+    unresolved tickets. Only accessible by admin users.
+    """
+    department_query = await db.execute(DepartmentModel.__table__.select().where(DepartmentModel.id == department_id))
+    if not department_query.first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Department not found"
+        )
+
+    config = business_hours.model_dump()
+    try:
+        BusinessCalendar.from_config(config)
+    except (ValueError, KeyError) as e:
+        # ZoneInfoNotFoundError is a KeyError
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid business hours: {str(e)}"
+        )
+
+    await db.execute(
+        DepartmentModel.__table__.update()
+        .where(DepartmentModel.id == department_id)
+        .values(business_hours=config)
+    )
+    sla_engine.invalidate(department_id)
+    tickets = await sla_engine.recompute_department(db, department_id)
+    await db.commit()
+
+    for ticket in tickets:
+        sla_monitor.track(
+            ticket["id"], ticket["title"], ticket["priority"], ticket["sla_deadline"],
+            ticket["assigned_to_id"], ticket["status"]
+        )
+
+    return {"department_id": department_id, "tickets_recomputed": len(tickets)}
@@ -67,6 +67,68 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = Field(default=None, env="SMTP_USER")
     SMTP_PASSWORD: Optional[str] = Field(default=None, env="SMTP_PASSWORD")
     
+    # Ticket IDs: numbers reserved per sequence round trip, and how often the
+    # sequences of past days are dropped (0 disables)
+    TICKET_ID_BLOCK_SIZE: int = 50
+    TICKET_ID_CLEANUP_INTERVAL_SECONDS: int = 86400
+    
+    # Bulk ticket ingestion
+    TICKET_BULK_MAX_ITEMS: int = 10000
+    TICKET_BULK_CHUNK_SIZE: int = 500
+    TICKET_BULK_DEDUPE_WINDOW_SECONDS: int = 300  # 0 disables alert de-duplication
+
+    # Activities embedded in ticket payloads; the rest is paged via /tickets/{id}/activities
+    TICKET_RECENT_ACTIVITIES: int = 20
+
+    # Ticket export: rows fetched per server-side cursor round trip
+    TICKET_EXPORT_BATCH_SIZE: int = 1000
+
+    # Engineer workload index: seconds between reloads from the database (0 disables)
+    WORKLOAD_RECONCILE_INTERVAL_SECONDS: int = 300
+
+    # SLA monitor: how long before the deadline assignees get a warning, and seconds
+    # between reloads of the tracked deadlines from the database (0 disables)
+    SLA_WARNING_MINUTES: int = 60
+    SLA_MONITOR_RECONCILE_SECONDS: int = 300
+
+    # Outbox dispatcher: events per delivery transaction, fallback poll interval,
+    # attempts before an event is parked, how long delivered events are kept and
+    # how often the expired ones are purged
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: int = 30
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETENTION_HOURS: int = 72
+    OUTBOX_PURGE_SECONDS: int = 600
+    # Live fan-out to sockets on every replica: seconds to wait for an event id
+    # skipped by a still-open transaction before treating it as rolled back
+    OUTBOX_LIVE_GAP_SECONDS: int = 60
+
+    # Ticket change feed: messages buffered per subscriber before it is told to
+    # resync, most events replayed on reconnect, and SSE keepalive interval
+    FEED_QUEUE_SIZE: int = 256
+    FEED_REPLAY_LIMIT: int = 500
+    FEED_HEARTBEAT_SECONDS: int = 25
+
+    # Monthly partitions of the history tables (ticket activities, chat, analytics):
+    # months created ahead, months kept attached (0 keeps everything) and how
+    # often maintenance runs
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 0
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 86400
+
+    # Analytics rollups: seconds between incremental runs (0 disables) and how far
+    # before the watermark each run looks again, for transactions committed late
+    ROLLUP_INTERVAL_SECONDS: int = 300
+    ROLLUP_OVERLAP_SECONDS: int = 300
+    # Relative accuracy of the resolution-time quantile sketches kept in the rollups;
+    # changing it calls for a rollup rebuild
+    ROLLUP_SKETCH_ACCURACY: float = 0.01
+
+    # In-memory ticket snapshots behind ticket analytics: maximum age in seconds
+    # (on top of invalidation by ticket writes) and departments kept
+    ANALYTICS_SNAPSHOT_TTL_SECONDS: int = 300
+    ANALYTICS_SNAPSHOT_MAX_ENTRIES: int = 32
+    
     # Logging
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     
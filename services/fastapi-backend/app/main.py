@@ -16,7 +16,7 @@ from fastapi.openapi.utils import get_openapi
 from contextlib import asynccontextmanager
 
 # Import API routers
-from app.api import auth, users, tickets, chat, knowledge, analytics, transition
+from app.api import auth, users, tickets, chat, knowledge, analytics, transition, feed
 
 # Configure logging BEFORE any other imports that might use logging
 def setup_logging():
@@ -81,6 +81,30 @@ async def lifespan(app: FastAPI):
             logger.error("✗ Database connection failed")
             raise Exception("Database connection failed")
         
+        # Monthly partitions of the history tables
+        from app.services.partitions import partition_manager
+        await partition_manager.start(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+        
+        # Past days' ticket ID sequences
+        from app.utils.ticket_ids import ticket_id_allocator
+        await ticket_id_allocator.start(settings.TICKET_ID_CLEANUP_INTERVAL_SECONDS)
+        
+        # Engineer workload index
+        from app.services.workload_index import workload_index
+        await workload_index.start(settings.WORKLOAD_RECONCILE_INTERVAL_SECONDS)
+        
+        # SLA breach notifications
+        from app.services.sla_monitor import sla_monitor
+        await sla_monitor.start()
+        
+        # Domain event delivery
+        from app.services.outbox import outbox_dispatcher
+        await outbox_dispatcher.start()
+        
+        # Analytics rollups
+        from app.services.rollups import rollup_job
+        await rollup_job.start(settings.ROLLUP_INTERVAL_SECONDS)
+        
         logger.info("✓ Initialization completed successfully")
         
     except Exception as e:
@@ -93,6 +117,18 @@ async def lifespan(app: FastAPI):
     logger.info("=== APPLICATION SHUTDOWN ===")
     logger.info("Shutting down application...")
     try:
+        from app.services.workload_index import workload_index
+        from app.services.sla_monitor import sla_monitor
+        from app.services.outbox import outbox_dispatcher
+        from app.services.partitions import partition_manager
+        from app.services.rollups import rollup_job
+        from app.utils.ticket_ids import ticket_id_allocator
+        await rollup_job.stop()
+        await outbox_dispatcher.stop()
+        await sla_monitor.stop()
+        await workload_index.stop()
+        await partition_manager.stop()
+        await ticket_id_allocator.stop()
         await close_db()
         logger.info("✓ Database connections closed")
     except Exception as e:
@@ -161,6 +197,9 @@ logger.info("✓ Tickets router included")
 app.include_router(chat.router, prefix="/api/v1")
 logger.info("✓ Chat router included")
 
+app.include_router(feed.router, prefix="/api/v1")
+logger.info("✓ Feed router included")
+
 app.include_router(knowledge.router, prefix="/api/v1")
 logger.info("✓ Knowledge router included")
 
@@ -1,21 +1,23 @@
 """
 Analytics and metrics models
 """
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Float, JSON, Boolean, Table
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Float, JSON, Boolean, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.base import monthly_partitioned, add_default_partition
 
 
 class AnalyticsEvent(Base):
     __tablename__ = "analytics_events"
+    __table_args__ = monthly_partitioned("timestamp")
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     event_type = Column(String, nullable=False)  # ticket_created, ticket_resolved, etc.
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     ticket_id = Column(String, ForeignKey("tickets.id"), nullable=True)
     properties = Column(JSON, nullable=True)  # Event-specific data
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key
 
 
 class SystemMetric(Base):
@@ -31,7 +33,15 @@ class SystemMetric(Base):
 
 
 class PerformanceMetric(Base):
+    """
+    Ticket rollups (see app.services.rollups): one row per metric, period
+    bucket and either department (user_id NULL) or engineer (department_id
+    NULL)
+    """
     __tablename__ = "performance_metrics"
+    __table_args__ = (
+        Index("ix_performance_metrics_period", "time_period", "start_date"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -50,7 +60,14 @@ class PerformanceMetric(Base):
 
 
 class SLAReport(Base):
+    """
+    SLA outcomes of the tickets resolved in a period bucket, per department
+    (see app.services.rollups)
+    """
     __tablename__ = "sla_reports"
+    __table_args__ = (
+        Index("ix_sla_reports_period", "time_period", "report_date"),
+    )
 
     id = Column(Integer, primary_key=True)
     report_date = Column(DateTime(timezone=True), nullable=False)
@@ -70,10 +87,22 @@ class SLAReport(Base):
     department = relationship("Department")
 
 
+class RollupWatermark(Base):
+    """
+    How far an incremental rollup has processed its source rows
+    """
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class UserActivityLog(Base):
     __tablename__ = "user_activity_logs"
+    __table_args__ = monthly_partitioned("timestamp")
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     activity_type = Column(String, nullable=False)  # login, ticket_update, etc.
     resource_type = Column(String, nullable=True)  # ticket, knowledge_article, etc.
@@ -81,12 +110,16 @@ class UserActivityLog(Base):
     details = Column(JSON, nullable=True)
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key
 
     # Relationships
     user = relationship("User")
 
 
+add_default_partition(AnalyticsEvent.__table__)
+add_default_partition(UserActivityLog.__table__)
+
+
 class DashboardWidget(Base):
     __tablename__ = "dashboard_widgets"
 
@@ -1 +1,20 @@
-from app.core.database import Base
\ No newline at end of file
+from sqlalchemy import DDL, event
+from app.core.database import Base
+
+
+def monthly_partitioned(column: str) -> dict:
+    """
+    Table options for an append-only table range-partitioned by month on
+    ``column``, which must be part of the primary key. Monthly partitions
+    are created ahead of time by ``app.services.partitions``; the DEFAULT
+    partition added on create catches rows no partition covers.
+    """
+    return {"postgresql_partition_by": f"RANGE ({column})"}
+
+
+def add_default_partition(table) -> None:
+    event.listen(
+        table,
+        "after_create",
+        DDL("CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT").execute_if(dialect="postgresql")
+    )
\ No newline at end of file
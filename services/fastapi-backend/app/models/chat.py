@@ -5,21 +5,26 @@ from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Bool
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.base import monthly_partitioned, add_default_partition
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = monthly_partitioned("created_at")
 
-    id = Column(Integer, primary_key=True)
-    ticket_id = Column(String, ForeignKey("tickets.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticket_id = Column(String, ForeignKey("tickets.id"), nullable=False, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Null for AI messages
     message = Column(Text, nullable=False)
     is_ai_message = Column(Boolean, default=False)
     message_type = Column(String, default="text")  # text, image, file, system
     metainfo = Column(String, nullable=True)  # JSON string for additional data
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key
     is_internal = Column(Boolean, default=False)  # Internal notes vs customer-facing
 
     # Relationships
     ticket = relationship("Ticket", back_populates="chat_messages")
     sender = relationship("User", back_populates="chat_messages")
+
+
+add_default_partition(ChatMessage.__table__)
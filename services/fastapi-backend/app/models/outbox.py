@@ -0,0 +1,47 @@
+"""
+Transactional outbox for domain events
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, JSON, Index, DDL, event, text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+OUTBOX_CHANNEL = "outbox_events"
+
+
+class OutboxEvent(Base):
+    """
+    A domain event written in the same transaction as the change it
+    describes, and delivered to consumers by the outbox dispatcher after
+    commit
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event_type = Column(String, nullable=False)  # ticket_created, tickets_assigned, etc.
+    user_id = Column(Integer, nullable=True)  # Who made the change
+    payload = Column(JSON, nullable=False)  # ticket_ids, notify_user_ids and event-specific data
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # The dispatcher only ever scans undelivered events
+        Index("ix_outbox_events_pending", "id", postgresql_where=text("processed_at IS NULL")),
+    )
+
+
+# Wake the dispatcher once per inserting statement; NOTIFY is delivered on commit
+event.listen(OutboxEvent.__table__, "after_create", DDL(f"""
+    CREATE OR REPLACE FUNCTION notify_outbox_events() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{OUTBOX_CHANNEL}', '');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""))
+event.listen(OutboxEvent.__table__, "after_create", DDL("""
+    CREATE TRIGGER outbox_events_notify
+    AFTER INSERT ON outbox_events
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox_events()
+"""))
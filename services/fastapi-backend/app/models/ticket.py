@@ -1,18 +1,27 @@
 """
 Ticket-related models
 """
-from sqlalchemy import Column, String, Integer, Enum, DateTime, ForeignKey, Text, Table, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Enum, DateTime, ForeignKey, Text, Table, JSON, Boolean, Float, Computed, Index, DDL, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.base import monthly_partitioned, add_default_partition
 import enum
 
 
+# Text search configuration used for the tickets.search_vector column and queries
+TICKET_SEARCH_CONFIG = "english"
+
+# pg_trgm backs the trigram index used for ticket ID lookups
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
 # Association table for ticket tags
 ticket_tag_association = Table(
     "ticket_tag_association",
     Base.metadata,
-    Column("ticket_id", String, ForeignKey("tickets.id")),
+    Column("ticket_id", String, ForeignKey("tickets.id"), index=True),
     Column("tag_id", Integer, ForeignKey("tags.id"))
 )
 
@@ -26,6 +35,11 @@ class TicketStatus(str, enum.Enum):
     ON_HOLD = "ON_HOLD"
 
 
+# Statuses counted as resolved by every ticket statistic (overview, dashboard,
+# trends, snapshots, rollups); CLOSED tickets are counted separately
+RESOLVED_STATUSES = [TicketStatus.RESOLVED]
+
+
 class TicketPriority(str, enum.Enum):
     LOW = "LOW"
     MEDIUM = "MEDIUM"
@@ -59,12 +73,44 @@ class Ticket(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     sla_deadline = Column(DateTime(timezone=True), nullable=False)
+    sla_paused_at = Column(DateTime(timezone=True), nullable=True)  # Set while ON_HOLD
+    sla_paused_minutes = Column(Float, nullable=False, default=0, server_default="0")  # Working minutes spent ON_HOLD
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=False)
     resolution = Column(Text, nullable=True)
     escalation_reason = Column(Text, nullable=True)
     melt_data = Column(JSON, nullable=True)  # Metrics, Events, Logs, Traces data
     customer_satisfaction = Column(Integer, nullable=True)  # 1-5 rating
     is_escalated = Column(Boolean, default=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on every update, used for ETags
+    # Maintained by Postgres; title matches rank above description matches
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{TICKET_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{TICKET_SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
+
+    __table_args__ = (
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tickets_id_trgm", "id", postgresql_using="gin", postgresql_ops={"id": "gin_trgm_ops"}),
+        # Engineer workload counts and "assigned to me" listings
+        Index("ix_tickets_assigned_to_status", "assigned_to_id", "status"),
+        # SLA breach scans only ever look at tickets still being worked on
+        Index(
+            "ix_tickets_active_sla_deadline", "sla_deadline",
+            postgresql_where=text("status IN ('OPEN', 'IN_PROGRESS')")
+        ),
+        # Ticket listing order, overall and for an end user's own tickets
+        Index("ix_tickets_listing", "priority", "created_at", "id"),
+        Index("ix_tickets_reporter_listing", "reported_by_id", "priority", "created_at", "id"),
+        # Analytics time windows
+        Index("ix_tickets_created_at", "created_at"),
+        Index("ix_tickets_resolved_at", "resolved_at", postgresql_where=text("resolved_at IS NOT NULL")),
+        # Incremental analytics rollups pick up tickets changed since their watermark
+        Index("ix_tickets_changed_at", func.coalesce(updated_at, created_at)),
+    )
 
     # Relationships
     reporter = relationship("User", back_populates="reported_tickets", foreign_keys=[reported_by_id])
@@ -106,14 +152,22 @@ class TicketAttachment(Base):
 
 class TicketActivity(Base):
     __tablename__ = "ticket_activities"
+    __table_args__ = (
+        # Serves the per-ticket timeline (newest first, keyset on created_at, id)
+        Index("ix_ticket_activities_timeline", "ticket_id", "created_at", "id"),
+        monthly_partitioned("created_at"),
+    )
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     ticket_id = Column(String, ForeignKey("tickets.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     activity_type = Column(String, nullable=False)  # e.g., "status_change", "comment", "assignment"
     details = Column(JSON, nullable=False)  # Store activity details as JSON
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key
 
     # Relationships
     ticket = relationship("Ticket", back_populates="activities")
     user = relationship("User", back_populates="ticket_activities")
+
+
+add_default_partition(TicketActivity.__table__)
@@ -1,7 +1,7 @@
 """
 User and Department models
 """
-from sqlalchemy import Column, String, Integer, Boolean, Enum, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, Enum, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -23,6 +23,7 @@ class Department(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
     description = Column(Text, nullable=True)
+    business_hours = Column(JSON, nullable=True)  # SLA calendar, see app.services.sla_engine; NULL = 24x7
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
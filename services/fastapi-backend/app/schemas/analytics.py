@@ -54,14 +54,13 @@ class SystemMetrics(BaseModel):
 
 
 class DashboardMetrics(BaseModel):
-    total_tickets: int
-    open_tickets: int
-    resolved_today: int
-    sla_compliance: float
-    avg_resolution_time: float
-    team_utilization: float
-    system_health: SystemMetrics
-    recent_activities: List[Dict[str, Any]]
+    period_days: int
+    user_role: str
+    total_tickets: int  # Created in the period
+    open_tickets: int  # Open or in progress now
+    resolved_tickets: int  # Resolved in the period
+    sla_compliance: Optional[float] = None
+    avg_resolution_time: Optional[float] = None
 
 
 class TeamPerformance(BaseModel):
@@ -77,6 +76,8 @@ class TeamMemberPerformance(BaseModel):
     avgTime: str
     satisfaction: float
     slaCompliance: int
+    p50Time: Optional[str] = None
+    p90Time: Optional[str] = None
 
 class TeamPerformanceResponse(BaseModel):
     team_members: List[TeamMemberPerformance]
@@ -101,21 +102,44 @@ class SLAReportResponse(SLAReportBase):
     class Config:
         from_attributes = True
 
-class TicketAnalyticsItem(BaseModel):
-    ticket_id: str
-    status: str
-    priority: str
-    category: str
-    resolution_time: Optional[float] = None
-    created_at: datetime
-    updated_at: datetime
+class SLAReportSummary(BaseModel):
+    period_days: int
+    department_id: Optional[int] = None
+    total_tickets: int
+    met_sla: int
+    breached_sla: int
+    at_risk: int
+    compliance_rate: float
+    avg_resolution_time: Optional[float] = None
+    resolution_percentiles: Dict[str, Optional[float]]
+    priority_breakdown: Dict[str, Any]
+    category_breakdown: Dict[str, Any]
+
+class PriorityResolutionPercentiles(BaseModel):
+    resolved_tickets: int
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+class ResolutionPercentilesResponse(BaseModel):
+    period_days: int
+    department_id: Optional[int] = None
+    engineer_id: Optional[int] = None
+    resolved_tickets: int
+    avg_resolution_time: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    by_priority: Dict[str, PriorityResolutionPercentiles]
 
 class TicketAnalyticsResponse(BaseModel):
-    tickets: List[TicketAnalyticsItem]
+    period_days: int
+    department_id: Optional[int] = None
     summary: Dict[str, Any]
-
-    class Config:
-        from_attributes = True
+    priority_distribution: Dict[str, int]
+    category_distribution: Dict[str, int]
+    resolution_metrics: Dict[str, float]
+    daily_trends: List[Dict[str, Any]]
 
 class KnowledgeArticleAnalytics(BaseModel):
     article_id: int
@@ -68,6 +68,51 @@ class TicketCreate(TicketBase):
     melt_data: Optional[Dict[str, Any]] = None
 
 
+class TicketBulkItemResult(BaseModel):
+    index: int
+    status: str  # created, duplicate, error
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TicketBulkResult(BaseModel):
+    created: int
+    duplicates: int
+    failed: int
+    items: List[TicketBulkItemResult]
+
+
+class TicketBulkAssign(BaseModel):
+    ticket_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    assignee_id: int
+
+
+class TicketBulkTransition(BaseModel):
+    ticket_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    status: TicketStatus
+    reason: Optional[str] = None  # Stored as the escalation reason when escalating
+
+
+class TicketBulkUpdateResult(BaseModel):
+    updated: List[str]
+    skipped: List[str]  # Not found, or already in the requested state
+
+
+class TicketAutoAssign(BaseModel):
+    ticket_ids: Optional[List[str]] = Field(None, max_length=1000)  # Default: any unassigned open tickets
+    limit: int = Field(100, ge=1, le=1000)
+
+
+class TicketAssignment(BaseModel):
+    ticket_id: str
+    assignee_id: int
+    assignee_name: str
+
+
+class TicketAutoAssignResult(BaseModel):
+    assignments: List[TicketAssignment]
+
+
 class TicketUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -88,12 +133,14 @@ class TicketInDB(TicketBase):
     updated_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
     sla_deadline: datetime
+    sla_paused_at: Optional[datetime] = None  # Set while the ticket is ON_HOLD
     department_id: int
     resolution: Optional[str] = None
     escalation_reason: Optional[str] = None
     melt_data: Optional[Dict[str, Any]] = None
     customer_satisfaction: Optional[int] = None
     is_escalated: bool = False
+    version: int = 1
 
     model_config = {
         "from_attributes": True,
@@ -106,14 +153,66 @@ class Ticket(TicketInDB):
     department: Optional[Department] = None
     tags: List[Tag] = []
     attachments: List[TicketAttachment] = []
-    activities: List[TicketActivity] = []
+    activities: List[TicketActivity] = []  # Most recent only, newest first
+    activity_count: Optional[int] = None
+
+
+class TicketActivityPage(BaseModel):
+    activities: List[TicketActivity]
+    next_cursor: Optional[str] = None
 
 
 class TicketList(BaseModel):
     tickets: List[Ticket]
     total: int
-    page: int
+    page: Optional[int] = None  # Offset paging only; None when paging by cursor
+    size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+
+
+class TicketSummary(BaseModel):
+    """Slim ticket projection for list views (no activities, attachments or tags)"""
+    id: str
+    title: str
+    status: TicketStatus
+    priority: TicketPriority
+    category: TicketCategory
+    reported_by_id: int
+    assigned_to_id: Optional[int] = None
+    department_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+    sla_deadline: datetime
+    is_escalated: bool = False
+    reporter_name: Optional[str] = None
+    assignee_name: Optional[str] = None
+    department_name: Optional[str] = None
+
+    model_config = {
+        "from_attributes": True,
+        "arbitrary_types_allowed": True
+    }
+
+
+class TicketSummaryList(BaseModel):
+    tickets: List[TicketSummary]
+    total: int
+    page: Optional[int] = None  # Offset paging only; None when paging by cursor
     size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+
+
+class TicketFeedFilter(BaseModel):
+    """
+    What a change feed subscriber wants to hear about: ``mine`` (assigned
+    to or reported by the subscriber), ``department`` (the subscriber's
+    department) or ``all``, optionally limited to a minimum priority
+    """
+    scope: str = Field("mine", pattern="^(mine|department|all)$")
+    min_priority: Optional[TicketPriority] = None
 
 
 class TicketStats(BaseModel):
@@ -2,7 +2,7 @@
 User-related Pydantic schemas
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from app.models.user import UserRole
 
@@ -12,8 +12,25 @@ class DepartmentBase(BaseModel):
     description: Optional[str] = None
 
 
+class BusinessHours(BaseModel):
+    """Department SLA calendar; hours are keyed by weekday ("mon".."sun")"""
+    timezone: str = "UTC"
+    hours: Optional[Dict[str, List[List[str]]]] = Field(
+        None,
+        description='Working intervals per weekday, e.g. {"mon": [["09:00", "17:00"]]}; omit for 24x7',
+        examples=[{"mon": [["09:00", "17:00"]], "tue": [["09:00", "17:00"]]}]
+    )
+    holidays: List[str] = Field(default_factory=list, description="ISO dates without working hours")
+
+
+class BusinessHoursUpdateResult(BaseModel):
+    department_id: int
+    tickets_recomputed: int
+
+
 class Department(DepartmentBase):
     id: int
+    business_hours: Optional[BusinessHours] = None
     created_at: datetime
 
     model_config = {
@@ -0,0 +1,184 @@
+"""
+Columnar in-memory ticket snapshots for analytics
+"""
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.models.ticket import Ticket, TicketStatus, TicketPriority, TicketCategory, RESOLVED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+STATUSES = list(TicketStatus)
+PRIORITIES = list(TicketPriority)
+CATEGORIES = list(TicketCategory)
+RESOLVED_CODES = [STATUSES.index(status) for status in RESOLVED_STATUSES]
+
+# Missing resolved_at in the int64 microsecond columns
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+_US_PER_HOUR = 3_600_000_000
+
+
+def _epoch_us(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1_000_000)
+
+
+def _timestamps(values: pd.Series) -> np.ndarray:
+    # datetime64[ns] with NaT -> int64 microseconds with NO_TIMESTAMP
+    stamps = pd.to_datetime(values, utc=True)
+    micros = stamps.astype("int64").to_numpy() // 1000
+    micros[stamps.isna().to_numpy()] = NO_TIMESTAMP
+    return micros
+
+
+class TicketFrame:
+    """
+    The tickets created in a window as columns: categorical codes for
+    status, priority and category, int64 epoch microseconds for the
+    timestamps
+    """
+
+    def __init__(self, rows: list):
+        frame = pd.DataFrame.from_records(
+            rows, columns=["status", "priority", "category", "is_escalated", "created_at", "resolved_at", "sla_deadline"]
+        )
+        self.status = pd.Categorical(frame["status"], categories=STATUSES).codes.astype(np.int8)
+        self.priority = pd.Categorical(frame["priority"], categories=PRIORITIES).codes.astype(np.int8)
+        self.category = pd.Categorical(frame["category"], categories=CATEGORIES).codes.astype(np.int8)
+        self.is_escalated = frame["is_escalated"].eq(True).to_numpy()
+        self.created_at = _timestamps(frame["created_at"])
+        self.resolved_at = _timestamps(frame["resolved_at"])
+        self.sla_deadline = _timestamps(frame["sla_deadline"])
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def summarize(self, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Counts, distributions, resolution times and SLA compliance of the
+        tickets created between ``start`` and ``end``, in the shape of
+        ``AnalyticsService.get_ticket_analytics``
+        """
+        in_window = (self.created_at >= _epoch_us(start)) & (self.created_at <= _epoch_us(end))
+        status = self.status[in_window]
+        by_status = np.bincount(status[status >= 0], minlength=len(STATUSES))
+        by_priority = np.bincount(self.priority[in_window][self.priority[in_window] >= 0], minlength=len(PRIORITIES))
+        by_category = np.bincount(self.category[in_window][self.category[in_window] >= 0], minlength=len(CATEGORIES))
+
+        total_tickets = int(in_window.sum())
+        resolved_tickets = int(by_status[RESOLVED_CODES].sum())
+
+        timed = in_window & np.isin(self.status, RESOLVED_CODES) & (self.resolved_at != NO_TIMESTAMP)
+        resolution_hours = (self.resolved_at[timed] - self.created_at[timed]) / _US_PER_HOUR
+        if resolution_hours.size:
+            avg_resolution_time = float(resolution_hours.mean())
+            min_resolution_time = float(resolution_hours.min())
+            max_resolution_time = float(resolution_hours.max())
+            p50, p90, p99 = (float(v) for v in np.percentile(resolution_hours, [50, 90, 99]))
+            sla_compliant = int((self.resolved_at[timed] <= self.sla_deadline[timed]).sum())
+            sla_compliance_rate = sla_compliant / resolution_hours.size * 100
+        else:
+            avg_resolution_time = min_resolution_time = max_resolution_time = 0
+            p50 = p90 = p99 = 0
+            sla_compliance_rate = 100
+
+        return {
+            "summary": {
+                "total_tickets": total_tickets,
+                "resolved_tickets": resolved_tickets,
+                "open_tickets": int(by_status[STATUSES.index(TicketStatus.OPEN)]),
+                "in_progress_tickets": int(by_status[STATUSES.index(TicketStatus.IN_PROGRESS)]),
+                "escalated_tickets": int(self.is_escalated[in_window].sum()),
+                "resolution_rate": (resolved_tickets / total_tickets * 100) if total_tickets > 0 else 0
+            },
+            "priority_distribution": {p.value: int(n) for p, n in zip(PRIORITIES, by_priority)},
+            "category_distribution": {c.value: int(n) for c, n in zip(CATEGORIES, by_category)},
+            "resolution_metrics": {
+                "avg_resolution_time_hours": round(avg_resolution_time, 2),
+                "min_resolution_time_hours": round(min_resolution_time, 2),
+                "max_resolution_time_hours": round(max_resolution_time, 2),
+                "p50_resolution_time_hours": round(p50, 2),
+                "p90_resolution_time_hours": round(p90, 2),
+                "p99_resolution_time_hours": round(p99, 2),
+                "sla_compliance_rate": round(sla_compliance_rate, 2)
+            }
+        }
+
+
+class _Snapshot:
+    def __init__(self, frame: TicketFrame, start: datetime, watermark: Optional[datetime]):
+        self.frame = frame
+        self.start = start
+        self.watermark = watermark
+        self.loaded = time.monotonic()
+
+
+class TicketSnapshotCache:
+    """
+    Ticket frames per department (None = all departments). A snapshot is
+    loaded from its window's start up to the moment of loading and serves
+    any later request whose window starts no earlier; a wider request
+    reloads it.
+
+    Any ticket write moves ``max(coalesce(updated_at, created_at))``
+    (an index lookup on ix_tickets_changed_at), which invalidates every
+    snapshot, in every process. Snapshots also expire after ``ttl_seconds``
+    so writes committed with an older timestamp are picked up.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 32):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[Optional[int], _Snapshot]" = OrderedDict()
+
+    async def _watermark(self, db) -> Optional[datetime]:
+        result = await db.execute(select(func.max(func.coalesce(Ticket.updated_at, Ticket.created_at))))
+        return result.scalar()
+
+    async def _load(self, db, start: datetime, department_id: Optional[int]) -> TicketFrame:
+        query = select(
+            Ticket.status, Ticket.priority, Ticket.category, Ticket.is_escalated,
+            Ticket.created_at, Ticket.resolved_at, Ticket.sla_deadline
+        ).where(Ticket.created_at >= start)
+        if department_id:
+            query = query.where(Ticket.department_id == department_id)
+        result = await db.execute(query)
+        return TicketFrame(result.all())
+
+    async def frame(self, db, start: datetime, department_id: Optional[int] = None) -> TicketFrame:
+        """
+        A frame holding at least the tickets created since ``start``
+        """
+        watermark = await self._watermark(db)
+        snapshot = self._snapshots.get(department_id)
+        if (
+            snapshot is not None
+            and snapshot.start <= start
+            and snapshot.watermark == watermark
+            and time.monotonic() - snapshot.loaded < self.ttl_seconds
+        ):
+            self._snapshots.move_to_end(department_id)
+            return snapshot.frame
+
+        frame = await self._load(db, start, department_id)
+        self._snapshots[department_id] = _Snapshot(frame, start, watermark)
+        self._snapshots.move_to_end(department_id)
+        while len(self._snapshots) > self.max_entries:
+            self._snapshots.popitem(last=False)
+        return frame
+
+
+ticket_snapshots = TicketSnapshotCache(
+    ttl_seconds=settings.ANALYTICS_SNAPSHOT_TTL_SECONDS,
+    max_entries=settings.ANALYTICS_SNAPSHOT_MAX_ENTRIES
+)
@@ -2,16 +2,27 @@
 Analytics service for generating insights and reports
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, select, literal, literal_column, union_all, DateTime
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from app.models.ticket import Ticket, TicketStatus, TicketPriority, TicketCategory
-from app.models.user import User, UserRole
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from app.models.ticket import Ticket, TicketStatus, TicketPriority, TicketCategory, RESOLVED_STATUSES
+from app.models.user import User, UserRole, Department
 from app.models.analytics import AnalyticsEvent, SystemMetric
+from app.services.workload_index import ACTIVE_STATUSES, workload_index
+from app.services.outbox import publish
+from app.services.analytics_engine import ticket_snapshots
+from app.services.rollups import (
+    BucketStats, bucket_start, new_sketch, read_buckets, read_totals, sketch_key
+)
+from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# date_trunc units accepted for trend buckets
+TREND_BUCKETS = ("day", "week", "month")
+
 
 class AnalyticsService:
     def __init__(self, db: Session):
@@ -20,215 +31,182 @@ class AnalyticsService:
     async def get_ticket_analytics(self, 
                            start_date: Optional[datetime] = None,
                            end_date: Optional[datetime] = None,
-                           department_id: Optional[int] = None) -> Dict[str, Any]:
+                           department_id: Optional[int] = None,
+                           trend_bucket: str = "day",
+                           tz: str = "UTC") -> Dict[str, Any]:
         """
-        Get comprehensive ticket analytics
+        Get comprehensive ticket analytics. ``daily_trends`` is bucketed by
+        ``trend_bucket`` (day, week or month) in the ``tz`` time zone.
         """
         if not start_date:
             start_date = datetime.utcnow() - timedelta(days=30)
         if not end_date:
             end_date = datetime.utcnow()
         
-        # Base query
-        query = Ticket.__table__.select().where(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date
-            )
-        )
-        
-        if department_id:
-            query = query.where(Ticket.department_id == department_id)
-        
-        tickets_query = await self.db.execute(query)
-        tickets = tickets_query.fetchall()
-        
-        # Basic metrics
-        total_tickets = len(tickets)
-        resolved_tickets = len([t for t in tickets if t.status == TicketStatus.RESOLVED])
-        open_tickets = len([t for t in tickets if t.status == TicketStatus.OPEN])
-        in_progress_tickets = len([t for t in tickets if t.status == TicketStatus.IN_PROGRESS])
-        escalated_tickets = len([t for t in tickets if t.is_escalated])
-        
-        # Priority distribution
-        priority_distribution = {}
-        for priority in TicketPriority:
-            count = len([t for t in tickets if t.priority == priority])
-            priority_distribution[priority.value] = count
-        
-        # Category distribution
-        category_distribution = {}
-        for category in TicketCategory:
-            count = len([t for t in tickets if t.category == category])
-            category_distribution[category.value] = count
-        
-        # Resolution time analysis
-        resolved_with_time = [t for t in tickets if t.resolved_at and t.status == TicketStatus.RESOLVED]
-        if resolved_with_time:
-            resolution_times = [
-                (t.resolved_at - t.created_at).total_seconds() / 3600 
-                for t in resolved_with_time
-            ]
-            avg_resolution_time = sum(resolution_times) / len(resolution_times)
-            min_resolution_time = min(resolution_times)
-            max_resolution_time = max(resolution_times)
-        else:
-            avg_resolution_time = 0
-            min_resolution_time = 0
-            max_resolution_time = 0
-        
-        # SLA compliance
-        sla_compliant = len([
-            t for t in resolved_with_time 
-            if t.resolved_at <= t.sla_deadline
-        ])
-        sla_compliance_rate = (sla_compliant / len(resolved_with_time) * 100) if resolved_with_time else 100
+        # One columnar pass over the window, from a snapshot shared between requests
+        frame = await ticket_snapshots.frame(self.db, start_date, department_id)
+        analytics = frame.summarize(start_date, end_date)
         
         # Daily trends
-        daily_trends = await self._get_daily_ticket_trends(start_date, end_date, department_id)
-        
-        return {
-            "summary": {
-                "total_tickets": total_tickets,
-                "resolved_tickets": resolved_tickets,
-                "open_tickets": open_tickets,
-                "in_progress_tickets": in_progress_tickets,
-                "escalated_tickets": escalated_tickets,
-                "resolution_rate": (resolved_tickets / total_tickets * 100) if total_tickets > 0 else 0
-            },
-            "priority_distribution": priority_distribution,
-            "category_distribution": category_distribution,
-            "resolution_metrics": {
-                "avg_resolution_time_hours": round(avg_resolution_time, 2),
-                "min_resolution_time_hours": round(min_resolution_time, 2),
-                "max_resolution_time_hours": round(max_resolution_time, 2),
-                "sla_compliance_rate": round(sla_compliance_rate, 2)
-            },
-            "daily_trends": daily_trends
-        }
+        analytics["daily_trends"] = await self._get_daily_ticket_trends(
+            start_date, end_date, department_id, trend_bucket, tz
+        )
+        return analytics
     
     async def _get_daily_ticket_trends(self, 
                                 start_date: datetime, 
                                 end_date: datetime,
-                                department_id: Optional[int] = None) -> List[Dict[str, Any]]:
+                                department_id: Optional[int] = None,
+                                bucket: str = "day",
+                                tz: str = "UTC") -> List[Dict[str, Any]]:
         """
-        Get daily ticket creation and resolution trends
+        Get ticket creation and resolution trends per day, week or month of
+        the ``tz`` calendar, in one query. Every bucket from the one holding
+        ``start_date`` to the one holding ``end_date`` is listed, empty ones
+        with zero counts.
         """
-        trends = []
-        current_date = start_date.date()
-        end_date_only = end_date.date()
+        if bucket not in TREND_BUCKETS:
+            raise ValueError(f"Unsupported trend bucket: {bucket}")
+        try:
+            ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone: {tz}")
         
-        while current_date <= end_date_only:
-            next_date = current_date + timedelta(days=1)
-            
-            # Query for tickets created on this date
-            created_query = Ticket.__table__.select().where(
-                and_(
-                    func.date(Ticket.created_at) == current_date
-                )
-            )
-            
-            # Query for tickets resolved on this date
-            resolved_query = Ticket.__table__.select().where(
-                and_(
-                    func.date(Ticket.resolved_at) == current_date,
-                    Ticket.status == TicketStatus.RESOLVED
-                )
+        # Naive datetimes in this service are UTC
+        start_date, end_date = (
+            d if d.tzinfo else d.replace(tzinfo=timezone.utc) for d in (start_date, end_date)
+        )
+        unit = literal_column(f"'{bucket}'")
+        step = literal_column(f"interval '1 {bucket}'")
+        
+        # Bucket starts are local wall-clock times; timezone() converts both ways
+        first = func.date_trunc(unit, func.timezone(tz, literal(start_date, DateTime(timezone=True))))
+        last = func.date_trunc(unit, func.timezone(tz, literal(end_date, DateTime(timezone=True))))
+        lower, upper = func.timezone(tz, first), func.timezone(tz, last + step)
+        
+        # Plain range predicates, so created_at/resolved_at indexes apply
+        created = select(
+            func.date_trunc(unit, func.timezone(tz, Ticket.created_at)).label("bucket"),
+            literal(True).label("created")
+        ).where(Ticket.created_at >= lower, Ticket.created_at < upper)
+        resolved = select(
+            func.date_trunc(unit, func.timezone(tz, Ticket.resolved_at)).label("bucket"),
+            literal(False).label("created")
+        ).where(
+            Ticket.resolved_at >= lower, Ticket.resolved_at < upper,
+            Ticket.status.in_(RESOLVED_STATUSES)
+        )
+        if department_id:
+            created = created.where(Ticket.department_id == department_id)
+            resolved = resolved.where(Ticket.department_id == department_id)
+        events = union_all(created, resolved).subquery("events")
+        
+        series = select(func.generate_series(first, last, step).label("bucket")).subquery("series")
+        query = (
+            select(
+                series.c.bucket,
+                func.count().filter(events.c.created).label("created"),
+                func.count().filter(~events.c.created).label("resolved")
             )
-            
-            if department_id:
-                created_query = created_query.where(Ticket.department_id == department_id)
-                resolved_query = resolved_query.where(Ticket.department_id == department_id)
-            
-            created_count_query = await self.db.execute(created_query)
-            created_count = len(created_count_query.fetchall())
-            resolved_count_query = await self.db.execute(resolved_query)
-            resolved_count = len(resolved_count_query.fetchall())
-            
-            trends.append({
-                "date": current_date.isoformat(),
-                "created": created_count,
-                "resolved": resolved_count
-            })
-            
-            current_date = next_date
+            .select_from(series.outerjoin(events, events.c.bucket == series.c.bucket))
+            .group_by(series.c.bucket)
+            .order_by(series.c.bucket)
+        )
         
-        return trends
+        result = await self.db.execute(query)
+        return [
+            {
+                "date": row.bucket.date().isoformat(),
+                "created": row.created,
+                "resolved": row.resolved
+            }
+            for row in result.all()
+        ]
     
     async def get_team_performance(self, 
                            start_date: Optional[datetime] = None,
-                           end_date: Optional[datetime] = None) -> Dict[str, Any]:
+                           end_date: Optional[datetime] = None,
+                           department_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Get team performance analytics
+        Get team performance analytics for every L1/L2 engineer, from one
+        aggregate query over the tickets created in the period (current
+        workload counts all open tickets regardless of age). Resolution-time
+        percentiles cover the same resolved tickets as the other figures,
+        from sketches built out of per-bin counts.
         """
         if not start_date:
             start_date = datetime.utcnow() - timedelta(days=30)
         if not end_date:
             end_date = datetime.utcnow()
         
-        # Get all engineers
-        engineers_query = await self.db.execute(User.__table__.select().where(
-            User.role.in_([UserRole.L1_ENGINEER, UserRole.L2_ENGINEER])
-        ))
-        engineers = engineers_query.fetchall()
+        in_period = and_(Ticket.created_at >= start_date, Ticket.created_at <= end_date)
+        resolved = and_(in_period, Ticket.status.in_(RESOLVED_STATUSES))
+        timed = and_(resolved, Ticket.resolved_at.isnot(None))
+        resolution_hours = func.extract("epoch", Ticket.resolved_at - Ticket.created_at) / 3600
+        
+        ticket_stats = (
+            select(
+                Ticket.assigned_to_id.label("engineer_id"),
+                func.count().filter(in_period).label("assigned"),
+                func.count().filter(resolved).label("resolved"),
+                func.count().filter(and_(timed, Ticket.resolved_at <= Ticket.sla_deadline)).label("sla_met"),
+                func.count().filter(Ticket.status.in_(ACTIVE_STATUSES)).label("open"),
+                func.avg(resolution_hours).filter(timed).label("avg_hours"),
+                func.avg(Ticket.customer_satisfaction).filter(resolved).label("satisfaction")
+            )
+            .where(Ticket.assigned_to_id.isnot(None), or_(in_period, Ticket.status.in_(ACTIVE_STATUSES)))
+            .group_by(Ticket.assigned_to_id)
+            .subquery("ticket_stats")
+        )
+        query = (
+            select(
+                User.id, User.name, User.role, Department.name.label("department_name"),
+                *[column for column in ticket_stats.c if column.name != "engineer_id"]
+            )
+            .select_from(User)
+            .outerjoin(Department, Department.id == User.department_id)
+            .outerjoin(ticket_stats, ticket_stats.c.engineer_id == User.id)
+            .where(User.role.in_([UserRole.L1_ENGINEER, UserRole.L2_ENGINEER]))
+            .order_by(User.id)
+        )
+        if department_id:
+            query = query.where(User.department_id == department_id)
+        
+        engineers = (await self.db.execute(query)).all()
+
+        sketch_query = (
+            select(
+                Ticket.assigned_to_id, sketch_key(resolution_hours, new_sketch()).label("sketch_key"),
+                func.count().label("count")
+            )
+            .where(Ticket.assigned_to_id.in_([engineer.id for engineer in engineers]), timed)
+            .group_by(Ticket.assigned_to_id, literal_column("sketch_key"))
+        )
+        sketches = {}
+        for row in (await self.db.execute(sketch_query)).all():
+            key = int(row.sketch_key) if row.sketch_key is not None else None
+            sketches.setdefault(row.assigned_to_id, new_sketch()).add_bin(key, row.count)
         
         team_stats = []
         for engineer in engineers:
-            # Get tickets assigned to this engineer
-            assigned_tickets_query = await self.db.execute(Ticket.__table__.select().where(
-                and_(
-                    Ticket.assigned_to_id == engineer.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date
-                )
-            ))
-            assigned_tickets = assigned_tickets_query.fetchall()
-            
-            # Get resolved tickets
-            resolved_tickets = [t for t in assigned_tickets if t.status == TicketStatus.RESOLVED]
-            
-            # Calculate metrics
-            total_assigned = len(assigned_tickets)
-            total_resolved = len(resolved_tickets)
+            total_assigned = engineer.assigned or 0
+            total_resolved = engineer.resolved or 0
             resolution_rate = (total_resolved / total_assigned * 100) if total_assigned > 0 else 0
-            
-            # Calculate average resolution time
-            if resolved_tickets:
-                resolution_times = [
-                    (t.resolved_at - t.created_at).total_seconds() / 3600 
-                    for t in resolved_tickets if t.resolved_at
-                ]
-                avg_resolution_time = sum(resolution_times) / len(resolution_times)
-            else:
-                avg_resolution_time = 0
-            
-            # Calculate SLA compliance
-            sla_compliant = len([
-                t for t in resolved_tickets 
-                if t.resolved_at and t.resolved_at <= t.sla_deadline
-            ])
-            sla_compliance = (sla_compliant / len(resolved_tickets) * 100) if resolved_tickets else 100
-            
-            # Current workload (open + in progress tickets)
-            current_workload_query = await self.db.execute(Ticket.__table__.select().where(
-                and_(
-                    Ticket.assigned_to_id == engineer.id,
-                    Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-                )
-            ))
-            current_workload = len(current_workload_query.fetchall())
+            sla_compliance = (engineer.sla_met / total_resolved * 100) if total_resolved else 100
             
             team_stats.append({
                 "engineer_id": engineer.id,
                 "engineer_name": engineer.name,
                 "role": engineer.role.value,
-                "department": engineer.department.name if engineer.department else "Unknown",
+                "department": engineer.department_name or "Unknown",
                 "tickets_assigned": total_assigned,
                 "tickets_resolved": total_resolved,
                 "resolution_rate": round(resolution_rate, 1),
-                "avg_resolution_time": round(avg_resolution_time, 2),
+                "avg_resolution_time": round(float(engineer.avg_hours or 0), 2),
+                "resolution_time_percentiles": sketches.get(engineer.id, new_sketch()).percentiles(),
                 "sla_compliance": round(sla_compliance, 1),
-                "current_workload": current_workload
+                "satisfaction": round(float(engineer.satisfaction), 1) if engineer.satisfaction is not None else None,
+                "current_workload": engineer.open or 0
             })
         
         # Calculate team averages
@@ -267,7 +245,7 @@ class AnalyticsService:
         # Get resolved tickets in date range
         resolved_tickets_query = await self.db.execute(Ticket.__table__.select().where(
             and_(
-                Ticket.status == TicketStatus.RESOLVED,
+                Ticket.status.in_(RESOLVED_STATUSES),
                 Ticket.resolved_at >= start_date,
                 Ticket.resolved_at <= end_date
             )
@@ -354,23 +332,221 @@ class AnalyticsService:
             "at_risk_tickets": at_risk_list
         }
     
+    async def get_dashboard_metrics(self, user, days: int = 7) -> Dict[str, Any]:
+        """
+        Headline numbers for ``user``'s dashboard over the last ``days`` days:
+        tickets created and resolved in the period, SLA compliance and
+        average resolution time of the resolved ones, and tickets open now.
+        Engineers see their assigned tickets and managers every ticket, both
+        from the analytics rollups plus a live aggregate of today, with open
+        counts from the workload index. End users see the tickets they
+        reported, counted directly.
+        """
+        start = (datetime.utcnow() - timedelta(days=days)).date()
+        metrics = {"period_days": days, "user_role": user.role.value}
+        
+        if user.role == UserRole.END_USER:
+            since = datetime(start.year, start.month, start.day)
+            result = await self.db.execute(
+                select(
+                    func.count().filter(Ticket.created_at >= since).label("created"),
+                    func.count().filter(Ticket.status.in_(ACTIVE_STATUSES)).label("open"),
+                    func.count().filter(
+                        Ticket.resolved_at >= since, Ticket.status.in_(RESOLVED_STATUSES)
+                    ).label("resolved")
+                ).where(Ticket.reported_by_id == user.id)
+            )
+            row = result.one()
+            return {
+                **metrics,
+                "total_tickets": row.created,
+                "open_tickets": row.open,
+                "resolved_tickets": row.resolved,
+                "sla_compliance": None,  # Not applicable for end users
+                "avg_resolution_time": None
+            }
+        
+        await workload_index.ensure_loaded(self.db)
+        if user.role in (UserRole.L1_ENGINEER, UserRole.L2_ENGINEER):
+            totals = await read_totals(self.db, start, user_id=user.id)
+            open_tickets = workload_index.get(user.id)
+        else:
+            totals = await read_totals(self.db, start)
+            open_tickets = workload_index.total_active
+        return {
+            **metrics,
+            "total_tickets": totals.created,
+            "open_tickets": open_tickets,
+            "resolved_tickets": totals.resolved,
+            "sla_compliance": round(totals.compliance_rate, 1),
+            "avg_resolution_time": round(totals.avg_resolution_time, 2) if totals.resolved else None
+        }
+    
+    @staticmethod
+    def _sla_breakdown(breakdown: Dict[str, Dict[str, float]],
+                       sketches: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for key, counts in breakdown.items():
+            report[key] = {
+                "total": int(counts["total"]),
+                "met": int(counts["met"]),
+                "breached": int(counts["total"] - counts["met"]),
+                "compliance_rate": round(counts["met"] / counts["total"] * 100, 1) if counts["total"] else 100.0,
+                "avg_resolution_time": round(counts["resolution_hours"] / counts["total"], 2) if counts["total"] else None
+            }
+            if sketches is not None:
+                report[key]["resolution_percentiles"] = (sketches.get(key) or new_sketch()).percentiles()
+        return report
+    
+    async def get_sla_report(self,
+                      days: int = 30,
+                      department_id: Optional[int] = None,
+                      priority: Optional[str] = None,
+                      category: Optional[str] = None) -> Dict[str, Any]:
+        """
+        SLA outcomes of the tickets resolved over the last ``days`` days, read
+        from the analytics rollups plus a live aggregate of today. ``at_risk``
+        is live: active tickets due within SLA_WARNING_MINUTES. Results can be
+        narrowed to one priority or one category, not both; resolution-time
+        percentiles are kept overall and per priority.
+        """
+        if priority and category:
+            raise ValueError("Filter by priority or by category, not both")
+        
+        start = (datetime.utcnow() - timedelta(days=days)).date()
+        totals = await read_totals(self.db, start, department_id=department_id)
+        priority_breakdown = self._sla_breakdown(totals.by_priority, totals.priority_sketches)
+        category_breakdown = self._sla_breakdown(totals.by_category)
+        
+        if priority or category:
+            selected = (priority_breakdown.get(priority) if priority else category_breakdown.get(category)) or {
+                "total": 0, "met": 0, "breached": 0, "compliance_rate": 100.0, "avg_resolution_time": None
+            }
+            if priority:
+                percentiles = (totals.priority_sketches.get(priority) or new_sketch()).percentiles()
+            else:
+                # Sketches are not kept per category
+                percentiles = {"p50": None, "p90": None, "p99": None}
+        else:
+            selected = {
+                "total": totals.resolved,
+                "met": totals.sla_met,
+                "breached": totals.resolved - totals.sla_met,
+                "compliance_rate": round(totals.compliance_rate, 1),
+                "avg_resolution_time": round(totals.avg_resolution_time, 2) if totals.resolved else None
+            }
+            percentiles = totals.resolution_sketch.percentiles()
+        
+        now = datetime.utcnow()
+        at_risk_query = select(func.count()).select_from(Ticket).where(
+            Ticket.status.in_(ACTIVE_STATUSES),
+            Ticket.sla_deadline > now,
+            Ticket.sla_deadline <= now + timedelta(minutes=settings.SLA_WARNING_MINUTES)
+        )
+        if department_id:
+            at_risk_query = at_risk_query.where(Ticket.department_id == department_id)
+        if priority:
+            at_risk_query = at_risk_query.where(Ticket.priority == priority)
+        if category:
+            at_risk_query = at_risk_query.where(Ticket.category == category)
+        at_risk = (await self.db.execute(at_risk_query)).scalar()
+        
+        return {
+            "period_days": days,
+            "department_id": department_id,
+            "total_tickets": selected["total"],
+            "met_sla": selected["met"],
+            "breached_sla": selected["breached"],
+            "at_risk": at_risk,
+            "compliance_rate": selected["compliance_rate"],
+            "avg_resolution_time": selected["avg_resolution_time"],
+            "resolution_percentiles": percentiles,
+            "priority_breakdown": priority_breakdown,
+            "category_breakdown": category_breakdown
+        }
+    
+    async def get_resolution_percentiles(self,
+                                  days: int = 30,
+                                  department_id: Optional[int] = None,
+                                  engineer_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Resolution-time p50/p90/p99 (hours) of the tickets resolved over the
+        last ``days`` days, for one department, one engineer or everyone,
+        overall and per priority; merged from the rollup sketches without
+        reading the tickets
+        """
+        start = (datetime.utcnow() - timedelta(days=days)).date()
+        totals = await read_totals(self.db, start, department_id=department_id, user_id=engineer_id)
+        return {
+            "period_days": days,
+            "department_id": department_id,
+            "engineer_id": engineer_id,
+            "resolved_tickets": totals.resolved,
+            "avg_resolution_time": round(totals.avg_resolution_time, 2) if totals.resolved else None,
+            **totals.resolution_sketch.percentiles(),
+            "by_priority": {
+                priority: {"resolved_tickets": sketch.count, **sketch.percentiles()}
+                for priority, sketch in sorted(totals.priority_sketches.items())
+            }
+        }
+    
+    async def get_weekly_role_trends(self, weeks: int, metric: str) -> List[Dict[str, Any]]:
+        """
+        Weekly L1 vs L2 performance from the engineer rollups, oldest week
+        first. ``metric`` is ``sla_compliance`` (percent), ``resolution_time``
+        (average hours), ``ticket_volume`` (tickets resolved) or
+        ``satisfaction`` (percent of the top rating). The current week is as
+        of the last rollup run.
+        """
+        current = bucket_start(datetime.utcnow().date(), "weekly")
+        starts = [current - timedelta(weeks=offset) for offset in range(weeks - 1, -1, -1)]
+        stats = await read_buckets(self.db, "weekly", starts, scope="engineer")
+        
+        roles = {}
+        engineer_ids = {engineer_id for _, _, engineer_id in stats}
+        if engineer_ids:
+            roles_query = await self.db.execute(select(User.id, User.role).where(User.id.in_(engineer_ids)))
+            roles = {row.id: row.role for row in roles_query.all()}
+        
+        by_week = {}
+        for (start, _, engineer_id), engineer_stats in stats.items():
+            role = roles.get(engineer_id)
+            if role in (UserRole.L1_ENGINEER, UserRole.L2_ENGINEER):
+                by_week.setdefault((start, role), BucketStats()).merge(engineer_stats)
+        
+        def value(week_stats) -> int:
+            if week_stats is None:
+                return 0
+            if metric == "sla_compliance":
+                return round(week_stats.compliance_rate) if week_stats.resolved else 0
+            if metric == "resolution_time":
+                return round(week_stats.avg_resolution_time or 0)
+            if metric == "ticket_volume":
+                return week_stats.resolved
+            return round(week_stats.satisfaction / 5 * 100) if week_stats.rated else 0
+        
+        return [
+            {
+                "week": start.isoformat(),
+                "l1Performance": value(by_week.get((start, UserRole.L1_ENGINEER))),
+                "l2Performance": value(by_week.get((start, UserRole.L2_ENGINEER)))
+            }
+            for start in starts
+        ]
+    
     async def log_event(self, event_type: str, user_id: Optional[int] = None, 
                   ticket_id: Optional[str] = None, properties: Optional[Dict[str, Any]] = None):
         """
-        Log an analytics event
+        Log an analytics event as part of the caller's transaction; the row is
+        written by the outbox dispatcher once the caller commits
         """
-        try:
-            event = AnalyticsEvent(
-                event_type=event_type,
-                user_id=user_id,
-                ticket_id=ticket_id,
-                properties=properties
-            )
-            self.db.add(event)
-            await self.db.commit()
-        except Exception as e:
-            logger.error(f"Error logging analytics event: {str(e)}")
-            await self.db.rollback()
+        publish(
+            self.db,
+            event_type,
+            [ticket_id] if ticket_id else [],
+            user_id=user_id,
+            **(properties or {})
+        )
     
     async def get_user_activity(self, user_id: int, days: int = 30) -> Dict[str, Any]:
         """
@@ -405,7 +581,7 @@ class AnalyticsService:
         assigned_tickets = len([t for t in user_tickets if t.assigned_to_id == user_id])
         resolved_tickets = len([
             t for t in user_tickets 
-            if t.assigned_to_id == user_id and t.status == TicketStatus.RESOLVED
+            if t.assigned_to_id == user_id and t.status in RESOLVED_STATUSES
         ])
         
         return {
@@ -0,0 +1,341 @@
+"""
+Transactional outbox: ticket changes record domain events in their own
+transaction, and a background dispatcher delivers them to consumers
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from datetime import timedelta
+import asyncio
+import logging
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, insert, update, delete, func
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import get_db_context
+from app.models.analytics import AnalyticsEvent
+from app.models.outbox import OutboxEvent, OUTBOX_CHANNEL
+from app.services.ticket_feed import ticket_feed
+from app.utils.websocket_manager import websocket_manager
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[Any, List[Any]], Awaitable[None]]
+
+
+def publish(db, event_type: str, ticket_ids: Iterable[str], user_id: Optional[int] = None,
+            notify_user_ids: Iterable[Optional[int]] = (), **data) -> None:
+    """
+    Record a domain event in the caller's transaction. Nothing is sent until
+    the caller commits; a rollback discards the event with the change.
+
+    ``ticket_ids`` are the affected tickets, ``notify_user_ids`` users to
+    notify besides those watching the tickets, ``data`` event-specific
+    fields.
+    """
+    payload = {
+        **data,
+        "ticket_ids": list(ticket_ids),
+        "notify_user_ids": list(dict.fromkeys(uid for uid in notify_user_ids if uid is not None))
+    }
+    db.add(OutboxEvent(event_type=event_type, user_id=user_id, payload=jsonable_encoder(payload)))
+
+
+def _event_data(event) -> Dict[str, Any]:
+    return {k: v for k, v in event.payload.items() if k not in ("ticket_ids", "notify_user_ids")}
+
+
+async def broadcast_events(db, events: List[Any]) -> None:
+    """
+    Live consumer: push events to this process's WebSocket clients watching
+    the tickets and to the users named in the event
+    """
+    for event in events:
+        message = {
+            "type": event.event_type,
+            **_event_data(event),
+            "ticket_ids": event.payload["ticket_ids"],
+            "updated_by": event.user_id
+        }
+        if len(event.payload["ticket_ids"]) == 1:
+            message["ticket_id"] = event.payload["ticket_ids"][0]
+        await websocket_manager.broadcast_to_tickets(
+            event.payload["ticket_ids"], message, user_ids=event.payload["notify_user_ids"]
+        )
+
+
+async def record_analytics_events(db, events: List[Any]) -> None:
+    """
+    Write one analytics event per affected ticket, in the dispatcher's
+    transaction
+    """
+    rows = [
+        {
+            "event_type": event.event_type,
+            "user_id": event.user_id,
+            "ticket_id": ticket_id,
+            "properties": _event_data(event),
+            "timestamp": event.created_at
+        }
+        for event in events
+        for ticket_id in (event.payload["ticket_ids"] or [None])
+    ]
+    if rows:
+        await db.execute(insert(AnalyticsEvent), rows)
+
+
+class OutboxDispatcher:
+    """
+    Drains ``outbox_events`` in id order, in batches claimed with
+    ``FOR UPDATE SKIP LOCKED`` so several processes can share the work.
+
+    Inserts fire a NOTIFY (see ``app.models.outbox``) that wakes the
+    dispatcher through a dedicated LISTEN connection; it also polls, so
+    notifications lost while disconnected only delay delivery. Handlers run
+    before the batch is marked processed in the same transaction: a failure
+    leaves the batch pending for a retry, so delivery is at least once and
+    database side effects of handlers happen exactly once.
+
+    Live handlers, which push to this process's sockets, instead see every
+    event on every replica: each process reads the events committed since
+    the last id it saw, without claiming them. An id skipped because its
+    transaction was still open is looked for again until ``live_gap_seconds``
+    have passed, after which it is taken as rolled back. Live delivery is at
+    most once; a failed live batch tells feed subscribers to resync.
+    """
+
+    def __init__(self, batch_size: int = 100, poll_seconds: int = 30,
+                 max_attempts: int = 10, retention_hours: int = 72, live_gap_seconds: int = 60,
+                 purge_seconds: int = 600):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retention_hours = retention_hours
+        self.live_gap_seconds = live_gap_seconds
+        self.purge_seconds = purge_seconds
+        self._last_purge: Optional[float] = None  # monotonic time of the last purge
+        self._handlers: List[OutboxHandler] = []
+        self._live_handlers: List[OutboxHandler] = []
+        self._live_after: Optional[int] = None  # Highest event id read for live delivery
+        self._live_gaps: Dict[int, float] = {}  # Skipped ids below it -> when first missed
+        self._wakeup = asyncio.Event()
+        self._listener = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, handler: OutboxHandler) -> None:
+        """
+        Add a consumer; it receives the dispatcher's session and a batch of
+        events, and must tolerate seeing an event again after a failure
+        """
+        self._handlers.append(handler)
+
+    def register_live(self, handler: OutboxHandler) -> None:
+        """
+        Add a consumer that runs in every process for every event, after
+        commit, with a read-only session; for pushing to local connections
+        """
+        self._live_handlers.append(handler)
+
+    def _on_notify(self, *args) -> None:
+        self._wakeup.set()
+
+    async def _listen(self) -> None:
+        if self._listener is not None:
+            raw = await self._listener.get_raw_connection()
+            if not raw.driver_connection.is_closed():
+                return
+            await self._close_listener()
+        try:
+            self._listener = await database.async_engine.connect()
+            raw = await self._listener.get_raw_connection()
+            await raw.driver_connection.add_listener(OUTBOX_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.error(f"Outbox LISTEN failed, falling back to polling: {str(e)}")
+            await self._close_listener()
+
+    async def _close_listener(self) -> None:
+        if self._listener is not None:
+            try:
+                await self._listener.close()
+            except Exception:
+                pass
+            self._listener = None
+
+    async def _claim(self, session, event_id: Optional[int] = None) -> List[Any]:
+        query = (
+            select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.user_id,
+                   OutboxEvent.payload, OutboxEvent.created_at)
+            .where(OutboxEvent.processed_at.is_(None), OutboxEvent.attempts < self.max_attempts)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if event_id is not None:
+            query = query.where(OutboxEvent.id == event_id)
+        result = await session.execute(query)
+        return result.all()
+
+    async def _deliver(self, session, events: List[Any]) -> None:
+        for handler in self._handlers:
+            await handler(session, events)
+        await session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_([event.id for event in events]))
+            .values(processed_at=func.now(), attempts=OutboxEvent.attempts + 1)
+        )
+        await session.commit()
+
+    async def dispatch_batch(self) -> int:
+        """
+        Deliver the oldest pending batch and return the number of events
+        delivered. If the batch fails, its events are retried one at a time
+        so a single bad event does not hold back the others.
+        """
+        async with get_db_context() as session:
+            events = await self._claim(session)
+            if not events:
+                return 0
+            try:
+                await self._deliver(session, events)
+                return len(events)
+            except Exception as e:
+                await session.rollback()
+                logger.warning(f"Outbox batch of {len(events)} failed, retrying one by one: {str(e)}")
+
+        delivered = 0
+        for event_id in [event.id for event in events]:
+            async with get_db_context() as session:
+                claimed = await self._claim(session, event_id)
+                if not claimed:
+                    continue  # Taken by another dispatcher meanwhile
+                try:
+                    await self._deliver(session, claimed)
+                    delivered += 1
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"Outbox event {event_id} ({claimed[0].event_type}) failed: {str(e)}")
+                    await session.execute(
+                        update(OutboxEvent)
+                        .where(OutboxEvent.id == event_id)
+                        .values(attempts=OutboxEvent.attempts + 1, last_error=str(e))
+                    )
+                    await session.commit()
+        return delivered
+
+    async def deliver_live(self) -> int:
+        """
+        Run the live handlers on the events committed since the last call
+        and return how many were read. The first call only records where
+        the outbox ends.
+        """
+        if not self._live_handlers:
+            return 0
+        async with get_db_context() as session:
+            if self._live_after is None:
+                self._live_after = (await session.execute(select(func.coalesce(func.max(OutboxEvent.id), 0)))).scalar()
+                return 0
+
+            columns = (OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.user_id,
+                       OutboxEvent.payload, OutboxEvent.created_at)
+            events = (await session.execute(
+                select(*columns).where(OutboxEvent.id > self._live_after).order_by(OutboxEvent.id).limit(self.batch_size)
+            )).all()
+            if self._live_gaps:
+                late = (await session.execute(
+                    select(*columns).where(OutboxEvent.id.in_(list(self._live_gaps))).order_by(OutboxEvent.id)
+                )).all()
+                events = late + events
+
+            now = time.monotonic()
+            for event in events:
+                self._live_gaps.pop(event.id, None)
+                if event.id > self._live_after:
+                    # A jump wider than a batch is not a commit race; don't track it
+                    first_missing = max(self._live_after + 1, event.id - self.batch_size)
+                    self._live_gaps.update((missing, now) for missing in range(first_missing, event.id))
+                    self._live_after = event.id
+            self._live_gaps = {
+                event_id: missed for event_id, missed in self._live_gaps.items()
+                if now - missed < self.live_gap_seconds
+            }
+
+            if events:
+                try:
+                    for handler in self._live_handlers:
+                        await handler(session, events)
+                except Exception as e:
+                    logger.error(f"Live delivery of {len(events)} outbox events failed: {str(e)}")
+                    ticket_feed.resync_all()
+            return len(events)
+
+    async def _purge_processed(self) -> None:
+        async with get_db_context() as session:
+            await session.execute(
+                delete(OutboxEvent).where(
+                    OutboxEvent.processed_at < func.now() - timedelta(hours=self.retention_hours)
+                )
+            )
+            await session.commit()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.error(f"Outbox LISTEN failed: {str(e)}")
+            try:
+                while await self.deliver_live() >= self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Outbox live delivery failed: {str(e)}")
+                ticket_feed.resync_all()
+            try:
+                while await self.dispatch_batch() > 0:
+                    pass
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed: {str(e)}")
+            # On its own clock: under steady traffic the wait below never times out
+            now = time.monotonic()
+            if self._last_purge is None or now - self._last_purge >= self.purge_seconds:
+                self._last_purge = now
+                try:
+                    await self._purge_processed()
+                except Exception as e:
+                    logger.error(f"Outbox purge failed: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        """
+        Start listening and deliver anything left over from before startup
+        """
+        self._task = asyncio.create_task(self._run())
+        logger.info("✓ Outbox dispatcher started")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_listener()
+
+
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_seconds=settings.OUTBOX_POLL_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retention_hours=settings.OUTBOX_RETENTION_HOURS,
+    live_gap_seconds=settings.OUTBOX_LIVE_GAP_SECONDS,
+    purge_seconds=settings.OUTBOX_PURGE_SECONDS
+)
+outbox_dispatcher.register(record_analytics_events)
+outbox_dispatcher.register_live(broadcast_events)
+outbox_dispatcher.register_live(ticket_feed.publish_events)
@@ -0,0 +1,209 @@
+"""
+Monthly partitions of the append-only history tables
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime
+import asyncio
+import logging
+import re
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import get_db_context
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column (see ``monthly_partitioned`` in app.models.base)
+PARTITIONED_TABLES: Dict[str, str] = {
+    "ticket_activities": "created_at",
+    "chat_messages": "created_at",
+    "analytics_events": "timestamp",
+    "user_activity_logs": "timestamp",
+}
+
+# Serialises partition DDL across app instances and the CLI
+PARTITION_LOCK_ID = 7_401_017
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def _bound(month: date) -> str:
+    # Bounds are explicit UTC instants so they do not depend on the session timezone
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+async def is_partitioned(db, table: str) -> bool:
+    result = await db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    )
+    return result.scalar()
+
+
+async def list_partitions(db, table: str) -> List[Tuple[str, Optional[date]]]:
+    """
+    Attached partitions of a table as ``(name, month)``; ``month`` is None
+    for the DEFAULT partition
+    """
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table) "
+            "ORDER BY child.relname"
+        ),
+        {"table": table}
+    )
+    partitions = []
+    for name in result.scalars().all():
+        match = _PARTITION_NAME.search(name)
+        partitions.append((name, date(int(match[1]), int(match[2]), 1) if match else None))
+    return partitions
+
+
+async def create_month_partition(db, table: str, month: date) -> bool:
+    """
+    Create the partition of ``table`` for ``month`` unless it exists. Rows
+    that already landed in the DEFAULT partition for that month are moved
+    into it. Returns whether a partition was created. Runs in the caller's
+    transaction.
+    """
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    exists = await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if exists.scalar():
+        return False
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    default = f"{table}_default"
+    in_range = f"{column} >= {start} AND {column} < {end}"
+    has_default = (await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": default})).scalar()
+    stray_rows = has_default and (await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"))).scalar()
+
+    if stray_rows:
+        # A new partition cannot overlap rows held by the DEFAULT partition
+        await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        await db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ({start}) TO ({end})"))
+        await db.execute(text(f"INSERT INTO {table} SELECT * FROM {default} WHERE {in_range}"))
+        await db.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+        await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    else:
+        await db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ({start}) TO ({end})"))
+    logger.info(f"Created partition {name}")
+    return True
+
+
+async def ensure_partitions(db, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Make sure every partitioned table has partitions from the current month
+    through ``months_ahead`` months ahead, and commit. Returns the created
+    partition names.
+    """
+    current = month_start(today or datetime.utcnow().date())
+    await db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": PARTITION_LOCK_ID})
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not await is_partitioned(db, table):
+            logger.warning(f"{table} is not partitioned yet, run `alembic upgrade head`")
+            continue
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if await create_month_partition(db, table, month):
+                created.append(partition_name(table, month))
+    await db.commit()
+    return created
+
+
+async def detach_partitions_before(db, before: date, drop: bool = False) -> List[str]:
+    """
+    Detach (or drop) monthly partitions that end on or before ``before`` and
+    commit. Detached partitions are ordinary tables that can be dumped and
+    dropped, or re-attached, independently of the live table. Returns the
+    affected partition names.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": PARTITION_LOCK_ID})
+    affected = []
+    for table in PARTITIONED_TABLES:
+        for name, month in await list_partitions(db, table):
+            if month is None or add_months(month, 1) > before:
+                continue
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if drop:
+                await db.execute(text(f"DROP TABLE {name}"))
+            affected.append(name)
+    await db.commit()
+    return affected
+
+
+class PartitionManager:
+    """
+    Creates upcoming monthly partitions at startup and once per interval,
+    and, when a retention is configured, detaches partitions that fell out
+    of it
+    """
+
+    def __init__(self, months_ahead: int = 3, retention_months: int = 0):
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_maintenance(self) -> None:
+        async with get_db_context() as session:
+            created = await ensure_partitions(session, self.months_ahead)
+            if created:
+                logger.info(f"Created {len(created)} partitions: {', '.join(created)}")
+            if self.retention_months > 0:
+                cutoff = add_months(month_start(datetime.utcnow().date()), -self.retention_months)
+                detached = await detach_partitions_before(session, cutoff)
+                if detached:
+                    logger.info(f"Detached {len(detached)} partitions: {', '.join(detached)}")
+
+    async def _run_periodically(self, interval_seconds: int) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {str(e)}")
+
+    async def start(self, interval_seconds: int) -> None:
+        """
+        Run maintenance now and schedule it every ``interval_seconds``
+        """
+        try:
+            await self.run_maintenance()
+        except Exception as e:
+            # Inserts still succeed through the DEFAULT partitions
+            logger.error(f"Partition maintenance failed: {str(e)}")
+        if interval_seconds > 0:
+            self._task = asyncio.create_task(self._run_periodically(interval_seconds))
+        logger.info("✓ Partition maintenance scheduled")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+partition_manager = PartitionManager(
+    months_ahead=settings.PARTITION_MONTHS_AHEAD,
+    retention_months=settings.PARTITION_RETENTION_MONTHS
+)
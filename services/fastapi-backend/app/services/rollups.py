@@ -0,0 +1,524 @@
+"""
+Incremental ticket analytics rollups into PerformanceMetric and SLAReport
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+import asyncio
+import logging
+
+from sqlalchemy import select, insert, delete, func, or_, case, literal_column, text, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import get_db_context
+from app.models.analytics import PerformanceMetric, SLAReport, RollupWatermark
+from app.models.ticket import Ticket, RESOLVED_STATUSES
+from app.services.partitions import add_months
+from app.utils.quantile_sketch import DDSketch
+
+logger = logging.getLogger(__name__)
+
+# Rollup period -> date_trunc unit; buckets are UTC calendar days, ISO weeks and months
+ROLLUP_PERIODS: Dict[str, str] = {"daily": "day", "weekly": "week", "monthly": "month"}
+
+# Serialises rollup runs across app instances and the CLI
+ROLLUP_LOCK_ID = 7_401_023
+WATERMARK_NAME = "ticket_rollups"
+
+# (bucket start, "department" | "engineer", department or user id)
+BucketKey = Tuple[date, str, int]
+
+
+def bucket_start(day: date, period: str) -> date:
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_end(start: date, period: str) -> date:
+    if period == "weekly":
+        return start + timedelta(days=7)
+    if period == "monthly":
+        return add_months(start, 1)
+    return start + timedelta(days=1)
+
+
+def _utc(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def new_sketch() -> DDSketch:
+    """
+    An empty resolution-time sketch (hours) at the configured accuracy
+    """
+    return DDSketch(settings.ROLLUP_SKETCH_ACCURACY)
+
+
+def sketch_key(hours, sketch: DDSketch):
+    # DDSketch.key in SQL; constants as literals so the expression can be grouped on
+    return case(
+        (hours > literal_column(repr(sketch.min_value)),
+         func.ceil(func.ln(hours) / literal_column(repr(sketch.log_gamma)))),
+        else_=None
+    )
+
+
+class BucketStats:
+    """
+    Additive ticket counts for one bucket and scope; averages and rates are
+    derived, so buckets can be merged exactly. Resolution-time percentiles
+    come from DDSketches, overall and per priority, which merge the same way.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.resolved = 0
+        self.sla_met = 0
+        self.resolution_hours = 0.0
+        self.rating_total = 0
+        self.rated = 0
+        self.by_priority: Dict[str, Dict[str, float]] = {}
+        self.by_category: Dict[str, Dict[str, float]] = {}
+        self.resolution_sketch = new_sketch()
+        self.priority_sketches: Dict[str, DDSketch] = {}
+
+    @staticmethod
+    def _add_breakdown(target: Dict[str, Dict[str, float]], source: Dict[str, Dict[str, float]]) -> None:
+        for key, counts in source.items():
+            entry = target.setdefault(key, {"total": 0, "met": 0, "resolution_hours": 0.0})
+            for field, value in counts.items():
+                entry[field] = entry.get(field, 0) + value
+
+    def add_resolved(self, row) -> None:
+        self.resolved += row.resolved
+        self.sla_met += row.sla_met
+        self.resolution_hours += float(row.resolution_hours)
+        self.rating_total += row.rating_total
+        self.rated += row.rated
+        counts = {"total": row.resolved, "met": row.sla_met, "resolution_hours": float(row.resolution_hours)}
+        self._add_breakdown(self.by_priority, {row.priority.value: counts})
+        self._add_breakdown(self.by_category, {row.category.value: counts})
+
+    def add_sketch_bin(self, priority: str, key: Optional[int], count: int) -> None:
+        self.resolution_sketch.add_bin(key, count)
+        self.priority_sketches.setdefault(priority, new_sketch()).add_bin(key, count)
+
+    def merge_sketches(self, sketch: DDSketch, priority_sketches: Dict[str, DDSketch]) -> None:
+        self.resolution_sketch.merge(sketch)
+        for priority, priority_sketch in priority_sketches.items():
+            self.priority_sketches.setdefault(priority, new_sketch()).merge(priority_sketch)
+
+    def merge(self, other: "BucketStats") -> None:
+        self.created += other.created
+        self.resolved += other.resolved
+        self.sla_met += other.sla_met
+        self.resolution_hours += other.resolution_hours
+        self.rating_total += other.rating_total
+        self.rated += other.rated
+        self._add_breakdown(self.by_priority, other.by_priority)
+        self._add_breakdown(self.by_category, other.by_category)
+        self.merge_sketches(other.resolution_sketch, other.priority_sketches)
+
+    @property
+    def avg_resolution_time(self) -> Optional[float]:
+        return self.resolution_hours / self.resolved if self.resolved else None
+
+    @property
+    def compliance_rate(self) -> float:
+        return self.sla_met / self.resolved * 100 if self.resolved else 100.0
+
+    @property
+    def satisfaction(self) -> Optional[float]:
+        return self.rating_total / self.rated if self.rated else None
+
+    def metric_rows(self) -> List[Tuple[str, float, int, Optional[Dict[str, Any]]]]:
+        """
+        ``(metric_type, metric_value, ticket_count, system_metadata)`` for the
+        PerformanceMetric rows of this bucket; empty metrics are left out
+        """
+        rows = []
+        if self.created:
+            rows.append(("tickets_created", self.created, self.created, None))
+        if self.resolved:
+            rows.append(("tickets_resolved", self.resolved, self.resolved, None))
+            rows.append(("resolution_time", self.avg_resolution_time, self.resolved, {
+                "total_hours": self.resolution_hours,
+                "sketch": self.resolution_sketch.to_dict(),
+                "priority_sketches": {p: sketch.to_dict() for p, sketch in self.priority_sketches.items()}
+            }))
+            rows.append(("sla_compliance", self.compliance_rate, self.resolved, {"met": self.sla_met}))
+        if self.rated:
+            rows.append(("satisfaction", self.satisfaction, self.rated, {"total": self.rating_total}))
+        return rows
+
+    def add_metric(self, row) -> None:
+        """
+        Fold a PerformanceMetric row written by ``metric_rows`` back in
+        """
+        metadata = row.system_metadata or {}
+        if row.metric_type == "tickets_created":
+            self.created += row.ticket_count
+        elif row.metric_type == "tickets_resolved":
+            self.resolved += row.ticket_count
+        elif row.metric_type == "resolution_time":
+            self.resolution_hours += metadata.get("total_hours", 0.0)
+            # Rows written before sketches were kept have none; see manage_rollups.py rebuild
+            if "sketch" in metadata:
+                self.merge_sketches(
+                    DDSketch.from_dict(metadata["sketch"]),
+                    {p: DDSketch.from_dict(d) for p, d in metadata.get("priority_sketches", {}).items()}
+                )
+        elif row.metric_type == "sla_compliance":
+            self.sla_met += metadata.get("met", 0)
+        elif row.metric_type == "satisfaction":
+            self.rating_total += metadata.get("total", 0)
+            self.rated += row.ticket_count
+
+
+async def aggregate(db, period: str, starts: Iterable[date]) -> Dict[BucketKey, BucketStats]:
+    """
+    Compute the buckets starting on ``starts`` from the tickets, per
+    department and per assigned engineer. Tickets count as created in the
+    bucket of their ``created_at`` and as resolved in that of their
+    ``resolved_at``. Resolution times reach the sketches as counts per
+    sketch bin, binned in SQL.
+    """
+    starts = sorted(set(starts))
+    if not starts:
+        return {}
+    # Literals rather than binds, so the bucket expression matches its GROUP BY
+    unit = literal_column(f"'{ROLLUP_PERIODS[period]}'")
+    utc = literal_column("'UTC'")
+    lower, upper = _utc(starts[0]), _utc(bucket_end(starts[-1], period))
+    wanted = [datetime(s.year, s.month, s.day) for s in starts]
+
+    def bucket(column):
+        return func.date_trunc(unit, func.timezone(utc, column), type_=DateTime())
+
+    created_query = (
+        select(
+            bucket(Ticket.created_at).label("bucket"), Ticket.department_id, Ticket.assigned_to_id,
+            func.count().label("created")
+        )
+        .where(Ticket.created_at >= lower, Ticket.created_at < upper, bucket(Ticket.created_at).in_(wanted))
+        .group_by(bucket(Ticket.created_at), Ticket.department_id, Ticket.assigned_to_id)
+    )
+    resolution_hours = func.extract("epoch", Ticket.resolved_at - Ticket.created_at) / 3600
+    resolved_in_buckets = (
+        Ticket.resolved_at >= lower, Ticket.resolved_at < upper,
+        Ticket.status.in_(RESOLVED_STATUSES), bucket(Ticket.resolved_at).in_(wanted)
+    )
+    resolved_query = (
+        select(
+            bucket(Ticket.resolved_at).label("bucket"), Ticket.department_id, Ticket.assigned_to_id,
+            Ticket.priority, Ticket.category,
+            func.count().label("resolved"),
+            func.count().filter(Ticket.resolved_at <= Ticket.sla_deadline).label("sla_met"),
+            func.coalesce(func.sum(resolution_hours), 0).label("resolution_hours"),
+            func.coalesce(func.sum(Ticket.customer_satisfaction), 0).label("rating_total"),
+            func.count(Ticket.customer_satisfaction).label("rated")
+        )
+        .where(*resolved_in_buckets)
+        .group_by(
+            bucket(Ticket.resolved_at), Ticket.department_id, Ticket.assigned_to_id,
+            Ticket.priority, Ticket.category
+        )
+    )
+    sketch_query = (
+        select(
+            bucket(Ticket.resolved_at).label("bucket"), Ticket.department_id, Ticket.assigned_to_id,
+            Ticket.priority, sketch_key(resolution_hours, new_sketch()).label("sketch_key"),
+            func.count().label("count")
+        )
+        .where(*resolved_in_buckets)
+        .group_by(
+            bucket(Ticket.resolved_at), Ticket.department_id, Ticket.assigned_to_id,
+            Ticket.priority, literal_column("sketch_key")
+        )
+    )
+
+    stats: Dict[BucketKey, BucketStats] = {}
+
+    def scopes(row) -> List[BucketStats]:
+        keys = [(row.bucket.date(), "department", row.department_id)]
+        if row.assigned_to_id is not None:
+            keys.append((row.bucket.date(), "engineer", row.assigned_to_id))
+        return [stats.setdefault(key, BucketStats()) for key in keys]
+
+    for row in (await db.execute(created_query)).all():
+        for bucket_stats in scopes(row):
+            bucket_stats.created += row.created
+    for row in (await db.execute(resolved_query)).all():
+        for bucket_stats in scopes(row):
+            bucket_stats.add_resolved(row)
+    for row in (await db.execute(sketch_query)).all():
+        key = int(row.sketch_key) if row.sketch_key is not None else None
+        for bucket_stats in scopes(row):
+            bucket_stats.add_sketch_bin(row.priority.value, key, row.count)
+    return stats
+
+
+async def write_buckets(db, period: str, starts: Iterable[date], stats: Dict[BucketKey, BucketStats]) -> None:
+    """
+    Replace the rollup rows of the buckets starting on ``starts``; runs in
+    the caller's transaction
+    """
+    start_values = [_utc(s) for s in set(starts)]
+    if not start_values:
+        return
+    await db.execute(delete(PerformanceMetric).where(
+        PerformanceMetric.time_period == period, PerformanceMetric.start_date.in_(start_values)
+    ))
+    await db.execute(delete(SLAReport).where(
+        SLAReport.time_period == period, SLAReport.report_date.in_(start_values)
+    ))
+
+    metric_rows, report_rows = [], []
+    for (start, scope, scope_id), bucket_stats in stats.items():
+        owner = {"department_id": scope_id, "user_id": None} if scope == "department" else {"department_id": None, "user_id": scope_id}
+        for metric_type, value, count, metadata in bucket_stats.metric_rows():
+            metric_rows.append({
+                **owner,
+                "metric_type": metric_type,
+                "metric_value": value,
+                "time_period": period,
+                "start_date": _utc(start),
+                "end_date": _utc(bucket_end(start, period)),
+                "ticket_count": count,
+                "system_metadata": metadata
+            })
+        if scope == "department" and bucket_stats.resolved:
+            report_rows.append({
+                "report_date": _utc(start),
+                "time_period": period,
+                "department_id": scope_id,
+                "total_tickets": bucket_stats.resolved,
+                "met_sla": bucket_stats.sla_met,
+                "breached_sla": bucket_stats.resolved - bucket_stats.sla_met,
+                "at_risk": 0,  # A live measure; see AnalyticsService.get_sla_report
+                "compliance_rate": bucket_stats.compliance_rate,
+                "avg_resolution_time": bucket_stats.avg_resolution_time,
+                "priority_breakdown": bucket_stats.by_priority,
+                "category_breakdown": bucket_stats.by_category
+            })
+    if metric_rows:
+        await db.execute(insert(PerformanceMetric), metric_rows)
+    if report_rows:
+        await db.execute(insert(SLAReport), report_rows)
+
+
+async def refresh_days(db, days: Iterable[date]) -> None:
+    """
+    Recompute every daily, weekly and monthly bucket containing one of
+    ``days``
+    """
+    days = set(days)
+    for period in ROLLUP_PERIODS:
+        starts = {bucket_start(day, period) for day in days}
+        await write_buckets(db, period, starts, await aggregate(db, period, starts))
+
+
+def cover(start: date, end: date) -> List[Tuple[str, date]]:
+    """
+    The fewest rollup buckets that exactly cover the days from ``start`` up
+    to (not including) ``end``: whole months, then whole weeks, then days
+    """
+    buckets = []
+    day = start
+    while day < end:
+        if day.day == 1 and add_months(day, 1) <= end:
+            buckets.append(("monthly", day))
+            day = add_months(day, 1)
+        elif day.weekday() == 0 and day + timedelta(days=7) <= end:
+            buckets.append(("weekly", day))
+            day += timedelta(days=7)
+        else:
+            buckets.append(("daily", day))
+            day += timedelta(days=1)
+    return buckets
+
+
+def _covering(period_column, start_column, start: date, end: date):
+    """
+    Condition selecting the rollup rows of ``cover(start, end)``, or None
+    if there are none
+    """
+    by_period: Dict[str, List[datetime]] = {}
+    for period, bucket in cover(start, end):
+        by_period.setdefault(period, []).append(_utc(bucket))
+    if not by_period:
+        return None
+    return or_(*[(period_column == period) & start_column.in_(values) for period, values in by_period.items()])
+
+
+async def read_totals(db, start: date, department_id: Optional[int] = None,
+                      user_id: Optional[int] = None) -> BucketStats:
+    """
+    Ticket totals from ``start`` through now, for one department, one
+    engineer or (neither given) every department. Whole days come from the
+    rollups and the current day is aggregated live, so the result is at most
+    one rollup interval behind for past days and exact for today. Priority
+    and category breakdowns are kept per department only, so they are
+    empty for an engineer.
+    """
+    today = _today()
+    covering = _covering(PerformanceMetric.time_period, PerformanceMetric.start_date, start, today)
+    totals = BucketStats()
+
+    if covering is not None:
+        metric_query = select(
+            PerformanceMetric.metric_type, PerformanceMetric.ticket_count, PerformanceMetric.system_metadata
+        ).where(covering)
+        if user_id is not None:
+            metric_query = metric_query.where(PerformanceMetric.user_id == user_id)
+        elif department_id is not None:
+            metric_query = metric_query.where(PerformanceMetric.department_id == department_id)
+        else:
+            metric_query = metric_query.where(PerformanceMetric.department_id.isnot(None))
+        for row in (await db.execute(metric_query)).all():
+            totals.add_metric(row)
+
+        if user_id is None:
+            report_query = select(SLAReport.priority_breakdown, SLAReport.category_breakdown).where(
+                _covering(SLAReport.time_period, SLAReport.report_date, start, today)
+            )
+            if department_id is not None:
+                report_query = report_query.where(SLAReport.department_id == department_id)
+            for row in (await db.execute(report_query)).all():
+                BucketStats._add_breakdown(totals.by_priority, row.priority_breakdown or {})
+                BucketStats._add_breakdown(totals.by_category, row.category_breakdown or {})
+
+    # The current day changes constantly, so read it from the tickets
+    for (_, scope, scope_id), bucket_stats in (await aggregate(db, "daily", [today])).items():
+        if user_id is not None:
+            wanted = scope == "engineer" and scope_id == user_id
+        else:
+            wanted = scope == "department" and department_id in (None, scope_id)
+        if wanted:
+            totals.merge(bucket_stats)
+    return totals
+
+
+async def read_buckets(db, period: str, starts: Iterable[date], scope: str = "department") -> Dict[BucketKey, BucketStats]:
+    """
+    Stored rollups of the given buckets, per department or per engineer
+    """
+    starts = [_utc(s) for s in set(starts)]
+    if not starts:
+        return {}
+    owner = PerformanceMetric.department_id if scope == "department" else PerformanceMetric.user_id
+    result = await db.execute(
+        select(
+            PerformanceMetric.start_date, owner.label("owner_id"), PerformanceMetric.metric_type,
+            PerformanceMetric.ticket_count, PerformanceMetric.system_metadata
+        )
+        .where(PerformanceMetric.time_period == period, PerformanceMetric.start_date.in_(starts), owner.isnot(None))
+    )
+    stats: Dict[BucketKey, BucketStats] = {}
+    for row in result.all():
+        key = (row.start_date.astimezone(timezone.utc).date(), scope, row.owner_id)
+        stats.setdefault(key, BucketStats()).add_metric(row)
+    return stats
+
+
+class RollupJob:
+    """
+    Keeps the rollups current: each run finds the tickets changed since the
+    watermark (``coalesce(updated_at, created_at)``) and recomputes every
+    bucket holding their creation or resolution day. The first run, with no
+    watermark, builds the rollups for all tickets.
+
+    A ticket resolved a second time is counted on its latest resolution
+    day; the bucket of the earlier one is only corrected by ``rebuild``.
+    """
+
+    def __init__(self, overlap_seconds: int = 300):
+        self.overlap_seconds = overlap_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def _changed_days(self, db, since: Optional[datetime]) -> set:
+        utc = literal_column("'UTC'")
+        query = select(
+            func.date(func.timezone(utc, Ticket.created_at)),
+            func.date(func.timezone(utc, Ticket.resolved_at))
+        ).distinct()
+        if since is not None:
+            query = query.where(func.coalesce(Ticket.updated_at, Ticket.created_at) > since)
+        days = set()
+        for created_day, resolved_day in (await db.execute(query)).all():
+            days.update(day for day in (created_day, resolved_day) if day is not None)
+        return days
+
+    async def run_once(self) -> int:
+        """
+        Bring the rollups up to date and return the number of days
+        recomputed; does nothing if another run holds the lock
+        """
+        async with get_db_context() as db:
+            locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": ROLLUP_LOCK_ID})
+            if not locked.scalar():
+                return 0
+            run_started = (await db.execute(select(func.now()))).scalar()
+            watermark = (await db.execute(
+                select(RollupWatermark.watermark).where(RollupWatermark.name == WATERMARK_NAME)
+            )).scalar()
+            since = watermark - timedelta(seconds=self.overlap_seconds) if watermark else None
+
+            days = await self._changed_days(db, since)
+            await refresh_days(db, days)
+            await db.execute(
+                pg_insert(RollupWatermark)
+                .values(name=WATERMARK_NAME, watermark=run_started)
+                .on_conflict_do_update(index_elements=[RollupWatermark.name], set_={"watermark": run_started})
+            )
+            await db.commit()
+            return len(days)
+
+    async def rebuild(self, start: date, end: Optional[date] = None) -> int:
+        """
+        Recompute every bucket holding a day from ``start`` through ``end``
+        (default today), whether or not its tickets changed
+        """
+        end = end or _today()
+        days = {start + timedelta(days=offset) for offset in range((end - start).days + 1)}
+        async with get_db_context() as db:
+            await db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": ROLLUP_LOCK_ID})
+            await refresh_days(db, days)
+            await db.commit()
+        return len(days)
+
+    async def _run_periodically(self, interval_seconds: int) -> None:
+        while True:
+            try:
+                days = await self.run_once()
+                if days:
+                    logger.info(f"Rolled up ticket analytics for {days} days")
+            except Exception as e:
+                logger.error(f"Analytics rollup failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    async def start(self, interval_seconds: int) -> None:
+        """
+        Run now, in the background, and then every ``interval_seconds``
+        """
+        if interval_seconds > 0:
+            self._task = asyncio.create_task(self._run_periodically(interval_seconds))
+            logger.info("✓ Analytics rollups scheduled")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+rollup_job = RollupJob(overlap_seconds=settings.ROLLUP_OVERLAP_SECONDS)
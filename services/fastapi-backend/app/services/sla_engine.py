@@ -0,0 +1,351 @@
+"""
+SLA engine: target times per priority/category and business-hours calendars
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from zoneinfo import ZoneInfo
+import json
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import select, text
+
+from app.models.ticket import Ticket, TicketCategory, TicketPriority, TicketStatus
+from app.models.user import Department
+
+logger = logging.getLogger(__name__)
+
+# Resolution targets in hours, adjusted per category
+SLA_TARGET_HOURS = {
+    TicketPriority.CRITICAL: 2,
+    TicketPriority.HIGH: 8,
+    TicketPriority.MEDIUM: 24,
+    TicketPriority.LOW: 72
+}
+SLA_CATEGORY_MULTIPLIERS = {
+    TicketCategory.INCIDENT: 0.8,  # Faster for incidents
+    TicketCategory.CHANGE: 2.0     # Longer for changes
+}
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+HORIZON_START = date(2020, 1, 1)
+HORIZON_YEARS = 2
+RECOMPUTE_CHUNK_SIZE = 10000
+
+
+def sla_target_minutes(priority: TicketPriority, category: TicketCategory) -> float:
+    """
+    Working minutes allowed to resolve a ticket
+    """
+    hours = SLA_TARGET_HOURS.get(priority, 24) * SLA_CATEGORY_MULTIPLIERS.get(category, 1.0)
+    return hours * 60
+
+
+def _parse_clock(value: str) -> int:
+    hours, minutes = (int(part) for part in value.split(":"))
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time of day: {value}")
+    return hours * 60 + minutes
+
+
+def _to_utc(value: datetime) -> datetime:
+    # Naive datetimes in this app are UTC (datetime.utcnow())
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class BusinessCalendar:
+    """
+    Working hours of a department: weekly opening hours in a timezone,
+    minus holidays.
+
+    Working time is precomputed as a sorted table of open intervals (UTC
+    epoch seconds) with the cumulative working time before each one. Adding
+    working time to a timestamp is then two binary searches: position of the
+    start in the cumulative table, and the interval where start + duration
+    lands. The same tables back a vectorised NumPy path for bulk
+    recomputation. Without opening hours the calendar is open 24x7.
+    """
+
+    def __init__(self, timezone: str = "UTC", hours: Optional[Dict[str, List[List[str]]]] = None,
+                 holidays: Iterable[Any] = ()):
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+        self.holidays = {date.fromisoformat(str(day)) for day in holidays}
+        self.always_open = hours is None and not self.holidays
+
+        if hours is None:
+            hours = {day: [["00:00", "24:00"]] for day in WEEKDAYS}
+        self._hours: Dict[int, List[Tuple[int, int]]] = {}
+        for day, intervals in hours.items():
+            if day not in WEEKDAYS:
+                raise ValueError(f"Unknown weekday: {day}")
+            parsed = []
+            for start, end in intervals:
+                start_minute, end_minute = _parse_clock(start), _parse_clock(end)
+                if end_minute <= start_minute:
+                    raise ValueError(f"Business hours interval ends before it starts: {start}-{end}")
+                parsed.append((start_minute, end_minute))
+            self._hours[WEEKDAYS.index(day)] = sorted(parsed)
+        if not any(self._hours.values()):
+            raise ValueError("Business hours must contain at least one working interval")
+
+        self._first_day: Optional[date] = None
+        self._last_day: Optional[date] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "BusinessCalendar":
+        """
+        Build a calendar from a department's ``business_hours`` JSON
+        (``{"timezone": ..., "hours": {"mon": [["09:00", "17:00"]]}, "holidays": [...]}``)
+        """
+        if not config:
+            return cls()
+        return cls(
+            timezone=config.get("timezone", "UTC"),
+            hours=config.get("hours"),
+            holidays=config.get("holidays", ())
+        )
+
+    # Lookup tables
+
+    def _local_timestamp(self, day: date, minute: int) -> float:
+        # Aware datetime arithmetic is wall-clock, so DST days come out right
+        return (datetime.combine(day, dt_time(), tzinfo=self.tz) + timedelta(minutes=minute)).timestamp()
+
+    def _build(self, first_day: date, last_day: date) -> None:
+        starts: List[float] = []
+        ends: List[float] = []
+        day = first_day
+        while day <= last_day:
+            if day not in self.holidays:
+                for start_minute, end_minute in self._hours.get(day.weekday(), ()):
+                    start = self._local_timestamp(day, start_minute)
+                    end = self._local_timestamp(day, end_minute)
+                    if ends and start <= ends[-1]:
+                        # Merge intervals that touch, e.g. across midnight
+                        ends[-1] = max(ends[-1], end)
+                    else:
+                        starts.append(start)
+                        ends.append(end)
+            day += timedelta(days=1)
+
+        lengths = [end - start for start, end in zip(starts, ends)]
+        self._starts = starts
+        self._ends = ends
+        self._cum_end = list(accumulate(lengths))
+        self._cum_before = [total - length for total, length in zip(self._cum_end, lengths)]
+        self._starts_array = np.array(starts, dtype=np.float64)
+        self._ends_array = np.array(ends, dtype=np.float64)
+        self._cum_end_array = np.array(self._cum_end, dtype=np.float64)
+        self._cum_before_array = np.array(self._cum_before, dtype=np.float64)
+        self._first_day = first_day
+        self._last_day = last_day
+
+    def _ensure_covers(self, timestamp: float) -> None:
+        day = datetime.fromtimestamp(timestamp, self.tz).date()
+        if self._first_day is not None and self._first_day < day < self._last_day:
+            return
+        first_day = min(HORIZON_START, day - timedelta(days=31))
+        if self._first_day is not None:
+            first_day = min(first_day, self._first_day)
+        last_day = max(day, self._last_day or day, datetime.utcnow().date())
+        self._build(first_day, last_day.replace(year=last_day.year + HORIZON_YEARS))
+
+    def _extend(self) -> None:
+        self._build(self._first_day, self._last_day.replace(year=self._last_day.year + HORIZON_YEARS))
+
+    # Scalar path
+
+    def _position(self, timestamp: float) -> float:
+        """Working seconds between the start of the table and ``timestamp``"""
+        k = bisect_right(self._starts, timestamp) - 1
+        if k < 0:
+            return 0.0
+        return self._cum_before[k] + min(timestamp - self._starts[k], self._ends[k] - self._starts[k])
+
+    def working_minutes_between(self, start: datetime, end: datetime) -> float:
+        """
+        Working minutes between two instants
+        """
+        start_ts, end_ts = _to_utc(start).timestamp(), _to_utc(end).timestamp()
+        if end_ts <= start_ts:
+            return 0.0
+        if self.always_open:
+            return (end_ts - start_ts) / 60
+        self._ensure_covers(start_ts)
+        self._ensure_covers(end_ts)
+        return (self._position(end_ts) - self._position(start_ts)) / 60
+
+    def add_working_minutes(self, start: datetime, minutes: float) -> datetime:
+        """
+        The instant at which ``minutes`` of working time have elapsed after ``start``
+        """
+        start = _to_utc(start)
+        if self.always_open:
+            return start + timedelta(minutes=minutes)
+
+        start_ts = start.timestamp()
+        self._ensure_covers(start_ts)
+        target = self._position(start_ts) + minutes * 60
+        while target > self._cum_end[-1]:
+            self._extend()
+        k = bisect_left(self._cum_end, target)
+        return datetime.fromtimestamp(self._starts[k] + (target - self._cum_before[k]), timezone.utc)
+
+    # Vectorised path
+
+    def add_working_minutes_array(self, starts: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+        """
+        Vectorised ``add_working_minutes`` over UTC epoch seconds; returns
+        UTC epoch seconds
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        seconds = np.asarray(minutes, dtype=np.float64) * 60
+        if self.always_open or starts.size == 0:
+            return starts + seconds
+
+        self._ensure_covers(float(starts.min()))
+        self._ensure_covers(float(starts.max()))
+        while True:
+            k = np.searchsorted(self._starts_array, starts, side="right") - 1
+            inside = np.maximum(k, 0)
+            elapsed = np.clip(
+                starts - self._starts_array[inside],
+                0,
+                self._ends_array[inside] - self._starts_array[inside]
+            )
+            targets = np.where(k >= 0, self._cum_before_array[inside] + elapsed, 0.0) + seconds
+            if targets.max() <= self._cum_end_array[-1]:
+                break
+            self._extend()
+
+        k = np.searchsorted(self._cum_end_array, targets, side="left")
+        return self._starts_array[k] + (targets - self._cum_before_array[k])
+
+
+class SLAEngine:
+    """
+    Computes SLA deadlines on each department's business calendar. Calendars
+    are cached per process for ``cache_seconds``; identical configurations
+    share one calendar and its lookup tables.
+    """
+
+    def __init__(self, cache_seconds: int = 300):
+        self.cache_seconds = cache_seconds
+        self._departments: Dict[int, Tuple[BusinessCalendar, float]] = {}
+        self._calendars: Dict[str, BusinessCalendar] = {}
+
+    def calendar_from_config(self, config: Optional[Dict[str, Any]]) -> BusinessCalendar:
+        key = json.dumps(config or {}, sort_keys=True, default=str)
+        calendar = self._calendars.get(key)
+        if calendar is None:
+            calendar = self._calendars[key] = BusinessCalendar.from_config(config)
+        return calendar
+
+    async def calendar_for(self, db, department_id: int) -> BusinessCalendar:
+        """
+        Business calendar of a department
+        """
+        cached = self._departments.get(department_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        result = await db.execute(select(Department.business_hours).where(Department.id == department_id))
+        calendar = self.calendar_from_config(result.scalar())
+        self._departments[department_id] = (calendar, time.monotonic() + self.cache_seconds)
+        return calendar
+
+    def invalidate(self, department_id: Optional[int] = None) -> None:
+        if department_id is None:
+            self._departments.clear()
+        else:
+            self._departments.pop(department_id, None)
+
+    async def deadline(self, db, department_id: int, priority: TicketPriority,
+                       category: TicketCategory, start: Optional[datetime] = None) -> datetime:
+        """
+        SLA deadline for a new ticket
+        """
+        calendar = await self.calendar_for(db, department_id)
+        return calendar.add_working_minutes(start or datetime.utcnow(), sla_target_minutes(priority, category))
+
+    async def resume(self, db, department_id: int, sla_deadline: datetime, paused_at: datetime,
+                     resumed_at: Optional[datetime] = None) -> Tuple[datetime, float]:
+        """
+        Push a deadline back by the working time spent on hold. Returns the new
+        deadline and the working minutes paused.
+        """
+        calendar = await self.calendar_for(db, department_id)
+        paused_minutes = calendar.working_minutes_between(paused_at, resumed_at or datetime.utcnow())
+        return calendar.add_working_minutes(sla_deadline, paused_minutes), paused_minutes
+
+    async def recompute_department(self, db, department_id: int) -> List[Any]:
+        """
+        Recompute the deadlines of a department's unresolved tickets after
+        its calendar changed. Deadlines are computed in one vectorised pass
+        and written back in chunks; the caller commits. Returns the updated
+        tickets (``id, title, priority, status, assigned_to_id, sla_deadline``).
+        """
+        calendar = await self.calendar_for(db, department_id)
+        result = await db.execute(
+            select(
+                Ticket.id,
+                Ticket.title,
+                Ticket.priority,
+                Ticket.category,
+                Ticket.status,
+                Ticket.assigned_to_id,
+                Ticket.created_at,
+                Ticket.sla_paused_minutes
+            ).where(
+                Ticket.department_id == department_id,
+                Ticket.status.notin_([TicketStatus.RESOLVED, TicketStatus.CLOSED])
+            )
+        )
+        tickets = result.all()
+        if not tickets:
+            return []
+
+        starts = np.fromiter((_to_utc(t.created_at).timestamp() for t in tickets), dtype=np.float64, count=len(tickets))
+        minutes = np.fromiter(
+            (sla_target_minutes(t.priority, t.category) + (t.sla_paused_minutes or 0) for t in tickets),
+            dtype=np.float64,
+            count=len(tickets)
+        )
+        deadlines = [
+            datetime.fromtimestamp(ts, timezone.utc)
+            for ts in calendar.add_working_minutes_array(starts, minutes).tolist()
+        ]
+
+        statement = text(
+            "UPDATE tickets SET sla_deadline = data.deadline, version = tickets.version + 1, updated_at = now() "
+            "FROM unnest(CAST(:ids AS VARCHAR[]), CAST(:deadlines AS TIMESTAMPTZ[])) AS data(id, deadline) "
+            "WHERE tickets.id = data.id"
+        )
+        for offset in range(0, len(tickets), RECOMPUTE_CHUNK_SIZE):
+            chunk = slice(offset, offset + RECOMPUTE_CHUNK_SIZE)
+            await db.execute(statement, {
+                "ids": [t.id for t in tickets[chunk]],
+                "deadlines": deadlines[chunk]
+            })
+
+        logger.info(f"Recomputed SLA deadlines of {len(tickets)} tickets in department {department_id}")
+        return [
+            {
+                "id": t.id,
+                "title": t.title,
+                "priority": t.priority,
+                "status": t.status,
+                "assigned_to_id": t.assigned_to_id,
+                "sla_deadline": deadline
+            }
+            for t, deadline in zip(tickets, deadlines)
+        ]
+
+
+sla_engine = SLAEngine()
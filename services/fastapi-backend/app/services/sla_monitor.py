@@ -0,0 +1,283 @@
+"""
+Background SLA monitor: pushes "approaching breach" and "breached" events to
+ticket assignees at the moment they become due
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+from datetime import datetime, timezone
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+from sqlalchemy import select, text
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import get_db_context
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services.outbox import outbox_dispatcher, publish
+from app.services.workload_index import ACTIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+SLA_WARNING = "sla_warning"
+SLA_BREACHED = "sla_breached"
+
+# Held by the one process that announces SLA events
+SLA_MONITOR_LOCK_ID = 7_401_014
+
+_TRACKED_COLUMNS = (
+    Ticket.id, Ticket.title, Ticket.priority, Ticket.sla_deadline, Ticket.assigned_to_id, Ticket.status
+)
+
+
+class _TrackedTicket(NamedTuple):
+    title: str
+    priority: Optional[TicketPriority]
+    deadline: float  # epoch seconds
+    assignee_id: Optional[int]
+    breached: bool
+
+
+def _epoch(value: datetime) -> float:
+    # Naive datetimes in this app are UTC (datetime.utcnow())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SLAMonitor:
+    """
+    Keeps the SLA deadline of every open or in-progress ticket in a min-heap
+    of due events and sleeps until the next one.
+
+    The ticket endpoints report changes through ``track``, and every
+    process also follows the changes made elsewhere through the outbox's
+    live delivery; the whole set is reloaded from the database every
+    ``reconcile_seconds`` to correct any drift. Entries made stale by a
+    later change are not removed from the heap; they are recognised and
+    dropped when they come due.
+
+    Every process keeps the schedule, but only the one holding an advisory
+    lock announces events. It publishes them to the outbox, whose live
+    delivery reaches the assignee's sockets on every replica.
+    """
+
+    def __init__(self, warning_minutes: int = 60, reconcile_seconds: int = 300):
+        self.warning_seconds = warning_minutes * 60
+        self.reconcile_seconds = reconcile_seconds
+        self._tickets: Dict[str, _TrackedTicket] = {}
+        self._heap: List[tuple] = []  # (due_at, seq, ticket_id, event, deadline)
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._lock_connection = None
+
+    def track(self, ticket_id: str, title: str, priority: Optional[TicketPriority],
+              sla_deadline: Optional[datetime], assigned_to_id: Optional[int],
+              status: TicketStatus, notify_overdue: bool = True) -> None:
+        """
+        Record a ticket's current state and schedule its SLA events. Tickets
+        that are no longer open or in progress stop being monitored.
+        ``notify_overdue`` sends "breached" right away for a deadline that has
+        already passed.
+        """
+        if status not in ACTIVE_STATUSES or sla_deadline is None:
+            self._tickets.pop(ticket_id, None)
+            return
+
+        deadline = _epoch(sla_deadline)
+        now = time.time()
+        previous = self._tickets.get(ticket_id)
+        same_deadline = previous is not None and previous.deadline == deadline
+        breached = previous.breached if same_deadline else deadline <= now
+        tracked = _TrackedTicket(title, priority, deadline, assigned_to_id, breached)
+        self._tickets[ticket_id] = tracked
+
+        if same_deadline:
+            # Pending events are still valid and read the current assignee
+            # when they fire; a breach that already happened is re-announced
+            # to a new assignee
+            if tracked.breached and notify_overdue and assigned_to_id != previous.assignee_id:
+                self._schedule(now, ticket_id, SLA_BREACHED, deadline)
+            return
+
+        if deadline - self.warning_seconds > now:
+            self._schedule(deadline - self.warning_seconds, ticket_id, SLA_WARNING, deadline)
+        if deadline > now:
+            self._schedule(deadline, ticket_id, SLA_BREACHED, deadline)
+        elif notify_overdue:
+            self._schedule(now, ticket_id, SLA_BREACHED, deadline)
+
+    def _schedule(self, due_at: float, ticket_id: str, event: str, deadline: float) -> None:
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (due_at, next(self._sequence), ticket_id, event, deadline))
+        if earliest is None or due_at < earliest:
+            self._wakeup.set()
+
+        # Drop stale entries once they clearly outnumber live ones
+        if len(self._heap) > 4 * len(self._tickets) + 1000:
+            self._heap = [
+                entry for entry in self._heap
+                if entry[2] in self._tickets and self._tickets[entry[2]].deadline == entry[4]
+            ]
+            heapq.heapify(self._heap)
+
+    def _track_row(self, ticket, notify_overdue: bool) -> None:
+        self.track(
+            ticket.id, ticket.title, ticket.priority, ticket.sla_deadline,
+            ticket.assigned_to_id, ticket.status, notify_overdue=notify_overdue
+        )
+
+    async def track_events(self, db, events: List[Any]) -> None:
+        """
+        Live outbox consumer: re-read the tickets changed in any process
+        """
+        ticket_ids = {
+            ticket_id
+            for event in events if event.event_type not in (SLA_WARNING, SLA_BREACHED)
+            for ticket_id in event.payload["ticket_ids"]
+        }
+        if not ticket_ids:
+            return
+        result = await db.execute(select(*_TRACKED_COLUMNS).where(Ticket.id.in_(ticket_ids)))
+        found = set()
+        for ticket in result.all():
+            found.add(ticket.id)
+            self._track_row(ticket, notify_overdue=True)
+        for ticket_id in ticket_ids - found:
+            self._tickets.pop(ticket_id, None)
+
+    async def reconcile(self, notify_overdue: bool = False) -> None:
+        """
+        Replace the tracked tickets with the active tickets in the database.
+        Breaches found overdue here were announced by whoever saw them happen
+        (or nobody was listening), unless ``notify_overdue``.
+        """
+        tracked_before = set(self._tickets)
+        async with get_db_context() as session:
+            result = await session.execute(select(*_TRACKED_COLUMNS).where(Ticket.status.in_(ACTIVE_STATUSES)))
+            active = set()
+            for ticket in result.all():
+                active.add(ticket.id)
+                self._track_row(ticket, notify_overdue)
+        # Only forget tickets tracked before the read; newer ones were reported meanwhile
+        for ticket_id in tracked_before - active:
+            self._tickets.pop(ticket_id, None)
+
+    async def _is_announcer(self) -> bool:
+        """
+        Whether this process holds the announcer lock, trying to take it if
+        not; the lock lives as long as a dedicated connection
+        """
+        try:
+            if self._lock_connection is not None:
+                raw = await self._lock_connection.get_raw_connection()
+                if not raw.driver_connection.is_closed():
+                    return True
+                await self._release_lock()
+            connection = await database.async_engine.connect()
+            locked = (await connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": SLA_MONITOR_LOCK_ID}
+            )).scalar()
+            await connection.commit()
+            if locked:
+                self._lock_connection = connection
+                logger.info("SLA monitor is announcing SLA events from this process")
+                return True
+            await connection.close()
+        except Exception as e:
+            logger.error(f"SLA monitor lock check failed: {str(e)}")
+            await self._release_lock()
+        return False
+
+    async def _release_lock(self) -> None:
+        if self._lock_connection is not None:
+            try:
+                await self._lock_connection.close()
+            except Exception:
+                pass
+            self._lock_connection = None
+
+    async def _fire(self, ticket_id: str, event: str, deadline: float) -> None:
+        tracked = self._tickets.get(ticket_id)
+        if tracked is None or tracked.deadline != deadline:
+            return  # Ticket closed or deadline moved since this was scheduled
+
+        if event == SLA_WARNING:
+            if tracked.breached:
+                return
+        else:
+            self._tickets[ticket_id] = tracked._replace(breached=True)
+
+        if not await self._is_announcer():
+            return
+        if tracked.assignee_id is None:
+            logger.warning(f"SLA event {event} for unassigned ticket {ticket_id}")
+            return
+
+        seconds_left = deadline - time.time()
+        async with get_db_context() as session:
+            publish(
+                session, event, [ticket_id], notify_user_ids=[tracked.assignee_id],
+                title=tracked.title,
+                priority=tracked.priority.value if tracked.priority else None,
+                sla_deadline=datetime.fromtimestamp(deadline, timezone.utc).isoformat(),
+                minutes_remaining=round(seconds_left / 60, 1)
+            )
+            await session.commit()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            while self._heap and self._heap[0][0] <= time.time():
+                _, _, ticket_id, event, deadline = heapq.heappop(self._heap)
+                try:
+                    await self._fire(ticket_id, event, deadline)
+                except Exception as e:
+                    logger.error(f"Error sending {event} for ticket {ticket_id}: {str(e)}")
+
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _reconcile_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_seconds)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"SLA monitor reconciliation failed: {str(e)}")
+
+    async def start(self) -> None:
+        """
+        Load deadlines of all active tickets, follow changes from every
+        process and start the scheduler
+        """
+        await self.reconcile()
+        outbox_dispatcher.register_live(self.track_events)
+        self._task = asyncio.create_task(self._run())
+        if self.reconcile_seconds > 0:
+            self._reconcile_task = asyncio.create_task(self._reconcile_periodically())
+        logger.info(f"✓ SLA monitor started ({len(self._tickets)} tickets)")
+
+    async def stop(self) -> None:
+        for task in (self._task, self._reconcile_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._reconcile_task = None
+        await self._release_lock()
+
+
+sla_monitor = SLAMonitor(
+    warning_minutes=settings.SLA_WARNING_MINUTES,
+    reconcile_seconds=settings.SLA_MONITOR_RECONCILE_SECONDS
+)
@@ -0,0 +1,248 @@
+"""
+Live ticket change feed: outbox events fanned out to the WebSocket and SSE
+subscribers whose filters match the changed tickets
+"""
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import logging
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.models.outbox import OutboxEvent
+from app.models.ticket import Ticket, TicketPriority
+from app.schemas.ticket import TicketFeedFilter
+
+logger = logging.getLogger(__name__)
+
+# Outbox event type -> kind of change announced on the feed
+FEED_EVENT_TYPES: Dict[str, str] = {
+    "ticket_created": "created",
+    "tickets_created": "created",
+    "ticket_updated": "updated",
+    "tickets_status_changed": "updated",
+    "ticket_assigned": "assigned",
+    "tickets_assigned": "assigned",
+    "ticket_escalated": "escalated",
+}
+
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(TicketPriority)}
+
+# Roles that see every ticket; everyone else only sees tickets they reported
+ENGINEER_ROLES = {"l1-engineer", "l2-engineer", "ops-manager", "admin"}
+
+# Ticket state sent with each change, so clients can patch their views in place
+_SNAPSHOT_COLUMNS = (
+    Ticket.id, Ticket.title, Ticket.status, Ticket.priority, Ticket.category,
+    Ticket.reported_by_id, Ticket.assigned_to_id, Ticket.department_id,
+    Ticket.is_escalated, Ticket.sla_deadline, Ticket.version,
+    Ticket.created_at, Ticket.updated_at
+)
+
+RESYNC = {"type": "resync"}
+
+
+class FeedSubscription:
+    """
+    One connected client: its filters and a bounded queue of messages. A
+    client that falls behind gets its backlog replaced by a ``resync``
+    message, after which it should reload through the REST endpoints.
+    """
+
+    def __init__(self, user_id: int, role: str, department_id: Optional[int],
+                 filters: TicketFeedFilter, queue_size: int):
+        self.user_id = user_id
+        self.role = role
+        self.department_id = department_id
+        self.filters = filters
+        self.last_event_id = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._replayed: Set[int] = set()
+
+    def can_see(self, ticket) -> bool:
+        return self.role in ENGINEER_ROLES or ticket.reported_by_id == self.user_id
+
+    def matches(self, ticket) -> bool:
+        if not self.can_see(ticket):
+            return False
+        if self.filters.scope == "mine" and self.user_id not in (ticket.assigned_to_id, ticket.reported_by_id):
+            return False
+        if self.filters.scope == "department" and ticket.department_id != self.department_id:
+            return False
+        if self.filters.min_priority and PRIORITY_RANK[ticket.priority] < PRIORITY_RANK[self.filters.min_priority]:
+            return False
+        return True
+
+    def mark_replayed(self, event_id: int) -> None:
+        self._replayed.add(event_id)
+        self.last_event_id = max(self.last_event_id, event_id)
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC)
+
+    async def next(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for the next message; raises ``asyncio.TimeoutError`` after
+        ``timeout`` seconds without one. Events already sent by the replay
+        are skipped.
+        """
+        while True:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+            event_id = message.get("id")
+            if event_id is not None:
+                if event_id in self._replayed:
+                    continue
+                self.last_event_id = max(self.last_event_id, event_id)
+            return message
+
+
+class TicketFeed:
+    """
+    Registry of feed subscribers in this process, fed by the outbox
+    dispatcher's live delivery, which sees every event in every process.
+    Each message carries the outbox event id, so a client that
+    reconnects with the last id it saw gets the events it missed, up to
+    ``replay_limit``; beyond that, or once the events have been purged from
+    the outbox, it is told to resync.
+    """
+
+    def __init__(self, queue_size: int = 256, replay_limit: int = 500):
+        self.queue_size = queue_size
+        self.replay_limit = replay_limit
+        self._subscriptions: Set[FeedSubscription] = set()
+
+    def subscribe(self, user, filters: TicketFeedFilter) -> FeedSubscription:
+        subscription = FeedSubscription(user.id, user.role.value, user.department_id, filters, self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FeedSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def get_subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def resync_all(self) -> None:
+        """
+        Tell every subscriber to reload, after changes may have been missed
+        """
+        for subscription in list(self._subscriptions):
+            subscription.offer(RESYNC)
+
+    async def _snapshots(self, db, events: List[Any]) -> Dict[str, Any]:
+        ticket_ids = {
+            ticket_id
+            for event in events if event.event_type in FEED_EVENT_TYPES
+            for ticket_id in event.payload["ticket_ids"]
+        }
+        if not ticket_ids:
+            return {}
+        result = await db.execute(select(*_SNAPSHOT_COLUMNS).where(Ticket.id.in_(ticket_ids)))
+        return {row.id: row for row in result.all()}
+
+    @staticmethod
+    def _changes(payload: Dict[str, Any], ticket_ids: Set[str]) -> Dict[str, Any]:
+        """
+        The event's payload without its routing keys, and with per-ticket
+        lists (such as the ``assignments`` of a bulk assignment) cut down to
+        the tickets in ``ticket_ids``
+        """
+        changes = {}
+        for key, value in payload.items():
+            if key in ("ticket_ids", "notify_user_ids"):
+                continue
+            if isinstance(value, list) and value and all(isinstance(item, dict) and "ticket_id" in item for item in value):
+                value = [item for item in value if item["ticket_id"] in ticket_ids]
+            changes[key] = value
+        return changes
+
+    @classmethod
+    def _message(cls, event, tickets: List[Any]) -> Dict[str, Any]:
+        return jsonable_encoder({
+            "id": event.id,
+            "type": FEED_EVENT_TYPES[event.event_type],
+            "event": event.event_type,
+            "tickets": [dict(ticket._mapping) for ticket in tickets],
+            "changes": cls._changes(event.payload, {ticket.id for ticket in tickets}),
+            "updated_by": event.user_id,
+            "at": event.created_at
+        })
+
+    def _matching(self, subscription: FeedSubscription, event, snapshots: Dict[str, Any]) -> List[Any]:
+        return [
+            snapshots[ticket_id] for ticket_id in event.payload["ticket_ids"]
+            if ticket_id in snapshots and subscription.matches(snapshots[ticket_id])
+        ]
+
+    async def publish_events(self, db, events: List[Any]) -> None:
+        """
+        Live outbox consumer: send each feed subscriber the changes to
+        tickets matching its filters, with the tickets' current state
+        """
+        if not self._subscriptions:
+            return
+        snapshots = await self._snapshots(db, events)
+        for event in events:
+            if event.event_type not in FEED_EVENT_TYPES:
+                continue
+            for subscription in list(self._subscriptions):
+                tickets = self._matching(subscription, event, snapshots)
+                if tickets:
+                    subscription.offer(self._message(event, tickets))
+
+    @staticmethod
+    async def _purged_after(db, since: int) -> bool:
+        """
+        Whether events after ``since`` may have been purged: ids between it
+        and the oldest event left, or, with the outbox empty, any id issued
+        after it
+        """
+        oldest = await db.execute(select(OutboxEvent.id).order_by(OutboxEvent.id).limit(1))
+        oldest_id = oldest.scalar()
+        if oldest_id is not None:
+            return oldest_id > since + 1
+        issued = await db.execute(text(
+            "SELECT pg_sequence_last_value(pg_get_serial_sequence('outbox_events', 'id')::regclass)"
+        ))
+        last_id = issued.scalar()
+        return last_id is not None and last_id > since
+
+    async def replay(self, db, subscription: FeedSubscription, since: int) -> List[Dict[str, Any]]:
+        """
+        Messages for the events after ``since`` that match ``subscription``,
+        or a single ``resync`` if they are no longer all available. Call it
+        after subscribing so nothing falls between the replay and the live
+        messages.
+        """
+        result = await db.execute(
+            select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.user_id,
+                   OutboxEvent.payload, OutboxEvent.created_at)
+            .where(OutboxEvent.id > since, OutboxEvent.event_type.in_(list(FEED_EVENT_TYPES)))
+            .order_by(OutboxEvent.id)
+            .limit(self.replay_limit + 1)
+        )
+        events = result.all()
+        if len(events) > self.replay_limit or await self._purged_after(db, since):
+            # Too far behind, or the missed events were purged already
+            return [RESYNC]
+
+        snapshots = await self._snapshots(db, events)
+        messages = []
+        for event in events:
+            subscription.mark_replayed(event.id)
+            tickets = self._matching(subscription, event, snapshots)
+            if tickets:
+                messages.append(self._message(event, tickets))
+        return messages
+
+
+ticket_feed = TicketFeed(
+    queue_size=settings.FEED_QUEUE_SIZE,
+    replay_limit=settings.FEED_REPLAY_LIMIT
+)
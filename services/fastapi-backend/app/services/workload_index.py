@@ -0,0 +1,140 @@
+"""
+In-memory index of engineer workload (open + in progress tickets per engineer)
+"""
+from typing import Dict, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+from sqlalchemy import select, func
+
+from app.core.database import get_db_context
+from app.models.ticket import Ticket, TicketStatus
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = [TicketStatus.OPEN, TicketStatus.IN_PROGRESS]
+
+
+class WorkloadIndex:
+    """
+    Active ticket counts keyed by assignee, with unassigned tickets under
+    ``None``.
+
+    Loaded with one aggregate query and kept current by the ticket endpoints
+    reporting every assignment or status change through ``apply``. Each
+    process holds its own copy, so the counts are periodically reloaded from
+    the database to correct drift from changes made elsewhere (other
+    replicas, scripts, direct SQL).
+    """
+
+    def __init__(self):
+        self._counts: Dict[Optional[int], int] = {}
+        self._total = 0
+        self._load_lock = asyncio.Lock()
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def get(self, engineer_id: int) -> int:
+        """
+        Open + in progress tickets assigned to an engineer
+        """
+        return self._counts.get(engineer_id, 0)
+
+    @property
+    def unassigned(self) -> int:
+        """
+        Open + in progress tickets without an assignee
+        """
+        return self._counts.get(None, 0)
+
+    @property
+    def total_active(self) -> int:
+        """
+        All open + in progress tickets
+        """
+        return self._total
+
+    def apply(self, old_assignee_id: Optional[int], old_status: Optional[TicketStatus],
+              new_assignee_id: Optional[int], new_status: Optional[TicketStatus]) -> None:
+        """
+        Account for one committed ticket change. Use ``old_status=None`` for a
+        newly created ticket.
+        """
+        if not self.ready:
+            return
+
+        if old_status in ACTIVE_STATUSES:
+            self._adjust(old_assignee_id, -1)
+        if new_status in ACTIVE_STATUSES:
+            self._adjust(new_assignee_id, 1)
+
+    def _adjust(self, assignee_id: Optional[int], delta: int) -> None:
+        count = self._counts.get(assignee_id, 0) + delta
+        if count < 0:
+            # Only possible after drift; reconciliation will restore the true value
+            return
+        self._total += delta
+        if count:
+            self._counts[assignee_id] = count
+        else:
+            self._counts.pop(assignee_id, None)
+
+    async def load(self, db) -> None:
+        """
+        Replace the counts with a fresh aggregate from the database
+        """
+        result = await db.execute(
+            select(Ticket.assigned_to_id, func.count())
+            .where(Ticket.status.in_(ACTIVE_STATUSES))
+            .group_by(Ticket.assigned_to_id)
+        )
+        counts = {assignee_id: count for assignee_id, count in result.all()}
+        self._counts = counts
+        self._total = sum(counts.values())
+        self.loaded_at = datetime.utcnow()
+
+    async def ensure_loaded(self, db) -> None:
+        """
+        Load the counts on first use if startup has not done so yet
+        """
+        if self.ready:
+            return
+        async with self._load_lock:
+            if not self.ready:
+                await self.load(db)
+
+    async def _reconcile_periodically(self, interval_seconds: int) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                async with get_db_context() as session:
+                    await self.load(session)
+            except Exception as e:
+                logger.error(f"Workload index reconciliation failed: {str(e)}")
+
+    async def start(self, interval_seconds: int) -> None:
+        """
+        Load the index and start periodic reconciliation
+        """
+        async with get_db_context() as session:
+            await self.load(session)
+        if interval_seconds > 0:
+            self._reconcile_task = asyncio.create_task(self._reconcile_periodically(interval_seconds))
+        logger.info(f"✓ Workload index loaded ({self._total} active tickets)")
+
+    async def stop(self) -> None:
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+
+workload_index = WorkloadIndex()
@@ -0,0 +1,66 @@
+"""
+De-duplication of identical monitoring alerts submitted for ticket creation
+"""
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import time
+
+
+def alert_fingerprint(payload: Dict[str, Any]) -> str:
+    """
+    Stable fingerprint of an alert's ticket payload (key order independent)
+    """
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class AlertDeduplicator:
+    """
+    Remembers which ticket was opened for an alert fingerprint for a time window.
+    Entries live in process memory, so de-duplication is per backend instance.
+
+    The window is the same for every entry, so keeping entries in the order
+    they were remembered also keeps them in expiry order, and expired ones
+    are evicted from the front.
+    """
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._seen: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        """
+        Return the ticket ID recorded for a fingerprint if still inside the window
+        """
+        if self.window_seconds <= 0:
+            return None
+
+        entry = self._seen.get(fingerprint)
+        if entry is None:
+            return None
+
+        ticket_id, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._seen[fingerprint]
+            return None
+        return ticket_id
+
+    def remember(self, fingerprint: str, ticket_id: str) -> None:
+        """
+        Record the ticket opened for a fingerprint
+        """
+        if self.window_seconds <= 0:
+            return
+
+        now = time.monotonic()
+        self._seen[fingerprint] = (ticket_id, now + self.window_seconds)
+        self._seen.move_to_end(fingerprint)
+
+        # Drop expired entries so the map stays bounded; amortised O(1) per call
+        while self._seen:
+            oldest = next(iter(self._seen.values()))
+            if oldest[1] >= now:
+                break
+            self._seen.popitem(last=False)
@@ -0,0 +1,91 @@
+"""
+HTTP caching helpers: entity tags for versioned resources and collections,
+conditional requests and per-role Cache-Control
+"""
+from typing import Any, Optional
+from datetime import datetime
+import hashlib
+import json
+
+from fastapi import Response
+
+# Responses depend on who asks, so they are only ever cached privately. End
+# users poll their own tickets and published articles and can live with a
+# short staleness window; staff always revalidate (cheap with 304s).
+CACHE_CONTROL = {
+    "tickets": {"end-user": "private, max-age=15"},
+    "knowledge": {"end-user": "private, max-age=300"},
+}
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+def version_etag(version: int) -> str:
+    """
+    Weak ETag for a row carrying a version counter
+    """
+    return f'W/"{version}"'
+
+
+def parse_if_match(header: str) -> Optional[int]:
+    """
+    Extract the version from an If-Match header produced from version_etag.
+    Returns None for ``*`` (match any) and raises ValueError if malformed.
+    """
+    value = header.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        value = value[2:]
+    return int(value.strip('"'))
+
+
+def timestamp_etag(value: datetime) -> str:
+    """
+    Weak ETag for a row identified by its last-modified timestamp
+    """
+    return f'W/"{value.timestamp():.6f}"'
+
+
+def watermark_etag(*parts: Any) -> str:
+    """
+    Weak ETag for a collection: a digest of its watermark (e.g. newest
+    modification time and row count) and whatever else shapes the
+    response (filters, paging, viewer)
+    """
+    raw = json.dumps(parts, default=str, separators=(",", ":")).encode()
+    return f'W/"{hashlib.sha1(raw).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against the current ETag
+    """
+    if not if_none_match:
+        return False
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == current:
+            return True
+    return False
+
+
+def cache_control(resource: str, role: str) -> str:
+    return CACHE_CONTROL.get(resource, {}).get(role, DEFAULT_CACHE_CONTROL)
+
+
+def set_cache_headers(response: Response, etag: str, cache_control_value: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control_value
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str, cache_control_value: str) -> Response:
+    """
+    Empty 304 response carrying the validators of the unchanged resource
+    """
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control_value)
+    return response
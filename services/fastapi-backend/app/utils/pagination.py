@@ -0,0 +1,70 @@
+"""
+Pagination helpers: opaque keyset cursors and cheap result-set counting
+"""
+from typing import Any, List, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+
+from sqlalchemy import func, text
+from sqlalchemy.sql import Select
+
+# Below this planner estimate an exact count is cheap enough to just run it
+ESTIMATE_EXACT_THRESHOLD = 10_000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else getattr(v, "value", v) for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor. Raises ValueError if malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError("Malformed cursor") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
+
+
+async def count_rows(db, query: Select, estimate: bool = False) -> Tuple[int, bool]:
+    """
+    Count the rows matched by a filtered select.
+
+    Runs ``SELECT count(*)`` over the query's FROM/WHERE clauses. With
+    ``estimate=True`` the planner's row estimate is used instead when it is
+    large enough that an exact count would mean scanning most of the table.
+    Returns ``(total, is_estimate)``.
+    """
+    query = query.order_by(None).limit(None).offset(None)
+
+    if estimate:
+        # EXPLAIN cannot take bind parameters, so render them inline and send
+        # the statement as-is (text() would reparse ':' in search terms)
+        conn = await db.connection()
+        plan_query = query.with_only_columns(text("1"), maintain_column_froms=True)
+        compiled = plan_query.compile(
+            dialect=conn.dialect,
+            compile_kwargs={"literal_binds": True}
+        )
+        plan_result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        plan = plan_result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimated_rows = int(plan[0]["Plan"]["Plan Rows"])
+        if estimated_rows >= ESTIMATE_EXACT_THRESHOLD:
+            return estimated_rows, True
+
+    count_query = query.with_only_columns(func.count(), maintain_column_froms=True)
+    result = await db.execute(count_query)
+    return result.scalar_one(), False
@@ -0,0 +1,118 @@
+"""
+Mergeable quantile sketches for duration metrics
+"""
+from typing import Any, Dict, Iterable, Optional
+import math
+
+
+class DDSketch:
+    """
+    DDSketch (Masson, Rim and Lee, 2019): values are counted in
+    logarithmically sized bins, so every quantile it returns is within
+    ``relative_accuracy`` of the true value, and two sketches built with the
+    same accuracy merge exactly by adding bin counts. Values at or below
+    ``min_value`` (including negatives) are counted as zero.
+
+    Bin ``k`` holds values in ``(gamma^(k-1), gamma^k]``; ``key`` gives the
+    bin of a value, and the same formula can be evaluated in SQL to build a
+    sketch from grouped counts (see ``add_bin``).
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-3):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def key(self, value: float) -> Optional[int]:
+        """
+        Bin of ``value``, or None for the zero bin
+        """
+        if value <= self.min_value:
+            return None
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def add_bin(self, key: Optional[int], count: int = 1) -> None:
+        if key is None:
+            self.zero_count += count
+        else:
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.add_bin(self.key(value), count)
+
+    def extend(self, values: Iterable[float]) -> "DDSketch":
+        for value in values:
+            self.add(value)
+        return self
+
+    def value(self, key: int) -> float:
+        """
+        Estimate for the values in bin ``key``, within the relative accuracy
+        of all of them
+        """
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def merge(self, other: "DDSketch") -> None:
+        """
+        Add the counts of ``other``; a sketch of another accuracy is re-binned
+        by its bin estimates, which compounds the two errors
+        """
+        if other.gamma == self.gamma and other.min_value == self.min_value:
+            for key, count in other.bins.items():
+                self.bins[key] = self.bins.get(key, 0) + count
+            self.zero_count += other.zero_count
+            self.count += other.count
+            return
+        for key, count in other.bins.items():
+            self.add(other.value(key), count)
+        self.add_bin(None, other.zero_count)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimated ``q``-quantile (0 <= q <= 1), or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return self.value(key)
+        return self.value(max(self.bins))
+
+    def percentiles(self, percentiles: Iterable[int] = (50, 90, 99), digits: int = 2) -> Dict[str, Optional[float]]:
+        """
+        ``{"p50": ..., "p90": ..., "p99": ...}``, rounded to ``digits``
+        """
+        result = {}
+        for percentile in percentiles:
+            value = self.quantile(percentile / 100)
+            result[f"p{percentile}"] = round(value, digits) if value is not None else None
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        # JSON object keys are strings
+        return {
+            "accuracy": self.relative_accuracy,
+            "min": self.min_value,
+            "zero": self.zero_count,
+            "bins": {str(key): count for key, count in self.bins.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(data["accuracy"], data["min"])
+        sketch.zero_count = data.get("zero", 0)
+        sketch.bins = {int(key): count for key, count in data.get("bins", {}).items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
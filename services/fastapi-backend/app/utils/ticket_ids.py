@@ -0,0 +1,158 @@
+"""
+Ticket ID allocation backed by per-day Postgres sequences
+"""
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.database import get_db_context
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_PREFIX = "ticket_id_seq_"
+
+# unique_violation, duplicate_table: a concurrent CREATE SEQUENCE IF NOT EXISTS won the race
+_ALREADY_EXISTS = {"23505", "42P07"}
+
+
+class TicketIdAllocator:
+    """
+    Hands out ticket IDs in the format INC-YYYYMMDD-NNNNN.
+
+    Each day has its own sequence created with ``INCREMENT BY block_size``,
+    so one ``nextval`` reserves a whole block of numbers for this process.
+    Numbers within a process are monotonic, and blocks never overlap across
+    replicas, so IDs cannot collide. Sequences of past days are dropped
+    periodically once started.
+    """
+
+    def __init__(self, block_size: int = 50):
+        self.block_size = block_size
+        self._lock = asyncio.Lock()
+        self._day = None
+        self._blocks: List[int] = []  # start of each reserved, unused block
+        self._next = 0
+        self._end = 0  # exclusive end of the block currently being used
+        self._sequences_ready = set()
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _sequence_name(day: str) -> str:
+        return f"{SEQUENCE_PREFIX}{day}"
+
+    async def _ensure_sequence(self, session, day: str) -> None:
+        if day in self._sequences_ready:
+            return
+        try:
+            await session.execute(text(
+                f"CREATE SEQUENCE IF NOT EXISTS {self._sequence_name(day)} "
+                f"START WITH 1 INCREMENT BY {self.block_size}"
+            ))
+            await session.commit()
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) not in _ALREADY_EXISTS:
+                raise
+            # Another replica created it concurrently
+            await session.rollback()
+        self._sequences_ready.add(day)
+
+    async def _reserve_blocks(self, day: str, count: int) -> List[int]:
+        async with get_db_context() as session:
+            await self._ensure_sequence(session, day)
+            result = await session.execute(
+                text(f"SELECT nextval('{self._sequence_name(day)}') FROM generate_series(1, :n)"),
+                {"n": count}
+            )
+            await session.commit()
+            return sorted(result.scalars().all())
+
+    async def allocate(self, count: int = 1) -> List[str]:
+        """
+        Allocate ``count`` new ticket IDs
+        """
+        async with self._lock:
+            day = datetime.utcnow().strftime("%Y%m%d")
+            if day != self._day:
+                # Unused numbers from the previous day are simply skipped
+                self._sequences_ready.discard(self._day)
+                self._day = day
+                self._blocks = []
+                self._next = self._end = 0
+
+            available = self._end - self._next + len(self._blocks) * self.block_size
+            if available < count:
+                missing = count - available
+                blocks_needed = -(-missing // self.block_size)
+                self._blocks.extend(await self._reserve_blocks(day, blocks_needed))
+
+            ids = []
+            while len(ids) < count:
+                if self._next >= self._end:
+                    self._next = self._blocks.pop(0)
+                    self._end = self._next + self.block_size
+                ids.append(f"INC-{day}-{self._next:05d}")
+                self._next += 1
+            return ids
+
+    async def drop_old_sequences(self) -> List[str]:
+        """
+        Drop the sequences of the days before yesterday
+        """
+        async with get_db_context() as session:
+            return await drop_sequences_before(session, datetime.utcnow().date() - timedelta(days=1))
+
+    async def _clean_periodically(self, interval_seconds: int) -> None:
+        while True:
+            try:
+                dropped = await self.drop_old_sequences()
+                if dropped:
+                    logger.info(f"Dropped {len(dropped)} ticket ID sequences")
+            except Exception as e:
+                logger.error(f"Ticket ID sequence cleanup failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    async def start(self, interval_seconds: int) -> None:
+        """
+        Drop past days' sequences now, in the background, and then every
+        ``interval_seconds``
+        """
+        if interval_seconds > 0:
+            self._cleanup_task = asyncio.create_task(self._clean_periodically(interval_seconds))
+            logger.info("✓ Ticket ID sequence cleanup scheduled")
+
+    async def stop(self) -> None:
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+
+
+async def drop_sequences_before(db, before: date) -> List[str]:
+    """
+    Drop the per-day ID sequences of the days before ``before`` and commit;
+    returns their names. Only the current day's sequence is ever used, so
+    keep at least the previous day for allocations racing midnight.
+    """
+    result = await db.execute(
+        text("SELECT sequencename FROM pg_sequences WHERE schemaname = current_schema() AND sequencename LIKE :prefix"),
+        {"prefix": f"{SEQUENCE_PREFIX}%"}
+    )
+    dropped = []
+    for name in result.scalars().all():
+        suffix = name[len(SEQUENCE_PREFIX):]
+        if len(suffix) == 8 and suffix.isdigit() and suffix < before.strftime("%Y%m%d"):
+            await db.execute(text(f"DROP SEQUENCE IF EXISTS {name}"))
+            dropped.append(name)
+    await db.commit()
+    return dropped
+
+
+ticket_id_allocator = TicketIdAllocator(block_size=settings.TICKET_ID_BLOCK_SIZE)
@@ -1,157 +1,249 @@
 """
 Utility functions for ticket management
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple
 from datetime import datetime, timedelta
-from app.models.ticket import Ticket, TicketStatus, TicketPriority, TicketCategory
+from app.models.ticket import Ticket, TicketActivity, TicketStatus, TicketPriority, TicketCategory, RESOLVED_STATUSES
 from app.models.user import User, UserRole
+from app.services.workload_index import workload_index, ACTIVE_STATUSES
+from app.services.sla_monitor import sla_monitor
+from app.services.outbox import publish
+from app.utils.quantile_sketch import DDSketch
+from sqlalchemy import select, insert, bindparam
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import heapq
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def auto_assign_ticket(ticket: Ticket, db: Session) -> Optional[User]:
+ASSIGNABLE_ROLES = [UserRole.L1_ENGINEER, UserRole.L2_ENGINEER]
+
+
+class EngineerWorkload(NamedTuple):
+    id: int
+    name: str
+    role: UserRole
+    workload: int
+
+
+async def get_engineer_workloads(db: AsyncSession, roles: List[UserRole] = ASSIGNABLE_ROLES) -> List[EngineerWorkload]:
+    """
+    Active engineers in the given roles with their count of open tickets,
+    read from the in-memory workload index
+    """
+    await workload_index.ensure_loaded(db)
+    result = await db.execute(
+        select(User.id, User.name, User.role)
+        .where(User.role.in_(roles), User.is_active == True)
+    )
+    return [
+        EngineerWorkload(engineer.id, engineer.name, engineer.role, workload_index.get(engineer.id))
+        for engineer in result.all()
+    ]
+
+
+def preferred_roles(priority: TicketPriority) -> List[UserRole]:
+    """
+    Engineer roles that should pick up a ticket of the given priority first
+    """
+    # Critical tickets go to L2 engineers first, everything else to L1
+    if priority == TicketPriority.CRITICAL:
+        return [UserRole.L2_ENGINEER]
+    return [UserRole.L1_ENGINEER]
+
+
+class EngineerWorkloads:
+    """
+    Per-role min-heaps of (workload, engineer id), updated as tickets are
+    handed out so a whole batch can be balanced from one workload query
+    """
+
+    def __init__(self, engineers):
+        self.engineers = {engineer.id: engineer for engineer in engineers}
+        self._heaps: Dict[UserRole, List] = {}
+        for engineer in engineers:
+            self._heaps.setdefault(engineer.role, []).append((engineer.workload, engineer.id))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def pick(self, priority: TicketPriority) -> Optional[int]:
+        """
+        Take the least loaded engineer for a ticket and count the ticket
+        against them. Falls back to any engineer if the preferred roles have none.
+        """
+        heaps = [self._heaps[role] for role in preferred_roles(priority) if self._heaps.get(role)]
+        if not heaps:
+            heaps = [heap for heap in self._heaps.values() if heap]
+        if not heaps:
+            return None
+
+        heap = min(heaps, key=lambda h: h[0])
+        workload, engineer_id = heap[0]
+        heapq.heapreplace(heap, (workload + 1, engineer_id))
+        return engineer_id
+
+
+async def auto_assign_ticket(ticket: Ticket, db: AsyncSession):
     """
     Automatically assign a ticket to the best available engineer
     """
     try:
-        # Get available engineers based on ticket priority and category
-        if ticket.priority == TicketPriority.CRITICAL:
-            # Critical tickets go to L2 engineers first
-            engineers = db.query(User).filter(
-                User.role == UserRole.L2_ENGINEER,
-                User.is_active == True
-            ).all()
-        else:
-            # Other tickets go to L1 engineers first
-            engineers = db.query(User).filter(
-                User.role == UserRole.L1_ENGINEER,
-                User.is_active == True
-            ).all()
-        
-        if not engineers:
-            # Fallback to any available engineer
-            engineers = db.query(User).filter(
-                User.role.in_([UserRole.L1_ENGINEER, UserRole.L2_ENGINEER]),
-                User.is_active == True
-            ).all()
-        
-        if not engineers:
+        workloads = EngineerWorkloads(await get_engineer_workloads(db))
+        engineer_id = workloads.pick(ticket.priority)
+        if engineer_id is None:
             return None
-        
-        # Calculate workload for each engineer
-        engineer_workloads = []
-        for engineer in engineers:
-            current_workload = db.query(Ticket).filter(
-                Ticket.assigned_to_id == engineer.id,
-                Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-            ).count()
-            
-            engineer_workloads.append({
-                "engineer": engineer,
-                "workload": current_workload
-            })
-        
-        # Sort by workload (ascending) and assign to engineer with least workload
-        engineer_workloads.sort(key=lambda x: x["workload"])
-        selected_engineer = engineer_workloads[0]["engineer"]
+        selected_engineer = workloads.engineers[engineer_id]
         
         # Assign the ticket
-        ticket.assigned_to_id = selected_engineer.id
-        ticket.status = TicketStatus.IN_PROGRESS
-        
-        db.commit()
+        await db.execute(
+            Ticket.__table__.update()
+            .where(Ticket.id == ticket.id)
+            .values(
+                assigned_to_id=engineer_id,
+                status=TicketStatus.IN_PROGRESS,
+                version=Ticket.version + 1
+            )
+        )
+        publish(
+            db, "ticket_assigned", [ticket.id], notify_user_ids=[engineer_id, ticket.assigned_to_id],
+            old_assignee_id=ticket.assigned_to_id, new_assignee_id=engineer_id,
+            assignee_name=selected_engineer.name, source="auto"
+        )
+        await db.commit()
+        workload_index.apply(ticket.assigned_to_id, ticket.status, engineer_id, TicketStatus.IN_PROGRESS)
+        sla_monitor.track(
+            ticket.id, ticket.title, ticket.priority, ticket.sla_deadline,
+            engineer_id, TicketStatus.IN_PROGRESS
+        )
         
         logger.info(f"Auto-assigned ticket {ticket.id} to {selected_engineer.name}")
         return selected_engineer
         
     except Exception as e:
         logger.error(f"Error auto-assigning ticket {ticket.id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         return None
 
 
-def calculate_sla_deadline(priority: TicketPriority, category: TicketCategory, 
-                          created_at: datetime = None) -> datetime:
+async def auto_assign_tickets(
+    db: AsyncSession,
+    assigned_by_id: int,
+    ticket_ids: Optional[List[str]] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
     """
-    Calculate SLA deadline based on priority and category
+    Assign a batch of unassigned open tickets in one pass.
+
+    Tickets are taken most urgent first and balanced across engineers using
+    one workload query, one batched UPDATE and one batched activity insert.
+    Rows locked by a concurrent run are skipped rather than waited on.
     """
-    if not created_at:
-        created_at = datetime.utcnow()
-    
-    # Base SLA times in hours
-    sla_hours = {
-        TicketPriority.CRITICAL: 2,
-        TicketPriority.HIGH: 8,
-        TicketPriority.MEDIUM: 24,
-        TicketPriority.LOW: 72
-    }
-    
-    base_hours = sla_hours.get(priority, 24)
-    
-    # Adjust based on category
-    category_multipliers = {
-        TicketCategory.INCIDENT: 1.0,      # Standard time for incidents
-        TicketCategory.SERVICE_REQUEST: 1.5,  # Longer for service requests
-        TicketCategory.PROBLEM: 2.0,       # Longer for problem analysis
-        TicketCategory.CHANGE: 3.0,        # Much longer for changes
-        TicketCategory.HARDWARE: 1.2,      # Slightly longer for hardware
-        TicketCategory.SOFTWARE: 1.0,      # Standard for software
-        TicketCategory.NETWORK: 1.5,       # Longer for network issues
-        TicketCategory.SECURITY: 0.8       # Faster for security issues
-    }
-    
-    multiplier = category_multipliers.get(category, 1.0)
-    final_hours = base_hours * multiplier
-    
-    return created_at + timedelta(hours=final_hours)
+    query = (
+        select(Ticket.id, Ticket.title, Ticket.priority, Ticket.sla_deadline)
+        .where(Ticket.assigned_to_id.is_(None), Ticket.status == TicketStatus.OPEN)
+        .order_by(Ticket.priority.desc(), Ticket.sla_deadline, Ticket.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if ticket_ids is not None:
+        query = query.where(Ticket.id.in_(ticket_ids))
+    tickets = (await db.execute(query)).all()
+    if not tickets:
+        return []
 
+    workloads = EngineerWorkloads(await get_engineer_workloads(db))
+    assignments = []
+    for ticket in tickets:
+        engineer_id = workloads.pick(ticket.priority)
+        if engineer_id is None:
+            break
+        assignments.append({
+            "ticket_id": ticket.id,
+            "assignee_id": engineer_id,
+            "assignee_name": workloads.engineers[engineer_id].name
+        })
+    if not assignments:
+        return []
 
-def check_sla_breaches(db: Session) -> List[Dict[str, Any]]:
+    await db.execute(
+        Ticket.__table__.update()
+        .where(Ticket.id == bindparam("ticket_id"))
+        .values(
+            assigned_to_id=bindparam("assignee_id"),
+            status=TicketStatus.IN_PROGRESS,
+            version=Ticket.version + 1
+        ),
+        [{"ticket_id": a["ticket_id"], "assignee_id": a["assignee_id"]} for a in assignments]
+    )
+    await db.execute(insert(TicketActivity), [
+        {
+            "ticket_id": a["ticket_id"],
+            "user_id": assigned_by_id,
+            "activity_type": "assigned",
+            "details": {
+                "old_assignee_id": None,
+                "new_assignee_id": a["assignee_id"],
+                "assignee_name": a["assignee_name"],
+                "source": "auto"
+            }
+        }
+        for a in assignments
+    ])
+    publish(
+        db, "tickets_assigned", [a["ticket_id"] for a in assignments], user_id=assigned_by_id,
+        notify_user_ids=[a["assignee_id"] for a in assignments],
+        assignments=assignments
+    )
+    await db.commit()
+    for ticket, a in zip(tickets, assignments):
+        workload_index.apply(None, TicketStatus.OPEN, a["assignee_id"], TicketStatus.IN_PROGRESS)
+        sla_monitor.track(
+            ticket.id, ticket.title, ticket.priority, ticket.sla_deadline,
+            a["assignee_id"], TicketStatus.IN_PROGRESS
+        )
+
+    logger.info(f"Auto-assigned {len(assignments)} tickets")
+    return assignments
+
+
+async def check_sla_breaches(db: AsyncSession) -> List[Dict[str, Any]]:
     """
-    Check for tickets that have breached or are about to breach SLA
+    Check for tickets that have breached or are about to breach SLA.
+
+    On-demand report; live notifications come from the SLA monitor.
     """
     now = datetime.utcnow()
     
-    # Find tickets that have breached SLA
-    breached_tickets = db.query(Ticket).filter(
-        Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]),
-        Ticket.sla_deadline < now
-    ).all()
-    
-    # Find tickets approaching SLA breach (within 1 hour)
-    approaching_breach = db.query(Ticket).filter(
-        Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]),
-        Ticket.sla_deadline >= now,
-        Ticket.sla_deadline <= now + timedelta(hours=1)
-    ).all()
+    # Breached and approaching (within 1 hour) tickets with assignee names in one query
+    result = await db.execute(
+        select(Ticket.id, Ticket.title, Ticket.priority, Ticket.sla_deadline, User.name.label("assignee_name"))
+        .outerjoin(User, User.id == Ticket.assigned_to_id)
+        .where(
+            Ticket.status.in_(ACTIVE_STATUSES),
+            Ticket.sla_deadline <= now + timedelta(hours=1)
+        )
+        .order_by(Ticket.sla_deadline)
+    )
     
     results = []
-    
-    for ticket in breached_tickets:
-        breach_time = now - ticket.sla_deadline
-        results.append({
+    for ticket in result.all():
+        sla_deadline = ticket.sla_deadline.replace(tzinfo=None) if ticket.sla_deadline.tzinfo else ticket.sla_deadline
+        entry = {
             "ticket_id": ticket.id,
             "title": ticket.title,
             "priority": ticket.priority.value,
-            "assignee": ticket.assignee.name if ticket.assignee else "Unassigned",
-            "status": "breached",
-            "breach_time_hours": round(breach_time.total_seconds() / 3600, 2),
+            "assignee": ticket.assignee_name or "Unassigned",
             "sla_deadline": ticket.sla_deadline.isoformat()
-        })
-    
-    for ticket in approaching_breach:
-        time_remaining = ticket.sla_deadline - now
-        results.append({
-            "ticket_id": ticket.id,
-            "title": ticket.title,
-            "priority": ticket.priority.value,
-            "assignee": ticket.assignee.name if ticket.assignee else "Unassigned",
-            "status": "approaching_breach",
-            "time_remaining_hours": round(time_remaining.total_seconds() / 3600, 2),
-            "sla_deadline": ticket.sla_deadline.isoformat()
-        })
+        }
+        if sla_deadline < now:
+            entry["status"] = "breached"
+            entry["breach_time_hours"] = round((now - sla_deadline).total_seconds() / 3600, 2)
+        else:
+            entry["status"] = "approaching_breach"
+            entry["time_remaining_hours"] = round((sla_deadline - now).total_seconds() / 3600, 2)
+        results.append(entry)
     
     return results
 
@@ -224,6 +316,7 @@ def get_ticket_metrics(tickets: List[Ticket]) -> Dict[str, Any]:
         return {
             "total_tickets": 0,
             "avg_resolution_time": 0,
+            "resolution_time_percentiles": DDSketch().percentiles(),
             "sla_compliance_rate": 100,
             "priority_distribution": {},
             "status_distribution": {},
@@ -231,17 +324,16 @@ def get_ticket_metrics(tickets: List[Ticket]) -> Dict[str, Any]:
         }
     
     total_tickets = len(tickets)
-    resolved_tickets = [t for t in tickets if t.status == TicketStatus.RESOLVED and t.resolved_at]
+    resolved_tickets = [t for t in tickets if t.status in RESOLVED_STATUSES and t.resolved_at]
     
-    # Calculate average resolution time
-    if resolved_tickets:
-        resolution_times = [
-            (t.resolved_at - t.created_at).total_seconds() / 3600 
-            for t in resolved_tickets
-        ]
-        avg_resolution_time = sum(resolution_times) / len(resolution_times)
-    else:
-        avg_resolution_time = 0
+    # Average and percentiles of the resolution time, in one pass
+    resolution_sketch = DDSketch()
+    total_hours = 0.0
+    for t in resolved_tickets:
+        hours = (t.resolved_at - t.created_at).total_seconds() / 3600
+        resolution_sketch.add(hours)
+        total_hours += hours
+    avg_resolution_time = total_hours / len(resolved_tickets) if resolved_tickets else 0
     
     # Calculate SLA compliance
     if resolved_tickets:
@@ -271,6 +363,7 @@ def get_ticket_metrics(tickets: List[Ticket]) -> Dict[str, Any]:
     return {
         "total_tickets": total_tickets,
         "avg_resolution_time": round(avg_resolution_time, 2),
+        "resolution_time_percentiles": resolution_sketch.percentiles(),
         "sla_compliance_rate": round(sla_compliance_rate, 1),
         "priority_distribution": priority_distribution,
         "status_distribution": status_distribution,
@@ -278,29 +371,20 @@ def get_ticket_metrics(tickets: List[Ticket]) -> Dict[str, Any]:
     }
 
 
-def suggest_ticket_assignment(ticket: Ticket, db: Session) -> List[Dict[str, Any]]:
+async def suggest_ticket_assignment(ticket: Ticket, db: AsyncSession) -> List[Dict[str, Any]]:
     """
     Suggest the best engineers to assign a ticket to
     """
     # Get engineers based on ticket requirements
     if ticket.priority == TicketPriority.CRITICAL:
-        engineers = db.query(User).filter(
-            User.role.in_([UserRole.L2_ENGINEER, UserRole.L1_ENGINEER]),
-            User.is_active == True
-        ).all()
+        roles = [UserRole.L2_ENGINEER, UserRole.L1_ENGINEER]
     else:
-        engineers = db.query(User).filter(
-            User.role == UserRole.L1_ENGINEER,
-            User.is_active == True
-        ).all()
+        roles = [UserRole.L1_ENGINEER]
+    engineers = await get_engineer_workloads(db, roles)
     
     suggestions = []
     for engineer in engineers:
-        # Calculate current workload
-        current_workload = db.query(Ticket).filter(
-            Ticket.assigned_to_id == engineer.id,
-            Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-        ).count()
+        current_workload = engineer.workload
         
         # Calculate skill match (simplified - in production, use skill matrix)
         skill_match = 80  # Mock skill matching
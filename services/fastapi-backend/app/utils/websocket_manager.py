@@ -120,6 +120,33 @@ class WebSocketManager:
         for websocket in connections_to_remove:
             self._cleanup_connection(websocket)
     
+    async def broadcast_to_tickets(self, ticket_ids: List[str], message: dict, user_ids: List[int] = ()):
+        """
+        Broadcast one message to every connection watching any of the given
+        tickets or belonging to any of the given users. Each connection
+        receives the message once, however many of the tickets it watches.
+        """
+        recipients = set()
+        for ticket_id in ticket_ids:
+            recipients.update(self.ticket_connections.get(ticket_id, []))
+        for user_id in user_ids:
+            recipients.update(self.user_connections.get(user_id, []))
+        if not recipients:
+            return
+        
+        payload = json.dumps(message)
+        connections_to_remove = []
+        for websocket in recipients:
+            try:
+                await websocket.send_text(payload)
+            except Exception as e:
+                logger.error(f"Error broadcasting ticket batch: {str(e)}")
+                connections_to_remove.append(websocket)
+        
+        # Clean up failed connections
+        for websocket in connections_to_remove:
+            self._cleanup_connection(websocket)
+    
     async def broadcast_to_all(self, message: dict):
         """
         Broadcast a message to all connected users
@@ -191,3 +218,7 @@ class WebSocketManager:
         Get list of users with active connections
         """
         return list(self.user_connections.keys())
+
+
+# Shared by the chat WebSocket endpoint and the REST endpoints that notify it
+websocket_manager = WebSocketManager()
@@ -0,0 +1,20 @@
+"""Add tickets.version for optimistic concurrency
+
+Revision ID: 0001_ticket_version
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0001_ticket_version"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS version")
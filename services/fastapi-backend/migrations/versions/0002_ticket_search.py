@@ -0,0 +1,40 @@
+"""Full-text search column and indexes for tickets
+
+Revision ID: 0002_ticket_search
+Revises: 0001_ticket_version
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002_ticket_search"
+down_revision = "0001_ticket_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Adding a stored generated column rewrites the table once
+    op.execute(
+        "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+    # Build the indexes without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_search_vector "
+            "ON tickets USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_id_trgm "
+            "ON tickets USING gin (id gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tickets_id_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_search_vector")
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector")
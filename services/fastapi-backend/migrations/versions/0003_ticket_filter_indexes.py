@@ -0,0 +1,35 @@
+"""Indexes for the hot ticket filter paths
+
+Revision ID: 0003_ticket_filter_indexes
+Revises: 0002_ticket_search
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003_ticket_filter_indexes"
+down_revision = "0002_ticket_search"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_tickets_assigned_to_status": "tickets (assigned_to_id, status)",
+    "ix_tickets_active_sla_deadline": "tickets (sla_deadline) WHERE status IN ('OPEN', 'IN_PROGRESS')",
+    "ix_tickets_listing": "tickets (priority, created_at, id)",
+    "ix_tickets_reporter_listing": "tickets (reported_by_id, priority, created_at, id)",
+    "ix_tickets_created_at": "tickets (created_at)",
+    "ix_tickets_resolved_at": "tickets (resolved_at) WHERE resolved_at IS NOT NULL",
+    "ix_ticket_activities_ticket_id": "ticket_activities (ticket_id)",
+    "ix_ticket_tag_association_ticket_id": "ticket_tag_association (ticket_id)",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,24 @@
+"""Add department business hours and SLA pause tracking
+
+Revision ID: 0004_sla_calendars
+Revises: 0003_ticket_filter_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0004_sla_calendars"
+down_revision = "0003_ticket_filter_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE departments ADD COLUMN IF NOT EXISTS business_hours JSON")
+    op.execute("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS sla_paused_at TIMESTAMP WITH TIME ZONE")
+    op.execute("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS sla_paused_minutes DOUBLE PRECISION NOT NULL DEFAULT 0")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS sla_paused_minutes")
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS sla_paused_at")
+    op.execute("ALTER TABLE departments DROP COLUMN IF EXISTS business_hours")
@@ -0,0 +1,140 @@
+"""Partition the append-only history tables by month
+
+Converts ticket_activities, chat_messages, analytics_events and
+user_activity_logs into tables range-partitioned by month on their
+timestamp: the rows are copied into a new partitioned table with one
+partition per month of existing data, a few months ahead and a DEFAULT
+partition. The copy holds an exclusive lock on each table while it runs,
+so run this in a maintenance window. Tables that are already partitioned
+(or do not exist yet) are skipped.
+
+Revision ID: 0005_partition_history_tables
+Revises: 0004_sla_calendars
+Create Date: 2026-10-17
+"""
+from datetime import date
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "0005_partition_history_tables"
+down_revision = "0004_sla_calendars"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# table -> (partition key, foreign keys, indexes)
+TABLES = {
+    "ticket_activities": (
+        "created_at",
+        ["(ticket_id) REFERENCES tickets (id)", "(user_id) REFERENCES users (id)"],
+        {"ix_ticket_activities_ticket_id": "(ticket_id)"},
+    ),
+    "chat_messages": (
+        "created_at",
+        ["(ticket_id) REFERENCES tickets (id)", "(sender_id) REFERENCES users (id)"],
+        {"ix_chat_messages_ticket_id": "(ticket_id)"},
+    ),
+    "analytics_events": (
+        "timestamp",
+        ["(user_id) REFERENCES users (id)", "(ticket_id) REFERENCES tickets (id)"],
+        {},
+    ),
+    "user_activity_logs": (
+        "timestamp",
+        ["(user_id) REFERENCES users (id)"],
+        {},
+    ),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bind.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def _exists(bind, table: str) -> bool:
+    return bind.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table}).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    today = date.today().replace(day=1)
+
+    for table, (column, foreign_keys, indexes) in TABLES.items():
+        if not _exists(bind, table) or _is_partitioned(bind, table):
+            continue
+        legacy = f"{table}_unpartitioned"
+
+        op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        op.execute(f"UPDATE {table} SET {column} = now() WHERE {column} IS NULL")
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        for name in indexes:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})")
+        for foreign_key in foreign_keys:
+            op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY {foreign_key}")
+        for name, columns in indexes.items():
+            op.execute(f"CREATE INDEX {name} ON {table} {columns}")
+
+        oldest = bind.execute(text(f"SELECT min({column}) FROM {legacy}")).scalar()
+        month = min(oldest.date().replace(day=1), today) if oldest else today
+        while month <= _add_months(today, MONTHS_AHEAD):
+            following = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(following)})"
+            )
+            month = following
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        sequence = bind.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": legacy}).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        op.execute(f"DROP TABLE {legacy}")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    for table, (column, foreign_keys, indexes) in TABLES.items():
+        if not _is_partitioned(bind, table):
+            continue
+        partitioned = f"{table}_partitioned"
+
+        op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+        for name in indexes:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        for foreign_key in foreign_keys:
+            op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY {foreign_key}")
+        for name, columns in indexes.items():
+            op.execute(f"CREATE INDEX {name} ON {table} {columns}")
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        sequence = bind.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": partitioned}).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        # Drops the partitions with it
+        op.execute(f"DROP TABLE {partitioned}")
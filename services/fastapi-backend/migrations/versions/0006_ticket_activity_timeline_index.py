@@ -0,0 +1,53 @@
+"""Index the ticket activity timeline on (ticket_id, created_at, id)
+
+Replaces ix_ticket_activities_ticket_id, which the new index covers.
+ticket_activities is partitioned, and Postgres cannot build an index
+CONCURRENTLY on a partitioned table. The index is therefore built on each
+partition concurrently and attached to an index created ON ONLY the parent,
+so writes are not blocked while it builds.
+
+Revision ID: 0006_ticket_activity_timeline_index
+Revises: 0005_partition_history_tables
+Create Date: 2026-10-17
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = "0006_ticket_activity_timeline_index"
+down_revision = "0005_partition_history_tables"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_ticket_activities_timeline"
+COLUMNS = "(ticket_id, created_at, id)"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY ticket_activities {COLUMNS}")
+
+    # On a database created by create_all the parent index already covers
+    # some or all partitions; only the partitions without an index attached
+    # to it need one built
+    partitions = bind.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass('ticket_activities') "
+        "AND NOT EXISTS ("
+        "  SELECT 1 FROM pg_inherits attached "
+        "  JOIN pg_index ON pg_index.indexrelid = attached.inhrelid "
+        "  WHERE attached.inhparent = to_regclass(:index) AND pg_index.indrelid = child.oid"
+        ")"
+    ), {"index": INDEX}).scalars().all()
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_timeline_idx ON {partition} {COLUMNS}")
+    for partition in partitions:
+        op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_timeline_idx")
+    op.execute("DROP INDEX IF EXISTS ix_ticket_activities_ticket_id")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ticket_activities_ticket_id ON ticket_activities (ticket_id)")
+    op.execute(f"DROP INDEX IF EXISTS {INDEX}")
@@ -0,0 +1,41 @@
+"""Indexes for the incremental analytics rollups
+
+ix_tickets_changed_at lets the rollup job find tickets changed since its
+watermark; the period indexes serve the replace-and-read pattern on the
+rollup tables. rollup_watermarks itself is created by create_all.
+
+Revision ID: 0007_analytics_rollups
+Revises: 0006_ticket_activity_timeline_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = "0007_analytics_rollups"
+down_revision = "0006_ticket_activity_timeline_index"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_tickets_changed_at": ("tickets", "((coalesce(updated_at, created_at)))"),
+    "ix_performance_metrics_period": ("performance_metrics", "(time_period, start_date)"),
+    "ix_sla_reports_period": ("sla_reports", "(time_period, report_date)"),
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {
+        table for table, _ in INDEXES.values()
+        if bind.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table}).scalar()
+    }
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in INDEXES.items():
+            if table in existing:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {columns}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
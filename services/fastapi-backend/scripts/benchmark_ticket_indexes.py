@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Compare query plans for the hot ticket filter paths with and without the
+indexes declared on the ticket models (migration 0003_ticket_filter_indexes).
+
+Everything runs in one transaction that is rolled back at the end:
+synthetic tickets are inserted, the indexes are dropped for the "before"
+run and restored via a savepoint for the "after" run. DROP INDEX locks the
+tables until the rollback, so do not point this at a live database.
+
+Usage (from services/fastapi-backend, after `alembic upgrade head`):
+    python scripts/benchmark_ticket_indexes.py --rows 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+BENCHMARK_INDEXES = [
+    "ix_tickets_assigned_to_status",
+    "ix_tickets_active_sla_deadline",
+    "ix_tickets_listing",
+    "ix_tickets_reporter_listing",
+    "ix_tickets_created_at",
+    "ix_tickets_resolved_at",
+    "ix_ticket_activities_timeline",
+    "ix_ticket_tag_association_ticket_id",
+]
+
+# Representative statements for each hot path; :user_id is an existing user
+QUERIES = {
+    "engineer workload": """
+        SELECT count(*) FROM tickets
+        WHERE assigned_to_id = :user_id AND status IN ('OPEN', 'IN_PROGRESS')
+    """,
+    "SLA breach scan": """
+        SELECT id, sla_deadline FROM tickets
+        WHERE status IN ('OPEN', 'IN_PROGRESS') AND sla_deadline < now()
+    """,
+    "ticket listing": """
+        SELECT * FROM tickets
+        ORDER BY priority DESC, created_at DESC, id DESC
+        LIMIT 51
+    """,
+    "end-user listing": """
+        SELECT * FROM tickets
+        WHERE reported_by_id = :user_id
+        ORDER BY priority DESC, created_at DESC, id DESC
+        LIMIT 51
+    """,
+    "analytics window (created)": """
+        SELECT count(*) FROM tickets
+        WHERE created_at >= now() - interval '7 days'
+    """,
+    "analytics window (resolved)": """
+        SELECT count(*) FROM tickets
+        WHERE resolved_at >= now() - interval '7 days'
+    """,
+    "activity timeline": """
+        SELECT * FROM ticket_activities
+        WHERE ticket_id = (SELECT min(id) FROM tickets)
+        ORDER BY created_at DESC, id DESC
+        LIMIT 51
+    """,
+}
+
+SEED_TICKETS = """
+    INSERT INTO tickets (
+        id, title, description, status, priority, category, reported_by_id,
+        assigned_to_id, created_at, resolved_at, sla_deadline, department_id,
+        is_escalated, version
+    )
+    SELECT
+        'BENCH-' || g,
+        'Benchmark ticket ' || g,
+        'Synthetic ticket used to benchmark query plans',
+        s.status::ticketstatus,
+        (ARRAY['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])[1 + g % 4]::ticketpriority,
+        'INCIDENT'::ticketcategory,
+        u.ids[1 + g % array_length(u.ids, 1)],
+        CASE WHEN g % 5 = 0 THEN NULL ELSE u.ids[1 + (g / 7) % array_length(u.ids, 1)] END,
+        c.created_at,
+        CASE WHEN s.status IN ('RESOLVED', 'CLOSED') THEN c.created_at + interval '6 hours' END,
+        c.created_at + interval '24 hours',
+        :department_id,
+        false,
+        1
+    FROM generate_series(1, :rows) AS g
+    CROSS JOIN (SELECT array_agg(id) AS ids FROM users) AS u
+    CROSS JOIN LATERAL (
+        SELECT now() - (g % 365) * interval '1 day' - (g % 1440) * interval '1 minute' AS created_at
+    ) AS c
+    CROSS JOIN LATERAL (
+        -- Most tickets in a long-lived system are closed
+        SELECT CASE WHEN g % 10 = 0 THEN 'OPEN' WHEN g % 10 = 1 THEN 'IN_PROGRESS'
+                    WHEN g % 10 < 5 THEN 'RESOLVED' ELSE 'CLOSED' END AS status
+    ) AS s
+"""
+
+
+def summarize(plan: dict) -> str:
+    """Top plan node, the scan nodes underneath it and the execution time"""
+    scans = []
+
+    def walk(node):
+        if "Scan" in node["Node Type"]:
+            target = node.get("Index Name") or node.get("Relation Name", "")
+            scans.append(f"{node['Node Type']} on {target}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return f"{plan['Execution Time']:9.2f} ms  {plan['Plan']['Node Type']}: {', '.join(scans)}"
+
+
+async def explain_all(conn, params: dict) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        results[name] = summarize(plan[0])
+    return results
+
+
+async def main(rows: int) -> None:
+    engine = create_async_engine(settings.database_url_async)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            user_id = (await conn.execute(text("SELECT min(id) FROM users"))).scalar()
+            department_id = (await conn.execute(text("SELECT min(id) FROM departments"))).scalar()
+            if user_id is None or department_id is None:
+                print("✗ ERROR: Seed at least one user and department first.")
+                return
+
+            existing = set((await conn.execute(
+                text("SELECT indexname FROM pg_indexes WHERE indexname = ANY(:names)"),
+                {"names": BENCHMARK_INDEXES}
+            )).scalars().all())
+            missing = [name for name in BENCHMARK_INDEXES if name not in existing]
+            if missing:
+                print(f"⚠ Missing indexes (run `alembic upgrade head`): {', '.join(missing)}")
+
+            if rows:
+                print(f"Seeding {rows} synthetic tickets...")
+                await conn.execute(text(SEED_TICKETS), {"rows": rows, "department_id": department_id})
+            await conn.execute(text("ANALYZE tickets"))
+
+            params = {"user_id": user_id}
+
+            savepoint = await conn.begin_nested()
+            for name in existing:
+                await conn.execute(text(f"DROP INDEX {name}"))
+            before = await explain_all(conn, params)
+            await savepoint.rollback()
+
+            after = await explain_all(conn, params)
+
+            for name in QUERIES:
+                print(f"\n{name}")
+                print(f"  before: {before[name]}")
+                print(f"  after:  {after[name]}")
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="synthetic tickets to add for the run (rolled back)")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
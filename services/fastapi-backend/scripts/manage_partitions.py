@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Inspect and maintain the monthly partitions of the history tables
+(ticket_activities, chat_messages, analytics_events, user_activity_logs).
+
+The app creates upcoming partitions itself at startup and daily; use this
+for one-off maintenance and archiving. Detached partitions are ordinary
+tables: dump them (e.g. `pg_dump -t ticket_activities_p2025_01`) and drop
+them, or re-attach them with ALTER TABLE ... ATTACH PARTITION.
+
+Usage (from services/fastapi-backend, after `alembic upgrade head`):
+    python scripts/manage_partitions.py list
+    python scripts/manage_partitions.py ensure --months-ahead 6
+    python scripts/manage_partitions.py detach --before 2025-01
+    python scripts/manage_partitions.py detach --before 2025-01 --drop
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    detach_partitions_before,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+)
+
+
+async def show(session: AsyncSession) -> None:
+    for table in PARTITIONED_TABLES:
+        if not await is_partitioned(session, table):
+            print(f"\n{table}: not partitioned")
+            continue
+        print(f"\n{table}")
+        for name, _ in await list_partitions(session, table):
+            size = (await session.execute(
+                text("SELECT pg_size_pretty(pg_total_relation_size(to_regclass(:name)))"), {"name": name}
+            )).scalar()
+            print(f"  {name:45} {size:>10}")
+
+
+async def main(args) -> None:
+    engine = create_async_engine(settings.database_url_async)
+    async with AsyncSession(engine) as session:
+        if args.command == "list":
+            await show(session)
+        elif args.command == "ensure":
+            created = await ensure_partitions(session, args.months_ahead)
+            print(f"✓ Created {len(created)} partitions" + (f": {', '.join(created)}" if created else ""))
+        elif args.command == "detach":
+            before = date.fromisoformat(f"{args.before}-01")
+            affected = await detach_partitions_before(session, before, drop=args.drop)
+            action = "Dropped" if args.drop else "Detached"
+            print(f"✓ {action} {len(affected)} partitions" + (f": {', '.join(affected)}" if affected else ""))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show partitions and their sizes")
+    ensure = commands.add_parser("ensure", help="create partitions through N months ahead")
+    ensure.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    detach = commands.add_parser("detach", help="detach partitions for months before YYYY-MM")
+    detach.add_argument("--before", required=True, help="first month to keep, as YYYY-MM")
+    detach.add_argument("--drop", action="store_true", help="drop the partitions instead of keeping them detached")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Maintain the analytics rollups (performance_metrics, sla_reports).
+
+The app updates them incrementally every ROLLUP_INTERVAL_SECONDS; use this
+to catch up by hand or to rebuild a period after a bulk data fix.
+
+Usage (from services/fastapi-backend):
+    python scripts/manage_rollups.py run
+    python scripts/manage_rollups.py rebuild --since 2025-01-01
+    python scripts/manage_rollups.py rebuild --since 2025-01-01 --until 2025-03-31
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import close_db
+from app.services.rollups import rollup_job
+
+
+async def main(args) -> None:
+    try:
+        if args.command == "run":
+            days = await rollup_job.run_once()
+            print(f"✓ Recomputed rollups for {days} days")
+        elif args.command == "rebuild":
+            until = date.fromisoformat(args.until) if args.until else None
+            days = await rollup_job.rebuild(date.fromisoformat(args.since), until)
+            print(f"✓ Rebuilt rollups for {days} days")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("run", help="process tickets changed since the last run")
+    rebuild = commands.add_parser("rebuild", help="recompute every bucket in a date range")
+    rebuild.add_argument("--since", required=True, help="first day, as YYYY-MM-DD")
+    rebuild.add_argument("--until", help="last day, as YYYY-MM-DD (default today)")
+    asyncio.run(main(parser.parse_args()))